@@ -0,0 +1,203 @@
+"""Backpressure del buzón de `GenerationAgent` y `HostAgent`: vigilancia de profundidad y descarte de carga.
+
+Con muchas criaturas los `status` llegan más rápido de lo que `RecvBehav` los procesa: el
+buzón crece sin límite y las criaturas actúan sobre objetivos calculados segundos atrás.
+`LoadShedder` se coloca entre el buzón y `RecvBehav` y aplica las políticas activas
+(`WorldConfig.backpressure_policies`):
+
+- "coalesce": si el buzón supera `low`, se vacía de una vez y de cada criatura solo se
+  procesa el `status` más reciente (los anteriores quedan obsoletos); el resto de mensajes
+  conserva su orden. El status que sobrevive lleva `coalesced` = statuses descartados.
+- "host_degrade": primer escalón al superar `high`: las criaturas envían al host solo uno
+  de cada `host_every` statuses (la UI se degrada antes que la simulación).
+- "throttle": escalones siguientes: mensaje `slow_down` a las criaturas, que alargan su
+  periodo por `slowdown` ** escalón y avanzan otros tantos ticks base por tick (el
+  movimiento en tiempo simulado no cambia, solo su resolución).
+
+Los escalones suben como mucho uno por `cooldown` segundos (reales: el buzón se vacía a
+velocidad real) y bajan cuando el buzón se mantiene por debajo de `low` durante `cooldown`.
+`snapshot()` expone las acciones aplicadas (métricas de `/stats`).
+"""
+import json
+import time
+from collections import deque
+
+COALESCE = "coalesce"
+HOST_DEGRADE = "host_degrade"
+THROTTLE = "throttle"
+POLICIES = (COALESCE, HOST_DEGRADE, THROTTLE)
+
+
+class LoadShedder:
+    """Cola local entre el buzón de un behaviour y su `run`, con coalescencia y escalones de degradación."""
+
+    def __init__(self, policies=POLICIES, high=200, low=50, slowdown=1.5, max_throttle=3, host_every=4, cooldown=1.0, clock=time.monotonic):
+        policies = tuple(policies or ())
+        unknown = [p for p in policies if p not in POLICIES]
+        if unknown:
+            raise ValueError(f"política de backpressure desconocida: {unknown[0]!r} (opciones: {', '.join(POLICIES)})")
+        self.policies = policies
+        self.high = max(1, int(high))
+        self.low = max(1, min(int(low), self.high))
+        self.slowdown = max(1.0, float(slowdown))
+        self.host_every_max = max(1, int(host_every))
+        self.cooldown = float(cooldown)
+        self._clock = clock
+        # escalones disponibles en orden: primero la UI, después la simulación
+        self.stages = ((HOST_DEGRADE,) if HOST_DEGRADE in policies else ()) + ((THROTTLE,) * max(0, int(max_throttle)) if THROTTLE in policies else ())
+        self.level = 0
+        self.backlog = deque()  # (msg, data) ya extraídos del buzón y pendientes de procesar
+        self._changed_at = clock()
+        self._calm_since = None  # desde cuándo el buzón está por debajo de `low`
+        # métricas
+        self.received = 0
+        self.coalesced = 0
+        self.drains = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.escalations = 0
+        self.relaxations = 0
+        self.controls_sent = 0
+
+    @classmethod
+    def from_config(cls, config, policies=None):
+        """Shedder con los parámetros `backpressure_*` de `config` (`policies` las restringe)."""
+        active = getattr(config, "backpressure_policies", POLICIES) or ()
+        if policies is not None:
+            active = [p for p in active if p in policies]
+        return cls(
+            active,
+            high=getattr(config, "backpressure_high", 200),
+            low=getattr(config, "backpressure_low", 50),
+            slowdown=getattr(config, "backpressure_slowdown", 1.5),
+            max_throttle=getattr(config, "backpressure_max_throttle", 3),
+            host_every=getattr(config, "backpressure_host_every", 4),
+            cooldown=getattr(config, "backpressure_cooldown", 1.0),
+        )
+
+    # --- recepción ---------------------------------------------------------------------
+
+    async def next(self, behaviour, timeout=1):
+        """Siguiente (msg, data) a procesar, o (None, None) si no llegó nada en `timeout`.
+
+        `data` es el body ya decodificado (None si no es JSON válido).
+        """
+        if not self.backlog:
+            msg = await behaviour.receive(timeout=timeout)
+            if msg is None:
+                return None, None
+            self.backlog.append((msg, _decode(msg)))
+            self.received += 1
+        # mientras se procesa un backlog grande también llegan statuses que lo dejan obsoleto:
+        # se vuelve a vaciar el buzón cuando supera al backlog (coste amortizado O(1) por mensaje)
+        if COALESCE in self.policies and behaviour.mailbox_size() >= max(self.low, len(self.backlog)):
+            self._drain(behaviour)
+        return self.backlog.popleft()
+
+    def _drain(self, behaviour):
+        """Vacía el buzón en `backlog` dejando solo el último `status` de cada criatura."""
+        batch = list(self.backlog)
+        while True:
+            msg = _receive_nowait(behaviour)
+            if msg is None:
+                break
+            batch.append((msg, _decode(msg)))
+            self.received += 1
+        latest = {}
+        for i, (_, data) in enumerate(batch):
+            if data is not None and data.get("type") == "status" and data.get("cid") is not None:
+                latest[data["cid"]] = i
+        kept = deque()
+        dropped = {}
+        for i, item in enumerate(batch):
+            data = item[1]
+            if data is not None and data.get("type") == "status" and data.get("cid") is not None:
+                cid = data["cid"]
+                if latest[cid] != i:
+                    dropped[cid] = dropped.get(cid, 0) + 1 + data.get("coalesced", 0)
+                    continue
+                if cid in dropped:
+                    data["coalesced"] = data.get("coalesced", 0) + dropped.pop(cid)
+            kept.append(item)
+        self.coalesced += len(batch) - len(kept)
+        self.drains += 1
+        self.backlog = kept
+
+    # --- escalones ---------------------------------------------------------------------
+
+    def update(self, depth):
+        """Actualiza el escalón según la profundidad actual. Devuelve True si cambió."""
+        self.depth = depth
+        if depth > self.max_depth:
+            self.max_depth = depth
+        now = self._clock()
+        if depth >= self.low:
+            self._calm_since = None
+        elif self._calm_since is None:
+            self._calm_since = now
+        if now - self._changed_at < self.cooldown:
+            return False
+        if depth >= self.high and self.level < len(self.stages):
+            self.level += 1
+            self.escalations += 1
+        elif self.level > 0 and self._calm_since is not None and now - self._calm_since >= self.cooldown:
+            self.level -= 1
+            self.relaxations += 1
+        else:
+            return False
+        self._changed_at = now
+        return True
+
+    def pending(self, behaviour):
+        """Mensajes por procesar: buzón más `backlog`."""
+        return behaviour.mailbox_size() + len(self.backlog)
+
+    @property
+    def factor(self):
+        """Multiplicador de periodo (y de ticks base por tick) de las criaturas en el escalón actual."""
+        return self.slowdown ** self.stages[:self.level].count(THROTTLE)
+
+    @property
+    def host_every(self):
+        """Uno de cada cuántos statuses envían las criaturas al host."""
+        return self.host_every_max if HOST_DEGRADE in self.stages[:self.level] else 1
+
+    def control(self):
+        """Body del mensaje `slow_down` para el escalón actual (factor 1 y host_every 1 = sin degradación)."""
+        return {"type": "slow_down", "factor": self.factor, "host_every": self.host_every, "level": self.level}
+
+    def snapshot(self):
+        """Dict serializable a JSON con el estado y las acciones aplicadas."""
+        return {
+            "policies": list(self.policies),
+            "level": self.level,
+            "max_level": len(self.stages),
+            "factor": self.factor,
+            "host_every": self.host_every,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "drains": self.drains,
+            "escalations": self.escalations,
+            "relaxations": self.relaxations,
+            "controls_sent": self.controls_sent,
+        }
+
+
+def _decode(msg):
+    try:
+        return json.loads(msg.body)
+    except Exception:
+        return None
+
+
+def _receive_nowait(behaviour):
+    """Mensaje del buzón sin esperar (None si está vacío); `receive` sin timeout es asíncrono en SPADE."""
+    queue = getattr(behaviour, "queue", None)
+    if queue is None:
+        return None
+    try:
+        return queue.get_nowait()
+    except Exception:
+        return None
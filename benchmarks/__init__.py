@@ -0,0 +1,8 @@
+"""Benchmarks reproducibles de los caminos críticos de la simulación.
+
+Uso (desde la raíz del repositorio):
+
+    python -m benchmarks.run                       # todos los benchmarks
+    python -m benchmarks.run --only engine         # filtrar por nombre
+    python -m benchmarks.run --baseline old.json   # comparar contra una ejecución previa
+"""
@@ -0,0 +1,76 @@
+"""Escenarios extremo a extremo: ticks por segundo del motor headless a distintas poblaciones."""
+import dataclasses
+import math
+import random
+import time
+
+from benchmarks.harness import Suite  # noqa: F401  (asegura sys.path)
+
+import engine
+from world import WorldConfig
+
+SIZES = (10, 100, 1000, 10_000)
+TICK_SCALES = (1.0, 2.0, 4.0)
+
+
+def scenario_config(n):
+    """Mundo con densidad constante: 10 criaturas y 20 pellets por cada 30x30."""
+    side = 30.0 * math.sqrt(n / 10.0)
+    return dataclasses.replace(WorldConfig(), num_initial=n, food_count=2 * n, space_size=(side, side), max_generations=10**9)
+
+
+def run(suite, sizes=SIZES, budget=2.0):
+    # resolución status a status y por lotes con barrera de tick (`tick_barrier`, ver `resolve.py`)
+    for barrier in (False, True):
+        for n in sizes:
+            name = f"engine.ticks_per_second[barrier,{n}]" if barrier else f"engine.ticks_per_second[{n}]"
+            if not suite.wants(name):
+                continue
+            if suite.quick and n > 1000:
+                continue
+            suite.seeded()
+            cfg = dataclasses.replace(scenario_config(n), tick_barrier=barrier)
+            _ticks_per_second(suite, name, engine.HeadlessWorld(cfg, rng=random.Random(suite.seed)), n, budget)
+
+    # comida consumida por generación con ticks más grandes: prueba de punto final frente a
+    # prueba barrida (`swept_collisions`, ver `spatial.py`)
+    n = 1000
+    for swept in (False, True):
+        method = "swept" if swept else "point"
+        for scale in TICK_SCALES:
+            name = f"engine.foods_per_generation[{method},x{scale:g}]"
+            if not suite.wants(name):
+                continue
+            cfg = dataclasses.replace(scenario_config(n), tick_scale=scale, swept_collisions=swept)
+            world = engine.HeadlessWorld(cfg, rng=random.Random(suite.seed))
+            results = world.run(2 if suite.quick else 4)
+            # comida (incluidas presas) por generación: media de `foods_eaten` por criatura inicial
+            eaten = sum(r.stats["foods"]["mean"] * r.initial for _, r, _, _ in results) / len(results)
+            ticks = sum(t for _, _, t, _ in results) / len(results)
+            suite.record(name, eaten, "foods", creatures=n, tick_scale=scale, ticks_per_generation=ticks)
+
+
+def _ticks_per_second(suite, name, world, n, budget):
+    if world.use_kernels and getattr(world.config, "tick_barrier", False):
+        _warm_up(world.config)
+    world.spawn_generation()
+    ticks = 0
+    creature_ticks = 0
+    start = time.perf_counter()
+    # al menos un tick; después seguir hasta agotar el presupuesto de tiempo
+    while ticks == 0 or time.perf_counter() - start < budget:
+        creature_ticks += len(world.active)
+        world.step()
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    suite.record(name, ticks / elapsed, "ticks/s", creatures=n, ticks=ticks, seconds=elapsed, creature_ticks_per_second=creature_ticks / elapsed)
+
+
+def _warm_up(cfg, ticks=3):
+    """Compila los kernels Numba (`kernels.py`) con un mundo pequeño para que la medición no incluya el JIT."""
+    base = scenario_config(10)
+    small = dataclasses.replace(cfg, num_initial=base.num_initial, food_count=base.food_count, space_size=base.space_size)
+    world = engine.HeadlessWorld(small, rng=random.Random(0))
+    world.spawn_generation()
+    for _ in range(ticks):
+        world.step()
@@ -0,0 +1,73 @@
+"""Lógica de `GenerationAgent`: búsqueda de comida, depredación, objetivo más cercano y fin de generación."""
+import dataclasses
+import os
+import tempfile
+
+from benchmarks.harness import Suite  # noqa: F401  (asegura sys.path)
+
+import evolution
+import reports
+import simulation
+from records import CreatureRecord
+from world import WorldConfig
+
+
+def make_population(n, rng, space=(30, 30)):
+    """`creatures_info` sintético con `n` criaturas vivas repartidas en el mundo."""
+    w, h = space
+    info = {}
+    for i in range(n):
+        info[f"creature1_{i}"] = CreatureRecord(
+            f"creature1_{i}@localhost", foods_eaten=rng.randint(0, 3), alive=rng.random() > 0.1,
+            speed=rng.uniform(0.5, 2.0), energy=rng.uniform(0, 1), size=rng.uniform(0.6, 1.8),
+            sense=rng.uniform(0, 2), x=rng.uniform(0, w), y=rng.uniform(0, h),
+        )
+    return info
+
+
+def run(suite):
+    cfg = WorldConfig()
+    for n_food in (20, 1000, 10_000):
+        rng = suite.seeded()
+        foods = [(rng.uniform(0, 30), rng.uniform(0, 30)) for _ in range(n_food)]
+        # peor caso: posición sin comida en rango (recorre toda la lista)
+        far = (-10.0, -10.0)
+        suite.bench(f"generation.food_scan[{n_food}]", lambda: simulation.find_food_in_range(far, foods, cfg.detection_radius), foods=n_food)
+        suite.bench(f"generation.nearest_target[{n_food}]", lambda: simulation.nearest_food(far, foods), foods=n_food)
+
+    for n in (10, 100, 1000, 10_000):
+        rng = suite.seeded()
+        info = make_population(n, rng)
+        pos = (15.0, 15.0)
+
+        def predation(info=info):
+            candidates = [
+                (base, other.x, other.y, float(other.size))
+                for base, other in info.items()
+                if other.alive and base != "creature1_0"
+            ]
+            return simulation.predation_targets(pos, 1.8, 1.0, candidates, cfg)
+
+        suite.bench(f"generation.predation_scan[{n}]", predation, creatures=n)
+
+    tmp = tempfile.mkdtemp(prefix="bench_reports_")
+    for n in (10, 1000, 10_000):
+        rng = suite.seeded()
+        info = make_population(n, rng)
+        suite.bench(f"end_generation.evaluate[{n}]", lambda info=info: evolution.evaluate_generation(info, cfg, rng), creatures=n)
+        # con capacidad de carga: un cuarto de la población inicial
+        for selection in evolution.SELECTIONS:
+            capped = dataclasses.replace(cfg, carrying_capacity=max(1, n // 4), capacity_selection=selection)
+            suite.bench(f"end_generation.evaluate[{selection},{n}]", lambda info=info, capped=capped: evolution.evaluate_generation(info, capped, rng), creatures=n, capacity=capped.carrying_capacity)
+        result = evolution.evaluate_generation(info, cfg, rng)
+        summary = os.path.join(tmp, f"summary_{n}.csv")
+        details = os.path.join(tmp, f"details_{n}.csv")
+
+        def write_csv(info=info, result=result, summary=summary, details=details):
+            reports.write_summary(summary, 1, result)
+            reports.write_details(details, 1, info)
+
+        suite.bench(f"end_generation.csv[{n}]", write_csv, repeat=3, creatures=n)
+        for path in (summary, details):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,61 @@
+"""Coste de importación de los módulos de la simulación (cada medida en un intérprete nuevo).
+
+Los agentes se importan con `SIM_TRANSPORT=loopback`, de modo que la medida no incluye
+a spade y refleja solo el coste propio del proyecto. Además de los segundos, se registra
+qué módulos pesados quedaron cargados y si la importación creó `report/`.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import ROOT
+
+MODULES = ("world", "simulation", "evolution", "engine", "replay", "generationAgent", "hostAgent")
+HEAVY = ("spade", "aiohttp", "webbrowser", "argparse", "cProfile", "pstats", "logging.handlers")
+
+PROBE = """
+import json, os, sys, time
+report = os.path.join(os.getcwd(), "report")
+existed = os.path.exists(report)
+t = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t
+print(json.dumps({{"seconds": dt, "modules": len(sys.modules), "heavy": [m for m in {heavy!r} if m in sys.modules],
+                  "created_report_dir": (not existed) and os.path.exists(report)}}))
+"""
+
+
+def measure(module, runs=5):
+    """Mejor tiempo de `import module` en `runs` intérpretes nuevos."""
+    env = dict(os.environ, SIM_TRANSPORT="loopback", PYTHONDONTWRITEBYTECODE="1")
+    best = None
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            return {"error": out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "import failed"}
+        sample = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or sample["seconds"] < best["seconds"]:
+            best = sample
+    return best
+
+
+def run(suite):
+    runs = 3 if suite.quick else 7
+    for module in MODULES:
+        name = f"import.{module}"
+        if not suite.wants(name):
+            continue
+        sample = measure(module, runs)
+        if "error" in sample:
+            print(f"{name:<55} skipped: {sample['error']}")
+            continue
+        suite.record(name, sample["seconds"] * 1000.0, "ms", modules=sample["modules"], heavy=sample["heavy"], created_report_dir=sample["created_report_dir"])
+
+
+if __name__ == "__main__":
+    for module in MODULES:
+        print(module, measure(module))
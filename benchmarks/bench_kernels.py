@@ -0,0 +1,107 @@
+"""Kernels de `kernels.py`: equivalencia del camino Numba con el de referencia y tiempos de ambos.
+
+Sin Numba solo se mide el camino de referencia. Con Numba, antes de medir se comparan los
+dos caminos sobre las mismas entradas (un tick de una población a densidad constante) y
+una diferencia interrumpe la ejecución con `AssertionError`; `tests/test_kernels.py` hace
+la misma comparación kernel a kernel, también con los kernels sin compilar ("nojit").
+"""
+import math
+
+from benchmarks.harness import Suite  # noqa: F401  (asegura sys.path)
+
+import kernels
+from benchmarks.bench_engine import scenario_config
+
+SIZES = (1000, 10_000)
+# tolerancia de las distancias y energías: `math.hypot` y `**` de CPython y de Numba pueden diferir en el último bit
+REL = 1e-9
+
+
+def tick_inputs(n, rng):
+    """Posiciones, caminos y rasgos de `n` criaturas y su comida, como en un tick de `bench_engine`."""
+    cfg = scenario_config(n)
+    w, h = cfg.space_size
+    foods = [(rng.uniform(0, w), rng.uniform(0, h)) for _ in range(cfg.food_count)]
+    x0 = [rng.uniform(0, w) for _ in range(n)]
+    y0 = [rng.uniform(0, h) for _ in range(n)]
+    speed = [rng.uniform(cfg.min_speed, 2.0) for _ in range(n)]
+    theta = [rng.uniform(0, 2 * math.pi) for _ in range(n)]
+    x1 = [x + math.cos(a) * s for x, a, s in zip(x0, theta, speed)]
+    y1 = [y + math.sin(a) * s for y, a, s in zip(y0, theta, speed)]
+    return {
+        "config": cfg,
+        "fx": [f[0] for f in foods],
+        "fy": [f[1] for f in foods],
+        "x0": x0, "y0": y0, "x1": x1, "y1": y1,
+        "size": [rng.uniform(cfg.size_min, cfg.size_max) for _ in range(n)],
+        "sense": [rng.uniform(cfg.sense_min, cfg.sense_max) for _ in range(n)],
+        "speed": speed,
+        "energy": [rng.uniform(0.2, cfg.initial_energy) for _ in range(n)],
+        "seeking": [rng.random() < 0.5 for _ in range(n)],
+        "scale": [rng.choice((1.0, 1.5, 2.25)) for _ in range(n)],
+        "max_step": max(speed),
+    }
+
+
+def calls(data):
+    """Una llamada por kernel con las entradas de `tick_inputs`: nombre -> fn(backend)."""
+    cfg = data["config"]
+    path = (data["x0"], data["y0"], data["x1"], data["y1"])
+    return {
+        "segment_hits": lambda b: kernels.segment_hits(data["fx"], data["fy"], *path, cfg.detection_radius, max(cfg.detection_radius, 0.5), backend=b),
+        "predation_claims": lambda b: kernels.predation_claims(*path, data["size"], data["sense"], data["max_step"], cfg, backend=b),
+        "predation_sweep": lambda b: kernels.predation_sweep(*path, data["size"], data["sense"], data["max_step"], cfg, backend=b),
+        "nearest": lambda b: kernels.nearest(data["fx"], data["fy"], data["x1"], data["y1"], max(cfg.detection_radius, 0.5), backend=b),
+        "drain": lambda b: kernels.drain(data["energy"], data["size"], data["speed"], data["sense"], data["seeking"], data["scale"], cfg, backend=b),
+    }
+
+
+def check(data, only=None, backend=kernels.NUMBA):
+    """Compara cada kernel de `backend` (o los de `only`) con el camino de referencia; AssertionError con el primero que difiere."""
+    for name, fn in calls(data).items():
+        if only is not None and name not in only:
+            continue
+        ref = fn(kernels.PYTHON)
+        got = fn(backend)
+        if name in ("segment_hits", "predation_claims"):
+            _same_hits(name, ref, got)
+        elif name == "predation_sweep":
+            assert [(i, j) for i, j, _ in ref] == [(i, j) for i, j, _ in got], f"{name}: muertes distintas"
+            _close(name, [d for *_, d in ref], [d for *_, d in got])
+        elif name == "nearest":
+            # empates a la misma distancia: se compara la distancia al punto elegido
+            fx, fy = data["fx"], data["fy"]
+            dist = lambda out: [math.hypot(fx[j] - x, fy[j] - y) for j, x, y in zip(out, data["x1"], data["y1"])]
+            assert -1 not in got, f"{name}: consulta sin resultado"
+            _close(name, dist(ref), dist(got))
+        else:
+            _close(name, ref, got)
+
+
+def _same_hits(name, ref, got):
+    ref_rows = sorted(zip(*ref))
+    got_rows = sorted(zip(*got))
+    assert [r[:2] for r in ref_rows] == [g[:2] for g in got_rows], f"{name}: pares distintos ({len(ref_rows)} frente a {len(got_rows)})"
+    _close(name, [r[2] for r in ref_rows], [g[2] for g in got_rows])
+    _close(name, [r[3] for r in ref_rows], [g[3] for g in got_rows])
+
+
+def _close(name, ref, got):
+    assert len(ref) == len(got), f"{name}: {len(ref)} resultados frente a {len(got)}"
+    for a, b in zip(ref, got):
+        assert math.isclose(a, b, rel_tol=REL, abs_tol=REL), f"{name}: {a!r} != {b!r}"
+
+
+def run(suite, sizes=SIZES):
+    numba = kernels.backend() == kernels.NUMBA
+    for n in sizes:
+        if suite.quick and n > 1000:
+            continue
+        data = tick_inputs(n, suite.seeded())
+        fns = calls(data)
+        if numba and any(suite.wants(f"kernels.{name}[{kernels.NUMBA},{n}]") for name in fns):
+            check(data)  # también compila los kernels antes de medir
+        for name, fn in fns.items():
+            suite.bench(f"kernels.{name}[{kernels.PYTHON},{n}]", lambda fn=fn: fn(kernels.PYTHON), number=1, n=n)
+            if numba:
+                suite.bench(f"kernels.{name}[{kernels.NUMBA},{n}]", lambda fn=fn: fn(kernels.NUMBA), number=1, n=n)
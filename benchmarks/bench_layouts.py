@@ -0,0 +1,36 @@
+"""Generadores de `layouts.py` a 1M de pellets, frente a la lista de tuplas con `random.uniform`."""
+import random
+import time
+
+from benchmarks.harness import Suite  # noqa: F401  (asegura sys.path)
+
+import layouts
+
+N = 1_000_000
+SPACE = (1000.0, 1000.0)
+
+
+def _tuples_uniform(count, space_size, rng):
+    """Forma anterior de `utils.place_food`: una tupla y dos `uniform` por pellet."""
+    w, h = space_size
+    return [(rng.uniform(0, w), rng.uniform(0, h)) for _ in range(count)]
+
+
+def run(suite):
+    n = 100_000 if suite.quick else N
+    cases = [("tuples_uniform", _tuples_uniform)] + [(name, fn) for name, fn in layouts.FOOD_LAYOUTS.items()]
+    for name, generate in cases:
+        bench = f"layouts.food[{name},{n}]"
+        if not suite.wants(bench):
+            continue
+        rng = random.Random(suite.seed)
+        # una sola pasada: a 1M cada generador tarda de décimas a varios segundos
+        start = time.perf_counter()
+        out = generate(n, SPACE, rng)
+        elapsed = time.perf_counter() - start
+        produced = len(out) if name == "tuples_uniform" else len(out[0])
+        suite.record(bench, elapsed, "s", n=n, produced=produced)
+    for name in layouts.SPAWN_LAYOUTS:
+        bench = f"layouts.spawn[{name},10000]"
+        if suite.wants(bench):
+            suite.bench(bench, lambda fn=layouts.SPAWN_LAYOUTS[name]: fn(10_000, (300.0, 300.0), random.Random(suite.seed)), n=10_000)
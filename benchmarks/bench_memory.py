@@ -0,0 +1,77 @@
+"""Memoria y coste de actualización del registro por criatura: dict-of-dicts vs `CreatureRecord`."""
+import gc
+import json
+import tracemalloc
+
+from benchmarks.harness import Suite  # noqa: F401  (asegura sys.path)
+
+from records import CreatureRecord
+
+
+def build_dicts(n):
+    """Forma anterior de `creatures_info`: un dict con ~11 claves por criatura."""
+    return {
+        f"creature1_{i}": {"jid_full": f"creature1_{i}@localhost", "foods_eaten": 0, "alive": True, "speed": 1.0 + i * 1e-6, "energy": 1.0 + i * 1e-6,
+                           "size": 1.0 + i * 1e-6, "sense": 1.0 + i * 1e-6, "x": i * 0.5, "y": i * 0.25, "kills": 0}
+        for i in range(n)
+    }
+
+
+def build_records(n):
+    return {
+        f"creature1_{i}": CreatureRecord(f"creature1_{i}@localhost", speed=1.0 + i * 1e-6, energy=1.0 + i * 1e-6, size=1.0 + i * 1e-6,
+                                         sense=1.0 + i * 1e-6, x=i * 0.5, y=i * 0.25)
+        for i in range(n)
+    }
+
+
+def allocated(builder, n):
+    """Bytes retenidos por la estructura construida (tracemalloc)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = builder(n)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del data
+    return after - before
+
+
+def update_dict(info, data):
+    """Actualización por status tal como la hacía `GenerationAgent.RecvBehav`."""
+    info["energy"] = data.get("energy", info.get("energy"))
+    info["x"] = data.get("x", info.get("x"))
+    info["y"] = data.get("y", info.get("y"))
+    if "size" in data:
+        info["size"] = data.get("size")
+    if "sense" in data:
+        info["sense"] = data.get("sense")
+    if "speed" in data:
+        info["speed"] = data.get("speed")
+    if "kills" in data:
+        info["kills"] = data.get("kills")
+
+
+def run(suite):
+    for n in (1000, 10_000):
+        d = allocated(build_dicts, n)
+        r = allocated(build_records, n)
+        suite.record(f"memory.creatures_info_dicts[{n}]", d / n, "bytes/creature", creatures=n, total=d)
+        suite.record(f"memory.creatures_info_records[{n}]", r / n, "bytes/creature", creatures=n, total=r, ratio=d / r if r else None)
+
+    status = json.loads(json.dumps({"type": "status", "jid": "creature1_0@localhost", "x": 1.5, "y": 2.5, "energy": 0.7, "speed": 1.1, "size": 1.2, "sense": 0.3, "foods_eaten": 1, "kills": 0}))
+    info_dict = build_dicts(1)["creature1_0"]
+    info_rec = build_records(1)["creature1_0"]
+    suite.bench("memory.status_update_dict", lambda: update_dict(info_dict, status))
+    suite.bench("memory.status_update_record", lambda: info_rec.update_from_status(status))
+
+    dicts = build_dicts(10_000)
+    recs = build_records(10_000)
+    suite.bench("memory.predation_candidates_dicts[10000]", lambda: [
+        (b, o["x"], o["y"], float(o["size"])) for b, o in dicts.items()
+        if b != "creature1_0" and o.get("alive", False) and o.get("x") is not None and o.get("y") is not None and o.get("size") is not None
+    ], repeat=3)
+    suite.bench("memory.predation_candidates_records[10000]", lambda: [
+        (b, o.x, o.y, float(o.size)) for b, o in recs.items()
+        if o.alive and b != "creature1_0" and o.x is not None and o.y is not None and o.size is not None
+    ], repeat=3)
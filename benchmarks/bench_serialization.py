@@ -0,0 +1,81 @@
+"""Serialización JSON de los mensajes `status` y del estado que sirve `/fishes`."""
+import json
+
+from benchmarks.harness import Suite  # noqa: F401  (asegura sys.path)
+
+import simulation
+import snapshot
+from records import CreatureRecord
+
+
+def run(suite):
+    rng = suite.seeded()
+    state = simulation.CreatureState(jid="creature1_0@localhost", speed=1.2, energy=0.8, size=1.1, sense=0.7, x=12.3, y=4.5)
+    payload = simulation.status_payload(state)
+    body = json.dumps(payload)
+    suite.bench("status.encode", lambda: json.dumps(simulation.status_payload(state)))
+    suite.bench("status.decode", lambda: json.loads(body))
+
+    for n in (10, 1000, 10_000):
+        fishes = {}
+        for i in range(n):
+            jid = f"creature1_{i}@localhost"
+            fishes[jid] = CreatureRecord(
+                jid, x=rng.uniform(0, 30), y=rng.uniform(0, 30), energy=rng.uniform(0, 1),
+                foods_eaten=rng.randint(0, 3), speed=rng.uniform(0.5, 2), size=rng.uniform(0.6, 1.8),
+                sense=rng.uniform(0, 2),
+            )
+        foods = [(rng.uniform(0, 30), rng.uniform(0, 30)) for _ in range(2 * n)]
+        removals = [{"jid": f"creature1_{i}@localhost", "x": 1.0, "y": 2.0, "time": 0.0, "reason": "killed", "killed_by": None} for i in range(min(n, 20))]
+        suite.bench(
+            f"fishes_controller.serialize[{n}]",
+            lambda fishes=fishes, foods=foods, removals=removals: json.dumps(snapshot.world_snapshot(fishes.values(), foods, removals, 1, (30, 30))),
+            creatures=n,
+        )
+        encoded = json.dumps(snapshot.world_snapshot(fishes.values(), foods, removals, 1, (30, 30)))
+        suite.record(f"fishes_controller.payload_bytes[{n}]", len(encoded), "bytes", creatures=n)
+
+    # viewport de 30x30 en una esquina de un mundo grande (ver `snapshot.viewport_snapshot`)
+    for n in (10_000, 100_000):
+        side = 30.0 * (n / 10.0) ** 0.5
+        fishes = [
+            CreatureRecord(f"creature1_{i}@localhost", x=rng.uniform(0, side), y=rng.uniform(0, side), energy=1.0, speed=1.0, size=1.0, sense=1.0, cid=i)
+            for i in range(n)
+        ]
+        foods = [(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(2 * n)]
+        view = snapshot.Viewport(0.0, 0.0, 30.0, 30.0)
+        suite.bench(
+            f"fishes_controller.viewport_serialize[{n}]",
+            lambda fishes=fishes, foods=foods, view=view, side=side: json.dumps(snapshot.viewport_snapshot(fishes, foods, [], 1, (side, side), view)),
+            creatures=n,
+        )
+        full = json.dumps(snapshot.world_snapshot(fishes, foods, [], 1, (side, side)))
+        culled = json.dumps(snapshot.viewport_snapshot(fishes, foods, [], 1, (side, side), view))
+        suite.record(f"fishes_controller.viewport_payload_bytes[{n}]", len(culled), "bytes", creatures=n, full_bytes=len(full))
+
+    # 10 clientes consultando el mismo estado en un intervalo: sin caché se serializa una vez
+    # por cliente; con `SnapshotCache` una vez por versión (más una compresión gzip)
+    fishes = [
+        CreatureRecord(f"creature1_{i}@localhost", x=rng.uniform(0, 30), y=rng.uniform(0, 30), energy=1.0, speed=1.0, size=1.0, sense=1.0, cid=i)
+        for i in range(1000)
+    ]
+    foods = [(rng.uniform(0, 30), rng.uniform(0, 30)) for _ in range(2000)]
+    viewers = 10
+
+    def uncached():
+        for _ in range(viewers):
+            json.dumps(snapshot.world_snapshot(fishes, foods, [], 1, (30, 30)))
+
+    # sin intervalo mínimo: cada ronda publica una versión nueva (coste por versión)
+    cache = snapshot.SnapshotCache(min_interval=0.0)
+    version = [0]
+
+    def cached():
+        version[0] += 1
+        for _ in range(viewers):
+            cache.get(version[0], None, lambda: snapshot.world_snapshot(fishes, foods, [], 1, (30, 30))).body("gzip")
+
+    suite.bench(f"fishes_controller.interval_uncached[{viewers} viewers]", uncached, creatures=1000)
+    suite.bench(f"fishes_controller.interval_cached_gzip[{viewers} viewers]", cached, creatures=1000)
+    entry = snapshot.SnapshotCache().get(0, None, lambda: snapshot.world_snapshot(fishes, foods, [], 1, (30, 30)))
+    suite.record("fishes_controller.gzip_ratio[1000]", len(entry.body("gzip")) / len(entry.body()), "ratio", creatures=1000)
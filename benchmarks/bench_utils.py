@@ -0,0 +1,15 @@
+"""Micro-benchmarks de `utils`."""
+from benchmarks.harness import Suite  # noqa: F401  (asegura sys.path)
+
+import utils
+
+
+def run(suite):
+    rng = suite.seeded()
+    a = (rng.uniform(0, 30), rng.uniform(0, 30))
+    b = (rng.uniform(0, 30), rng.uniform(0, 30))
+    suite.bench("utils.distance", lambda: utils.distance(a, b))
+    for n in (20, 1000, 100_000):
+        suite.bench(f"utils.place_food[{n}]", lambda n=n: utils.place_food(n, (30, 30)), n=n)
+    for n in (10, 1000, 10_000):
+        suite.bench(f"utils.spawn_positions_on_perimeter[{n}]", lambda n=n: utils.spawn_positions_on_perimeter(n, (30, 30)), n=n)
@@ -0,0 +1,94 @@
+"""Infraestructura mínima de medición: timing estable, resultados JSON y comparación."""
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class Suite:
+    """Colección de resultados de benchmark de una ejecución."""
+
+    def __init__(self, seed=1234, repeat=5, quick=False, only=None):
+        self.seed = seed
+        self.repeat = repeat
+        self.quick = quick
+        self.only = only
+        self.results = {}
+
+    def wants(self, name):
+        return self.only is None or any(o in name for o in self.only)
+
+    def seeded(self):
+        """Reinicia el RNG global y devuelve un `random.Random` con la semilla de la suite."""
+        random.seed(self.seed)
+        return random.Random(self.seed)
+
+    def bench(self, name, fn, number=None, repeat=None, **meta):
+        """Mide `fn()` (segundos por llamada): mejor y mediana de `repeat` rondas."""
+        if not self.wants(name):
+            return None
+        timer = timeit.Timer(fn)
+        if number is None:
+            number, _ = timer.autorange()
+        rounds = sorted(t / number for t in timer.repeat(repeat=repeat or self.repeat, number=number))
+        entry = {"unit": "s/op", "best": rounds[0], "median": rounds[len(rounds) // 2], "number": number, "repeat": len(rounds)}
+        entry.update(meta)
+        self.results[name] = entry
+        print(f"{name:<55} {entry['best'] * 1e6:>12.2f} us/op  (median {entry['median'] * 1e6:.2f})")
+        return entry
+
+    def record(self, name, value, unit, **meta):
+        """Registra una métrica ya calculada (p.ej. ticks/s, bytes)."""
+        if not self.wants(name):
+            return None
+        entry = {"unit": unit, "value": value}
+        entry.update(meta)
+        self.results[name] = entry
+        print(f"{name:<55} {value:>12.2f} {unit}")
+        return entry
+
+    def to_json(self):
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "seed": self.seed,
+            "results": self.results,
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2, sort_keys=True)
+
+
+def _score(entry):
+    """Valor comparable y si mayor es mejor."""
+    if "best" in entry:
+        return entry["best"], False
+    higher_is_better = entry.get("unit", "").endswith("/s")
+    return entry["value"], higher_is_better
+
+
+def compare(current, baseline):
+    """Líneas de texto comparando dos resultados JSON (ratio > 1 = más rápido/mejor)."""
+    lines = []
+    base = baseline.get("results", {})
+    for name, entry in sorted(current.get("results", {}).items()):
+        if name not in base:
+            continue
+        cur, higher = _score(entry)
+        old, _ = _score(base[name])
+        if not cur or not old:
+            continue
+        ratio = (cur / old) if higher else (old / cur)
+        lines.append(f"{name:<55} {ratio:>7.2f}x {'mejor' if ratio >= 1 else 'peor'}")
+    return lines
@@ -0,0 +1,229 @@
+"""Generador de carga para los agentes sobre el transporte loopback (sin servidor XMPP).
+
+Mide el coste de manejar mensajes en los behaviours, separado de la red y del broker:
+
+    python -m benchmarks.loadgen --mode recv --creatures 2000 --ticks 20
+    python -m benchmarks.loadgen --mode pipeline --creatures 500 --duration 10
+
+- `recv`: un `GenerationAgent` real (solo su `RecvBehav`) recibe ráfagas de mensajes
+  `status` de N criaturas sintéticas (una por criatura y tick) que solo drenan las
+  respuestas (`eat_confirm`, `target`, ...). Reporta statuses procesados por segundo.
+- `pipeline`: generaciones completas con N `CreatureAgent` reales durante `--duration`
+  segundos. Reporta mensajes por segundo del router y generaciones completadas.
+"""
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+# el transporte se elige al importar los agentes
+os.environ["SIM_TRANSPORT"] = "loopback"
+
+from benchmarks.harness import ROOT  # noqa: E402,F401  (asegura sys.path)
+
+import loopback  # noqa: E402
+import simulation  # noqa: E402
+import transport  # noqa: E402
+import utils  # noqa: E402
+from generationAgent import GenerationAgent  # noqa: E402
+from records import CreatureRecord  # noqa: E402
+from world import WorldConfig  # noqa: E402
+
+if transport.TRANSPORT != "loopback":
+    raise RuntimeError("transport ya fue importado con SIM_TRANSPORT distinto de 'loopback'")
+
+
+def _redirect_reports(gen, directory):
+    """Evita escribir CSV/checkpoints de la prueba de carga en report/."""
+    gen.set_report_dir(directory)
+
+
+class SinkCreature(loopback.Agent):
+    """Criatura sintética: solo drena y cuenta los mensajes que le envía la generación."""
+
+    class Drain(loopback.CyclicBehaviour):
+        async def run(self):
+            msg = await self.receive(timeout=1)
+            if msg is not None:
+                self.agent.received += 1
+
+    async def setup(self):
+        self.received = 0
+        self.add_behaviour(self.Drain())
+
+
+class LoadGenerationAgent(GenerationAgent):
+    """`GenerationAgent` con solo `RecvBehav`; el mundo lo prepara el generador de carga."""
+
+    class CountingRecv(GenerationAgent.RecvBehav):
+        async def receive(self, timeout=None):
+            self.busy = False
+            msg = await super().receive(timeout)
+            if msg is not None:
+                self.busy = True
+            return msg
+
+    async def setup(self):
+        self.recv = self.CountingRecv()
+        self.recv.busy = False
+        self.add_behaviour(self.recv)
+
+
+async def run_recv(creatures=1000, ticks=10, seed=1234):
+    """Ráfagas de `creatures` statuses por tick contra `GenerationAgent.RecvBehav`."""
+    rng = random.Random(seed)
+    router = loopback.default_router
+    side = 30.0 * (creatures / 10.0) ** 0.5
+    cfg = dataclasses.replace(WorldConfig(), num_initial=creatures, food_count=2 * creatures, space_size=(side, side))
+    tmp = tempfile.mkdtemp(prefix="loadgen_")
+
+    gen = LoadGenerationAgent("generation@localhost", "x", num_initial=creatures, food_count=cfg.food_count, space_size=cfg.space_size)
+    gen.config = cfg
+    _redirect_reports(gen, tmp)
+    await gen.start()
+    gen.generation = 1
+    gen._set_foods([(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(cfg.food_count)])
+    positions = utils.spawn_positions_on_perimeter(creatures, cfg.space_size)
+    sinks = []
+    states = []
+    gen.stats.reset(gen.generation)
+    gen.spawn_points = list(positions)
+    gen.last_report = [gen.timescale.now()] * creatures
+    for i in range(creatures):
+        jid = f"creature1_{i}@localhost"
+        x, y = positions[i]
+        info = CreatureRecord(jid, speed=cfg.initial_speed, energy=cfg.initial_energy, size=rng.uniform(cfg.size_min, cfg.size_max), sense=rng.uniform(cfg.sense_min, cfg.sense_max), x=x, y=y, cid=i)
+        gen.creatures_info.append(info)
+        gen.active_cids.add(i)
+        gen.cid_by_jid[jid] = i
+        gen.stats.spawn(i, info.speed, info.size, info.sense, info.energy)
+        states.append(simulation.CreatureState(jid=jid, speed=cfg.initial_speed, energy=cfg.initial_energy, size=info.size, sense=info.sense, x=x, y=y, cid=i, generation=1))
+        sink = SinkCreature(jid, "x")
+        await sink.start()
+        sinks.append(sink)
+    gen._index_creatures()
+
+    router.reset_stats()
+    sent = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for st in states:
+            simulation.step_forage(st, None, cfg.space_size, cfg, rng)
+            msg = loopback.Message(to="generation@localhost", sender=st.jid, body=json.dumps(simulation.status_payload(st)))
+            msg.set_metadata("performative", "inform")
+            router.deliver(msg)
+            sent += 1
+        # esperar a que la generación procese la ráfaga completa
+        # `shedder.received` también cuenta lo extraído del buzón de una vez (backpressure)
+        while gen.shedder.received < sent or gen.shedder.backlog or gen.recv.busy:
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    stats = router.stats()
+
+    for sink in sinks:
+        await sink.stop()
+    await gen.stop()
+    return {
+        "mode": "recv",
+        "creatures": creatures,
+        "ticks": ticks,
+        "statuses": sent,
+        "seconds": elapsed,
+        "statuses_per_second": sent / elapsed if elapsed > 0 else 0.0,
+        "replies": sum(s.received for s in sinks),
+        "alive_at_end": sum(1 for info in gen.creatures_info if info.alive),
+        "router": stats,
+    }
+
+
+async def run_pipeline(creatures=200, duration=10.0, time_scale=1.0, seed=1234):
+    """Generaciones completas con `CreatureAgent` reales sobre loopback durante `duration` segundos."""
+    random.seed(seed)
+    router = loopback.default_router
+    side = 30.0 * (creatures / 10.0) ** 0.5
+    cfg = dataclasses.replace(WorldConfig(), num_initial=creatures, food_count=2 * creatures, space_size=(side, side), time_scale=time_scale, max_generations=10**9)
+    tmp = tempfile.mkdtemp(prefix="loadgen_")
+
+    gen = GenerationAgent("generation@localhost", "x", num_initial=creatures, food_count=cfg.food_count, space_size=cfg.space_size, max_generations=cfg.max_generations)
+    gen.config = cfg
+    _redirect_reports(gen, tmp)
+    router.reset_stats()
+    start = time.perf_counter()
+    await gen.start()
+    await asyncio.sleep(max(0.0, duration - (time.perf_counter() - start)))
+    elapsed = time.perf_counter() - start
+    stats = router.stats()
+    generation = gen.generation
+    shedding = gen.shedder.snapshot()
+    for agent in list(gen.spawned_agents):
+        await agent.stop()
+    await gen.stop()
+    return {
+        "mode": "pipeline",
+        "creatures": creatures,
+        "seconds": elapsed,
+        "generation_reached": generation,
+        "backpressure": shedding,
+        "messages_per_second": stats["sent"] / elapsed if elapsed > 0 else 0.0,
+        "router": stats,
+    }
+
+
+@contextlib.contextmanager
+def quiet(enabled=True):
+    """Silencia prints y logs de los agentes (su coste de formateo se sigue midiendo)."""
+    if not enabled:
+        yield
+        return
+    logging.disable(logging.CRITICAL)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def run(suite):
+    """Integración con `benchmarks.run`: throughput de `RecvBehav` a 100 y 1000 criaturas."""
+    for n in (100, 1000):
+        name = f"loopback.recv_statuses_per_second[{n}]"
+        if not suite.wants(name):
+            continue
+        with quiet():
+            result = asyncio.run(run_recv(creatures=n, ticks=5, seed=suite.seed))
+        suite.record(name, result["statuses_per_second"], "statuses/s", creatures=n, statuses=result["statuses"], seconds=result["seconds"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de carga sobre el transporte loopback")
+    parser.add_argument("--mode", choices=("recv", "pipeline"), default="recv")
+    parser.add_argument("--creatures", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=10, help="modo recv: ráfagas de statuses (una por criatura)")
+    parser.add_argument("--duration", type=float, default=10.0, help="modo pipeline: segundos de simulación")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="modo pipeline: velocidad de la simulación")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="guardar el resultado en JSON")
+    parser.add_argument("--verbose", action="store_true", help="no silenciar prints/logs de los agentes")
+    args = parser.parse_args(argv)
+
+    with quiet(not args.verbose):
+        if args.mode == "recv":
+            result = asyncio.run(run_recv(args.creatures, args.ticks, args.seed))
+        else:
+            result = asyncio.run(run_pipeline(args.creatures, args.duration, args.time_scale, args.seed))
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
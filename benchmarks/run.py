@@ -0,0 +1,54 @@
+"""Ejecuta la suite de benchmarks y guarda los resultados en JSON.
+
+    python -m benchmarks.run [--output FILE] [--baseline FILE] [--only NOMBRE ...] [--quick]
+"""
+import argparse
+import importlib
+import json
+import os
+import time
+
+from benchmarks.harness import ROOT, Suite, compare
+
+MODULES = [
+    "benchmarks.bench_imports",
+    "benchmarks.bench_utils",
+    "benchmarks.bench_layouts",
+    "benchmarks.bench_generation",
+    "benchmarks.bench_serialization",
+    "benchmarks.bench_memory",
+    "benchmarks.bench_engine",
+    "benchmarks.bench_kernels",
+    "benchmarks.loadgen",
+    "benchmarks.soak",
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de la simulación")
+    parser.add_argument("--output", help="archivo JSON de resultados (default: benchmarks/results/<fecha>.json)")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--only", nargs="*", help="ejecutar solo benchmarks cuyo nombre contenga alguno de estos textos")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="omitir los escenarios más grandes")
+    args = parser.parse_args(argv)
+
+    suite = Suite(seed=args.seed, repeat=args.repeat, quick=args.quick, only=args.only)
+    for name in MODULES:
+        importlib.import_module(name).run(suite)
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", time.strftime("%Y%m%d-%H%M%S") + ".json")
+    suite.save(output)
+    print(f"Resultados guardados en {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nComparación contra {args.baseline} (>1 = mejor):")
+        for line in compare(suite.to_json(), baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
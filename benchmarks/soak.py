@@ -0,0 +1,174 @@
+"""Prueba de resistencia: muchas generaciones seguidas sobre loopback con la memoria vigilada.
+
+    python -m benchmarks.soak --generations 1000
+    python -m benchmarks.soak --generations 1000 --max-rss-mb 16 --max-traced-mb 4 --output soak.json
+
+Un `GenerationAgent` real con sus `CreatureAgent` y el `RecvBehav` de `HostAgent` (sin
+servidor web) ejecutan generaciones cortas en un mundo pequeño, reiniciando desde la
+generación 1 cada `--max-generations` como en una ejecución sin fin. Tras un calentamiento
+se toma como base la RSS del proceso y la memoria trazada por `tracemalloc` (después de
+`gc.collect()`); al final se comparan con la base y la prueba falla (código de salida 1)
+si alguno de los crecimientos supera su umbral.
+"""
+import argparse
+import asyncio
+import dataclasses
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.loadgen import _redirect_reports, quiet  # fija SIM_TRANSPORT=loopback
+
+import loopback  # noqa: E402
+from generationAgent import GenerationAgent  # noqa: E402
+from hostAgent import HostAgent  # noqa: E402
+from world import WorldConfig  # noqa: E402
+
+MB = 1024 * 1024
+
+
+class SoakHost(HostAgent):
+    """`HostAgent` solo con su estado y `RecvBehav`: la generación la crea la prueba."""
+
+    async def setup(self):
+        self._init_state(self.config)
+
+
+def rss_bytes():
+    """RSS actual del proceso, o None si la plataforma no la expone sin dependencias."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def sample(gen):
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    return {
+        "generations": gen.generations_completed,
+        "rss": rss_bytes(),
+        "traced": current,
+        "agents": len(loopback.default_router.agents),
+        "tasks": len(asyncio.all_tasks()),
+    }
+
+
+async def run_soak(generations=1000, warmup=50, every=50, creatures=10, time_scale=100.0, max_generations=25, generation_duration=40.0, seed=1234):
+    """Ejecuta `generations` generaciones y devuelve las muestras de memoria y el crecimiento tras el calentamiento."""
+    random.seed(seed)
+    # mundo denso: las generaciones terminan en pocas decenas de segundos simulados
+    side = 12.0 * (creatures / 10.0) ** 0.5
+    cfg = dataclasses.replace(
+        WorldConfig(), num_initial=creatures, food_count=2 * creatures, space_size=(side, side), time_scale=time_scale,
+        max_generations=max_generations, generation_duration=generation_duration,
+    )
+    tmp = tempfile.mkdtemp(prefix="soak_")
+    host = SoakHost("host@localhost", "x")
+    host.config = cfg
+    gen = GenerationAgent("generation@localhost", "x", num_initial=creatures, food_count=cfg.food_count, space_size=cfg.space_size, max_generations=max_generations)
+    gen.config = cfg
+    gen.host_jid = "host@localhost"
+    host.gen = gen
+    _redirect_reports(gen, tmp)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    samples = []
+    baseline = None
+    try:
+        await host.start()
+        await gen.start()
+        next_sample = warmup
+        while gen.generations_completed < generations:
+            await asyncio.sleep(0.05)
+            if gen.generations_completed >= next_sample:
+                samples.append(sample(gen))
+                baseline = baseline or samples[-1]
+                next_sample += every
+        final = sample(gen)
+    finally:
+        elapsed = time.perf_counter() - start
+        for agent in list(gen.spawned_agents):
+            await agent.stop()
+        await gen.stop()
+        await host.stop()
+        tracemalloc.stop()
+        shutil.rmtree(tmp, ignore_errors=True)
+    baseline = baseline or final
+    rss_growth = final["rss"] - baseline["rss"] if final["rss"] is not None else None
+    return {
+        "generations": gen.generations_completed,
+        "seconds": elapsed,
+        "generations_per_second": gen.generations_completed / elapsed if elapsed > 0 else 0.0,
+        "baseline": baseline,
+        "final": final,
+        "rss_growth_mb": rss_growth / MB if rss_growth is not None else None,
+        "traced_growth_mb": (final["traced"] - baseline["traced"]) / MB,
+        "samples": samples,
+    }
+
+
+def check(result, max_rss_mb, max_traced_mb):
+    """Lista de umbrales superados (vacía si la prueba pasa)."""
+    failures = []
+    if result["rss_growth_mb"] is not None and result["rss_growth_mb"] > max_rss_mb:
+        failures.append(f"RSS creció {result['rss_growth_mb']:.1f} MB (máximo {max_rss_mb:g} MB)")
+    if result["traced_growth_mb"] > max_traced_mb:
+        failures.append(f"tracemalloc creció {result['traced_growth_mb']:.1f} MB (máximo {max_traced_mb:g} MB)")
+    return failures
+
+
+def run(suite):
+    """Integración con `benchmarks.run`: versión corta de la prueba (la de 1000 generaciones va por CLI)."""
+    if not suite.wants("soak"):
+        return
+    generations = 40 if suite.quick else 150
+    with quiet():
+        result = asyncio.run(run_soak(generations=generations, warmup=10, every=10, seed=suite.seed))
+    suite.record("soak.traced_growth_mb", result["traced_growth_mb"], "MB", generations=result["generations"], seconds=result["seconds"])
+    if result["rss_growth_mb"] is not None:
+        suite.record("soak.rss_growth_mb", result["rss_growth_mb"], "MB", generations=result["generations"])
+    suite.record("soak.generations_per_second", result["generations_per_second"], "gen/s", generations=result["generations"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de resistencia de memoria con generaciones completas sobre loopback")
+    parser.add_argument("--generations", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50, help="generaciones antes de tomar la base")
+    parser.add_argument("--every", type=int, default=50, help="generaciones entre muestras")
+    parser.add_argument("--creatures", type=int, default=10)
+    parser.add_argument("--time-scale", type=float, default=100.0)
+    parser.add_argument("--max-generations", type=int, default=25, help="generaciones antes de cada reinicio")
+    parser.add_argument("--max-rss-mb", type=float, default=16.0, help="crecimiento máximo de RSS tras el calentamiento")
+    parser.add_argument("--max-traced-mb", type=float, default=4.0, help="crecimiento máximo de tracemalloc tras el calentamiento")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="guardar el resultado en JSON")
+    parser.add_argument("--verbose", action="store_true", help="no silenciar prints/logs de los agentes")
+    args = parser.parse_args(argv)
+
+    with quiet(not args.verbose):
+        result = asyncio.run(run_soak(
+            args.generations, warmup=args.warmup, every=args.every, creatures=args.creatures,
+            time_scale=args.time_scale, max_generations=args.max_generations, seed=args.seed,
+        ))
+    result["failures"] = check(result, args.max_rss_mb, args.max_traced_mb)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    for failure in result["failures"]:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Checkpoints binarios del estado completo de la simulación en los límites de generación.
+
+Formato: cabecera `MAGIC` seguida de un pickle comprimido con zlib. La escritura es
+atómica (archivo temporal en el mismo directorio + `os.replace`), por lo que un fallo a
+mitad de escritura nunca deja un checkpoint corrupto en la ruta final.
+
+Los checkpoints son entrada de confianza: `load_checkpoint` usa `pickle` sin restricciones,
+que puede ejecutar código arbitrario al leer un archivo manipulado. Reanudar solo desde
+checkpoints escritos por la propia simulación.
+"""
+import dataclasses
+import os
+import pickle
+import tempfile
+import zlib
+
+MAGIC = b"SIMCKPT1"
+CHECKPOINT_NAME = "checkpoint.bin"
+
+
+def checkpoint_path(report_dir):
+    """Ruta del último checkpoint dentro del directorio de reportes."""
+    return os.path.join(report_dir, CHECKPOINT_NAME)
+
+
+def save_checkpoint(path, state):
+    """Serializa `state` (dict) y lo escribe de forma atómica en `path`."""
+    payload = MAGIC + zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 6)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_checkpoint(path):
+    """Lee un checkpoint escrito por `save_checkpoint`. Devuelve None si no existe.
+
+    Solo para archivos de confianza: deserializa con `pickle` (ver la nota del módulo).
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} no es un checkpoint válido")
+    return pickle.loads(zlib.decompress(data[len(MAGIC):]))
+
+
+def config_from_state(state, config_cls):
+    """`WorldConfig` guardado en `state`, descartando campos retirados de `config_cls`."""
+    # checkpoints anteriores pueden traer campos retirados de `WorldConfig` (p.ej. `monitor_period`)
+    known = {f.name for f in dataclasses.fields(config_cls)}
+    return config_cls(**{k: v for k, v in state["config"].items() if k in known})
@@ -2,36 +2,16 @@ import asyncio
 import json
 import random
 import math
-from dataclasses import dataclass
-from spade.agent import Agent
-from spade.behaviour import PeriodicBehaviour, CyclicBehaviour
-from spade.message import Message
+from transport import Agent, PeriodicBehaviour, CyclicBehaviour, Message, no_messages
 import utils
+import simulation
+from simulation import CreatureState
+from timescale import TimeScale
 from logger_setup import get_logger
 
 logger = get_logger('creature')
 
 
-@dataclass
-class CreatureState:
-	jid: str
-	speed: float
-	energy: float
-	foods_eaten: int = 0
-	size: float = 1.0
-	sense: float = 0.0
-	x: float = 0.0
-	y: float = 0.0
-	# Sistema de satisfacción
-	satisfied: bool = False
-	survival_mode: bool = False
-	food_goal: int = 2  # Objetivo inicial
-	spawn_x: float = 0.0
-	spawn_y: float = 0.0
-	returning_home: bool = False
-	kills: int = 0  # Contador de depredaciones
-
-
 class CreatureAgent(Agent):
 	"""Agente que representa una criatura en la simulación.
 
@@ -50,37 +30,27 @@ class CreatureAgent(Agent):
 			state = self.agent.state
 			
 			# Verificar satisfacción y modo supervivencia
-			if not state.satisfied:
-				# Verificar si ha alcanzado el objetivo de comida
-				if state.foods_eaten >= state.food_goal:
-					state.satisfied = True
-					state.returning_home = True
-					print(f"{state.jid} satisfied! (ate {state.foods_eaten} foods) - returning home")
-					try:
-						logger.info(f"{state.jid} satisfied with {state.foods_eaten} foods, returning to spawn")
-					except Exception:
-						pass
-				# Verificar modo supervivencia (35% de energía o menos)
-				elif not state.survival_mode and state.energy <= 0.35:
-					state.survival_mode = True
-					state.food_goal = 1  # Reducir objetivo a 1 alimento
-					print(f"{state.jid} entering survival mode! (energy={state.energy:.2f}, new goal=1)")
-					try:
-						logger.info(f"{state.jid} survival mode activated at energy={state.energy:.3f}")
-					except Exception:
-						pass
+			transition = simulation.update_goal(state)
+			if transition == "satisfied":
+				print(f"{state.jid} satisfied! (ate {state.foods_eaten} foods) - returning home")
+				try:
+					logger.info(f"{state.jid} satisfied with {state.foods_eaten} foods, returning to spawn")
+				except Exception:
+					pass
+			elif transition == "survival":
+				print(f"{state.jid} entering survival mode! (energy={state.energy:.2f}, new goal=1)")
+				try:
+					logger.info(f"{state.jid} survival mode activated at energy={state.energy:.3f}")
+				except Exception:
+					pass
 			
 			# Si está satisfecha, moverse hacia spawn point sin gastar energía
 			if state.returning_home:
-				dx = state.spawn_x - state.x
-				dy = state.spawn_y - state.y
-				dist = math.hypot(dx, dy)
-				
-				if dist < 0.5:  # Llegó al spawn point
+				if simulation.step_home(state, getattr(self.agent, "config", None)):  # Llegó al spawn point
 					# Enviar mensaje de finalización
 					end_msg = Message(to=self.agent.generation_jid)
 					end_msg.set_metadata("performative", "inform")
-					end_msg.body = json.dumps({"type": "finished", "jid": state.jid, "foods_eaten": state.foods_eaten, "energy": state.energy, "size": state.size, "sense": state.sense, "satisfied": True})
+					end_msg.body = json.dumps({"type": "finished", "cid": state.cid, "gen": state.generation, "jid": state.jid, "foods_eaten": state.foods_eaten, "energy": state.energy, "size": state.size, "sense": state.sense, "satisfied": True})
 					await self.send(end_msg)
 					print(f"{state.jid} reached home and finished (satisfied)")
 					try:
@@ -97,81 +67,43 @@ class CreatureAgent(Agent):
 							await self.send(host_end)
 						except Exception:
 							pass
-					await asyncio.sleep(0.1)
+					await self.agent.timescale.sleep(0.1)
 					await self.agent.stop()
 					return
-				else:
-					# Moverse hacia spawn point sin gastar energía
-					step = min(state.speed, dist)
-					state.x += (dx / dist) * step
-					state.y += (dy / dist) * step
-					# NO reducir energía al regresar
 			else:
-				# Comportamiento normal de búsqueda de comida
-				target = getattr(self.agent, "target", None)
-				if target is not None:
-					# vector hacia target
-					dx = target[0] - state.x
-					dy = target[1] - state.y
-					dist = math.hypot(dx, dy)
-					if dist > 0:
-						step = min(state.speed, dist)
-						state.x += (dx / dist) * step
-						state.y += (dy / dist) * step
-						seeking = True
-					else:
-						seeking = False
-				else:
-					seeking = False
-					# movimiento aleatorio: dirección uniforme
-					theta = random.random() * 2 * math.pi
-					dx = math.cos(theta) * state.speed
-					dy = math.sin(theta) * state.speed
-					state.x += dx
-					state.y += dy
-				# Limitar posición dentro del espacio si está disponible
-				space = getattr(self.agent, "space_size", None)
-				if space is not None:
-					w, h = space
-					# clamp
-					state.x = max(0.0, min(w, state.x))
-					state.y = max(0.0, min(h, state.y))
-				# reducir energía según la fórmula: energy_scale*(size^3*speed^2) + sense_scale*sense
-				config = getattr(self.agent, "config", None)
-				if config is not None:
-					energy_scale = getattr(config, "energy_scale", 0.02)
-					sense_scale = getattr(config, "sense_scale", 0.02)
-				else:
-					energy_scale = 0.02
-					sense_scale = 0.02
-				drain = energy_scale * (state.size ** 3 * (state.speed ** 2)) + sense_scale * state.sense
-				# if seeking, slightly increase drain using seek multiplier
-				if seeking:
-					mult = getattr(config, "seek_energy_multiplier", 1.3) if config is not None else 1.3
-					drain *= mult
-				state.energy -= drain
+				# Comportamiento normal de búsqueda de comida: moverse hacia el target (o al azar)
+				# dentro del espacio y reducir energía según
+				# energy_scale*(size^3*speed^2) + sense_scale*sense (x seek_energy_multiplier si busca)
+				simulation.step_forage(state, getattr(self.agent, "target", None), getattr(self.agent, "space_size", None), getattr(self.agent, "config", None))
+
+			# Reporte adaptativo: lejos de comida y de otras criaturas (también de vuelta a casa) se
+			# omiten los `quiet_ticks` indicados por la generación; con `max_quiet_ticks = 0` siempre es 0
+			report_generation = True
+			if self.agent.ticks_since_report < self.agent.quiet_ticks and transition is None and state.energy > 0:
+				report_generation = False
 
 			# Construir y enviar mensaje JSON con el estado actual
-			payload = {
-				"type": "status",
-				"jid": state.jid,
-				"x": state.x,
-				"y": state.y,
-				"energy": state.energy,
-				"speed": state.speed,
-				"size": state.size,
-				"sense": state.sense,
-				"foods_eaten": state.foods_eaten,
-				"kills": state.kills,
-			}
-			msg = Message(to=self.agent.generation_jid)
-			msg.set_metadata("performative", "inform")
-			msg.body = json.dumps(payload)
-			await self.send(msg)
+			payload = simulation.status_payload(state)
+			tracer = getattr(self.agent, "tracer", None)
+			if tracer is not None:
+				# el mismo id y marca viajan a la generación y al host (ver `tracing.py`)
+				tracer.stamp(payload)
+			if report_generation:
+				msg = Message(to=self.agent.generation_jid)
+				msg.set_metadata("performative", "inform")
+				msg.body = json.dumps(payload)
+				await self.send(msg)
+				self.agent.pending_reports += 1
+				self.agent.ticks_since_report = 0
+			else:
+				self.agent.ticks_since_report += 1
 
-			# También reportar al Host UI si está configurado
+			# También reportar al Host UI si está configurado; con backpressure solo uno de cada
+			# `host_every` statuses (salvo transiciones y agotamiento)
 			host_jid = getattr(self.agent, "host_jid", None)
-			if host_jid:
+			self.agent.host_ticks += 1
+			if host_jid and (self.agent.host_ticks >= self.agent.host_every or transition is not None or state.energy <= 0):
+				self.agent.host_ticks = 0
 				host_msg = Message(to=host_jid)
 				host_msg.set_metadata("performative", "inform")
 				host_msg.body = json.dumps(payload)
@@ -184,7 +116,7 @@ class CreatureAgent(Agent):
 			if state.energy <= 0:
 				end_msg = Message(to=self.agent.generation_jid)
 				end_msg.set_metadata("performative", "inform")
-				end_msg.body = json.dumps({"type": "finished", "jid": state.jid, "foods_eaten": state.foods_eaten, "energy": state.energy, "size": state.size, "sense": state.sense})
+				end_msg.body = json.dumps({"type": "finished", "cid": state.cid, "gen": state.generation, "jid": state.jid, "foods_eaten": state.foods_eaten, "energy": state.energy, "size": state.size, "sense": state.sense})
 				await self.send(end_msg)
 				try:
 					logger.info(f"Creature {state.jid} exhausted energy={state.energy:.3f} foods={state.foods_eaten} size={state.size:.3f} sense={state.sense:.3f}")
@@ -195,14 +127,18 @@ class CreatureAgent(Agent):
 				if host_jid:
 					host_end = Message(to=host_jid)
 					host_end.set_metadata("performative", "inform")
-					host_end.body = json.dumps({"type": "creature_removed", "jid": state.jid, "reason": "exhausted"})
+					host_end.body = json.dumps(self.agent.traced({"type": "creature_removed", "cid": state.cid, "jid": state.jid, "reason": "exhausted"}))
 					try:
 						await self.send(host_end)
 					except Exception:
 						pass
-				await asyncio.sleep(0.1)
+				await self.agent.timescale.sleep(0.1)
 				await self.agent.stop()
 
+		async def on_end(self):
+			# dejar de recibir cambios de velocidad una vez detenido el agente
+			self.agent.timescale.unsubscribe(self)
+
 
 	class RecvBehav(CyclicBehaviour):
 		async def run(self):
@@ -221,8 +157,14 @@ class CreatureAgent(Agent):
 				self.agent.can_move = True
 				return
 
+			tracer = getattr(self.agent, "tracer", None)
+			if tracer is not None and "trace" in data:
+				tracer.received(data, "generation", self.agent.state.cid)
+				if data.get("type") in ("target", "no_target"):
+					tracer.round_trip(data)
+
 			# Manejar confirmación de comida recibida
-			if data.get("type") == "eat_confirm" and data.get("jid") == self.agent.state.jid:
+			if data.get("type") == "eat_confirm" and data.get("cid", self.agent.state.cid) == self.agent.state.cid:
 				# incrementar contador de comidas y aumentar la energía según `energy_gain`
 				self.agent.state.foods_eaten += 1
 				energy_gain = None
@@ -232,9 +174,7 @@ class CreatureAgent(Agent):
 					except Exception:
 						energy_gain = None
 				if energy_gain is None:
-					cfg = getattr(self.agent, "config", None)
-					fes = getattr(cfg, "food_energy_scale", 0.8) if cfg is not None else 0.8
-					energy_gain = fes * (self.agent.state.size ** 3)
+					energy_gain = simulation.food_energy_gain(self.agent.state.size, getattr(self.agent, "config", None))
 				self.agent.state.energy += energy_gain
 				# enviar ack opcional
 			
@@ -246,19 +186,19 @@ class CreatureAgent(Agent):
 				# La generación terminó (timeout u otra razón): enviar estado final y notificar remoción
 				end_msg = Message(to=self.agent.generation_jid)
 				end_msg.set_metadata("performative", "inform")
-				end_msg.body = json.dumps({"type": "finished", "jid": self.agent.state.jid, "foods_eaten": self.agent.state.foods_eaten, "energy": self.agent.state.energy, "size": self.agent.state.size, "sense": self.agent.state.sense})
+				end_msg.body = json.dumps({"type": "finished", "cid": self.agent.state.cid, "gen": self.agent.state.generation, "jid": self.agent.state.jid, "foods_eaten": self.agent.state.foods_eaten, "energy": self.agent.state.energy, "size": self.agent.state.size, "sense": self.agent.state.sense})
 				await self.send(end_msg)
 				# Notificar al host UI como creature_removed con reason=finished (desvanecimiento limpio)
 				host_jid = getattr(self.agent, "host_jid", None)
 				if host_jid:
 					host_end = Message(to=host_jid)
 					host_end.set_metadata("performative", "inform")
-					host_end.body = json.dumps({"type": "creature_removed", "jid": self.agent.state.jid, "reason": "finished"})
+					host_end.body = json.dumps(self.agent.traced({"type": "creature_removed", "cid": self.agent.state.cid, "jid": self.agent.state.jid, "reason": "finished"}))
 					try:
 						await self.send(host_end)
 					except Exception:
 						pass
-				await asyncio.sleep(0.05)
+				await self.agent.timescale.sleep(0.05)
 				await self.agent.stop()
 			elif data.get("type") == "target":
 				# Se indica la posición de la comida más cercana (target)
@@ -268,13 +208,57 @@ class CreatureAgent(Agent):
 					self.agent.target = (tx, ty)
 				else:
 					self.agent.target = None
+				self.agent.apply_quiet(data)
 			elif data.get("type") == "no_target":
 				self.agent.target = None
+				self.agent.apply_quiet(data)
+			elif data.get("type") == "slow_down":
+				self.agent.apply_slow_down(data)
+
+
+	def traced(self, payload):
+		"""Añade id de traza y marca de envío a `payload` si el trazado está activo."""
+		tracer = getattr(self, "tracer", None)
+		return tracer.stamp(payload) if tracer is not None else payload
+
+	def apply_quiet(self, data):
+		"""Aplica la ventana `quiet` de una respuesta target/no_target de la generación.
+
+		La ventana se calculó para el último status; si hay otro status en vuelo (o el mensaje
+		es un aviso de la generación, `push`), se vuelve a reportar en el siguiente tick.
+		"""
+		if data.get("push"):
+			self.quiet_ticks = 0
+			return
+		# `coalesced`: statuses anteriores descartados por la generación, respondidos con este
+		self.pending_reports = max(0, self.pending_reports - 1 - int(data.get("coalesced", 0) or 0))
+		self.quiet_ticks = 0 if self.pending_reports else int(data.get("quiet", 0) or 0)
+
+	def apply_slow_down(self, data):
+		"""Aplica un `slow_down` de la generación (ver `backpressure.py`).
 
+		El periodo de reporte se alarga por `factor` y cada tick avanza otros tantos ticks base
+		(`state.throttle`), así que el movimiento en tiempo simulado no cambia; `host_every`
+		limita los statuses enviados al host.
+		"""
+		factor = max(1.0, float(data.get("factor", 1.0) or 1.0))
+		self.host_every = max(1, int(data.get("host_every", 1) or 1))
+		if factor != self.state.throttle:
+			self.state.throttle = factor
+			self.state.period = self.base_period * factor
+			self.timescale.subscribe(self.report, self.state.period)
 
 	async def setup(self):
 		# Flag para controlar cuándo puede moverse
 		self.can_move = False
+		# ticks que puede avanzar sin reportar a la generación (ver `simulation.quiet_ticks`)
+		self.quiet_ticks = 0
+		self.ticks_since_report = 0
+		# statuses enviados a la generación cuya respuesta (target/no_target) aún no llegó
+		self.pending_reports = 0
+		# uno de cada `host_every` statuses va también al host (backpressure, ver `apply_slow_down`)
+		self.host_every = 1
+		self.host_ticks = 0
 		
 		# Crear estado interno a partir de atributos del agente
 		# Se espera que la generación pase `speed` y `energy` en self.extra
@@ -287,6 +271,9 @@ class CreatureAgent(Agent):
 
 		jid = str(self.jid).split("/")[0]
 		self.state = CreatureState(jid=jid, speed=speed, energy=energy)
+		# id entero asignado por GenerationAgent (viaja en todos los mensajes en lugar del jid)
+		self.state.cid = getattr(self, "cid", -1)
+		self.state.generation = getattr(self, "generation", 0)
 		# size and sense initialization (may be set by GenerationAgent)
 		self.state.size = getattr(self, "init_size", None) or utils.random_size()
 		self.state.sense = getattr(self, "init_sense", None) or utils.random_sense()
@@ -309,10 +296,25 @@ class CreatureAgent(Agent):
 		period = 1.0
 		config = getattr(self, "config", None)
 		if config is not None:
-			period = getattr(config, "creature_period", period)
+			# con `tick_scale` > 1 cada reporte cubre varios ticks base (paso y gasto escalados)
+			period = getattr(config, "creature_period", period) * simulation.tick_scale(config)
 		# pequeño jitter para evitar sincronización excesiva
 		period = random.uniform(period * 0.9, period * 1.1)
-		self.add_behaviour(self.ReportBehav(period=period))
+		# la generación lo usa para extrapolar la posición entre reportes
+		self.state.period = period
+		self.base_period = period
+		# escala de tiempo global (normalmente la comparte GenerationAgent); el periodo con jitter
+		# queda como periodo base y la escala lo ajusta en cada cambio de velocidad
+		self.timescale = getattr(self, "timescale", None) or TimeScale()
+		report = self.ReportBehav(period=self.timescale.scaled(period))
+		self.timescale.subscribe(report, period)
+		self.report = report
+		# degradación vigente en la generación al crear la criatura
+		slow_down = getattr(self, "slow_down", None)
+		if slow_down:
+			self.apply_slow_down(slow_down)
+		# ReportBehav no recibe mensajes: sin plantilla acumularía una copia de cada uno
+		self.add_behaviour(report, no_messages())
 		self.add_behaviour(self.RecvBehav())
 
 
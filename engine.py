@@ -0,0 +1,339 @@
+"""Motor headless: ejecuta la simulación en proceso, sin agentes SPADE ni XMPP.
+
+Cada tick equivale a un periodo de `ReportBehav` para todas las criaturas activas:
+cada criatura se mueve y gasta energía (`simulation.step_*`) y su estado se resuelve de
+inmediato contra la comida y las demás criaturas, como haría `GenerationAgent.RecvBehav`
+al recibir el `status`. Con `tick_barrier` se mueven primero todas y el tick se resuelve
+por lotes (`resolve.resolve_tick`; con Numba instalado, las reclamaciones, la comida más
+cercana y el gasto de energía del lote salen de `kernels.py`). El fin de generación usa la misma etapa por lotes que el agente
+(`evolution.evaluate_generation`).
+"""
+import random
+import time
+
+import events
+import evolution
+import kernels
+import layouts
+import resolve
+import simulation
+import spatial
+from records import CreatureRecord
+from world import WorldConfig
+
+
+def food_cell(config):
+    """Lado de celda de la rejilla de comida: del orden del radio de detección."""
+    return max(getattr(config, "detection_radius", 1.0), 0.5)
+
+
+def creature_cell(config):
+    """Lado de celda de la rejilla de criaturas: del orden del radio de ataque máximo."""
+    return max(simulation.effective_attack_radius(getattr(config, "sense_max", 2.0), config), 0.5)
+
+
+class HeadlessWorld:
+    """Mundo simulado en un único bucle síncrono."""
+
+    def __init__(self, config=None, rng=None):
+        self.config = config or WorldConfig()
+        self.rng = rng or random.Random()
+        self.generation = 0
+        self.foods = []
+        self.food_grid = spatial.SpatialGrid()  # índice espacial de `foods` (clave = posición)
+        self.creatures = []  # CreatureState por índice
+        self.creature_grid = spatial.SpatialGrid()  # índice -> posición actual
+        self.prev = []  # inicio del último paso de cada criatura (para las pruebas barridas)
+        self.max_step = 0.0
+        self.targets = []  # objetivo actual por índice (comida más cercana) o None
+        self.active = set()  # índices de criaturas activas
+        self.killed = set()  # índices depredados en la generación actual
+        self.ticks = 0  # ticks de la generación actual
+        self.total_ticks = 0
+        self.last_eat_tick = 0
+        # regeneración de comida y plazo de la generación, en segundos simulados (ver `events.py`)
+        self.events = events.EventQueue()
+        self.deadline_reached = False
+        self.results = []  # (generation, GenerationResult, ticks, seconds)
+        # kernels compilados en el tick con barrera (ver `kernels.py`); sin Numba, rejillas incrementales
+        self.use_kernels = kernels.backend() == kernels.NUMBA
+        self._gen_started = time.perf_counter()
+
+    # --- ciclo de generación ----------------------------------------------------------
+
+    def spawn_generation(self, population=None):
+        """Crea la población de la generación siguiente (o la inicial si `population` es None)."""
+        cfg = self.config
+        self.generation += 1
+        self.foods = layouts.food_positions(cfg, cfg.food_count, cfg.space_size, self.rng)
+        self.food_grid = spatial.SpatialGrid.from_points(self.foods, food_cell(cfg))
+        if population is None:
+            rows = [(cfg.initial_speed, cfg.initial_energy, cfg.initial_size, cfg.initial_sense)] * cfg.num_initial
+        else:
+            rows = list(population.rows())
+        positions = layouts.spawn_positions(cfg, len(rows), cfg.space_size, self.rng)
+        self.creatures = []
+        for i, (speed, energy, size, sense) in enumerate(rows):
+            x, y = positions[i]
+            self.creatures.append(simulation.CreatureState(
+                jid=f"creature{self.generation}_{i}@localhost", speed=speed, energy=energy,
+                size=size, sense=sense, x=x, y=y, spawn_x=x, spawn_y=y, cid=i, generation=self.generation,
+            ))
+        self.targets = [None] * len(self.creatures)
+        self.creature_grid = spatial.SpatialGrid(creature_cell(cfg))
+        for i, st in enumerate(self.creatures):
+            self.creature_grid.insert(i, st.x, st.y)
+        self.prev = [(st.x, st.y) for st in self.creatures]
+        self.max_step = max((st.speed for st in self.creatures), default=0.0) * simulation.tick_scale(cfg)
+        self.active = set(range(len(self.creatures)))
+        self.killed = set()
+        self.ticks = 0
+        self.last_eat_tick = 0
+        self.events.clear()
+        self.deadline_reached = False
+        duration = getattr(cfg, "generation_duration", 0.0)
+        if duration > 0:
+            self.events.schedule(duration, events.DEADLINE)
+        interval = simulation.regrowth_interval(cfg, self.rng)
+        if interval is not None:
+            self.events.schedule(interval, events.REGROW)
+        self._gen_started = time.perf_counter()
+
+    def now(self):
+        """Tiempo simulado de la generación actual: ticks por periodo de reporte (escalado)."""
+        return self.ticks * self.config.creature_period * simulation.tick_scale(self.config)
+
+    def creatures_info(self):
+        """Registro con la misma forma que `GenerationAgent.creatures_info` (lista indexada por cid)."""
+        return [
+            CreatureRecord(
+                st.jid, speed=st.speed, energy=st.energy, size=st.size, sense=st.sense, x=st.x, y=st.y,
+                foods_eaten=st.foods_eaten, kills=st.kills, alive=i not in self.killed, cid=i,
+            )
+            for i, st in enumerate(self.creatures)
+        ]
+
+    def generation_over(self):
+        if not self.active or self.deadline_reached:
+            return True
+        # mismo criterio que el evento STARVE de GenerationAgent: sin comida y sin comer durante `last_eat_grace`
+        grace_ticks = self.config.last_eat_grace / max(self.config.creature_period * simulation.tick_scale(self.config), 1e-9)
+        return not self.foods and (self.ticks - self.last_eat_tick) > grace_ticks
+
+    def end_generation(self):
+        """Evalúa la generación actual y arranca la siguiente (o reinicia desde la 1)."""
+        result = evolution.evaluate_generation(self.creatures_info(), self.config, self.rng)
+        self.results.append((self.generation, result, self.ticks, time.perf_counter() - self._gen_started))
+        if len(result.next_population) == 0 or self.generation >= self.config.max_generations:
+            self.generation = 0
+            self.spawn_generation()
+        else:
+            self.spawn_generation(result.next_population)
+        return result
+
+    # --- tick ---------------------------------------------------------------------------
+
+    def tick(self):
+        """Avanza un tick todas las criaturas activas. Devuelve el número de activas."""
+        cfg = self.config
+        self._run_events()
+        if getattr(cfg, "tick_barrier", False):
+            return self._tick_barrier()
+        for i in sorted(self.active):
+            if i not in self.active:
+                continue  # depredada durante este tick
+            st = self.creatures[i]
+            self.prev[i] = (st.x, st.y)
+            simulation.update_goal(st)
+            if st.returning_home:
+                if simulation.step_home(st, cfg):
+                    self.active.discard(i)
+                    self.creature_grid.remove(i)
+                    continue
+            else:
+                simulation.step_forage(st, self.targets[i], cfg.space_size, cfg, self.rng)
+            self.creature_grid.move(i, st.x, st.y)
+            self._resolve_status(i)
+            if st.energy <= 0:
+                self.active.discard(i)
+                self.creature_grid.remove(i)
+        self.ticks += 1
+        self.total_ticks += 1
+        return len(self.active)
+
+    def _run_events(self):
+        """Aplica los eventos vencidos (como `GenerationAgent.EventBehav`, sin esperas)."""
+        cfg = self.config
+        for event in self.events.pop_due(self.now()):
+            kind = event.kind
+            if kind == events.DEADLINE:
+                self.deadline_reached = True
+                continue
+            if kind == events.REGROW:
+                interval = simulation.regrowth_interval(cfg, self.rng)
+                if interval is not None:
+                    self.events.schedule(event.time + interval, events.REGROW)
+                fpos = simulation.regrowth_position(cfg, cfg.space_size, self.rng)
+            elif kind == events.RESPAWN:
+                fpos = event.data
+            else:
+                continue
+            if len(self.foods) < simulation.food_capacity(cfg, cfg.food_count):
+                self.foods.append(fpos)
+                self.food_grid.insert(fpos, fpos[0], fpos[1])
+
+    def _tick_barrier(self):
+        """Tick con barrera: se mueven todas las activas y después se resuelve el lote completo."""
+        cfg = self.config
+        swept = getattr(cfg, "swept_collisions", True)
+        batched = self.use_kernels
+        movers = []
+        foragers = []  # (índice, seeking) con el gasto de energía pendiente (`kernels.drain`)
+        for i in sorted(self.active):
+            st = self.creatures[i]
+            self.prev[i] = (st.x, st.y)
+            simulation.update_goal(st)
+            if st.returning_home:
+                if simulation.step_home(st, cfg):
+                    self.active.discard(i)
+                    self.creature_grid.remove(i)
+                    continue
+            else:
+                seeking = simulation.step_forage(st, self.targets[i], cfg.space_size, cfg, self.rng, drain=not batched)
+                if batched:
+                    foragers.append((i, seeking))
+            self.creature_grid.move(i, st.x, st.y)
+            x0, y0 = self.prev[i] if swept else (st.x, st.y)
+            movers.append((i, x0, y0, st.x, st.y, st.size, st.sense))
+        if batched:
+            self._drain(foragers)
+            outcome = resolve.apply_claims(self._batched_claims(movers, swept), cfg)
+        else:
+            outcome = resolve.resolve_tick(movers, self.food_grid, lambda m: self._candidates(m[0], (m[1], m[2]), (m[3], m[4]), swept), cfg)
+        for kind, i, target, _ in outcome:
+            if kind == resolve.EAT:
+                self._eat(i, target)
+            else:
+                self._kill(i, target)
+        survivors = [i for i, *_ in movers if i in self.active]
+        if batched:
+            self._batched_targets(survivors)
+        for i in survivors:
+            st = self.creatures[i]
+            if not batched:
+                self.targets[i] = self.food_grid.nearest(st.x, st.y)
+            if st.energy <= 0:
+                self.active.discard(i)
+                self.creature_grid.remove(i)
+        self.ticks += 1
+        self.total_ticks += 1
+        return len(self.active)
+
+    def _drain(self, foragers):
+        """Gasto de energía del tick de las criaturas que buscaron comida, en un solo kernel."""
+        if not foragers:
+            return
+        cfg = self.config
+        creatures = [self.creatures[i] for i, _ in foragers]
+        scale = simulation.tick_scale(cfg)
+        energy = kernels.drain(
+            [st.energy for st in creatures], [st.size for st in creatures], [st.speed for st in creatures],
+            [st.sense for st in creatures], [seeking for _, seeking in foragers], [scale * st.throttle for st in creatures], cfg,
+        )
+        for st, e in zip(creatures, energy):
+            st.energy = e
+
+    def _batched_claims(self, movers, swept):
+        """Reclamaciones de `resolve.claims` de todo el lote, calculadas con `kernels.py`."""
+        if not movers:
+            return []
+        cfg = self.config
+        keys, x0, y0, x1, y1, size, sense = zip(*movers)
+        foods = self.foods
+        hits = kernels.segment_hits([f[0] for f in foods], [f[1] for f in foods], x0, y0, x1, y1, cfg.detection_radius, food_cell(cfg))
+        pending = [(t, resolve.EAT, d, keys[q], foods[j]) for q, j, d, t in zip(*hits)]
+        kills = kernels.predation_claims(x0, y0, x1, y1, size, sense, self.max_step if swept else 0.0, cfg)
+        pending.extend((t, resolve.KILL, d, keys[p], keys[j]) for p, j, d, t in zip(*kills))
+        return pending
+
+    def _batched_targets(self, survivors):
+        """Comida más cercana de las supervivientes del tick, en un solo kernel."""
+        foods = self.foods
+        if not foods:
+            for i in survivors:
+                self.targets[i] = None
+            return
+        creatures = self.creatures
+        nearest = kernels.nearest(
+            [f[0] for f in foods], [f[1] for f in foods],
+            [creatures[i].x for i in survivors], [creatures[i].y for i in survivors], food_cell(self.config),
+        )
+        for i, j in zip(survivors, nearest):
+            self.targets[i] = foods[j]
+
+    def _resolve_status(self, i):
+        """Equivalente a procesar el `status` de la criatura `i` en GenerationAgent."""
+        cfg = self.config
+        st = self.creatures[i]
+        pos = (st.x, st.y)
+        # con `swept_collisions` se prueba el camino del tick y no solo el punto final
+        swept = getattr(cfg, "swept_collisions", True)
+        start = self.prev[i] if swept else pos
+        for fpos in simulation.find_foods_swept(start, pos, self.food_grid, cfg.detection_radius, simulation.foods_per_tick(cfg)):
+            self._eat(i, fpos)
+        for j, _ in simulation.swept_predation_targets((start[0], start[1], pos[0], pos[1]), st.size, st.sense, self._candidates(i, start, pos, swept), cfg):
+            self._kill(i, j)
+        self.targets[i] = self.food_grid.nearest(pos[0], pos[1])
+
+    def _candidates(self, i, start, pos, swept=True):
+        """(j, x0, y0, x1, y1, size) de las posibles presas del paso start -> pos de `i` (rejilla)."""
+        creatures = self.creatures
+        prev = self.prev if swept else None
+        reach = simulation.effective_attack_radius(creatures[i].sense, self.config) + (self.max_step if prev is not None else 0.0)
+        near = sorted(j for j, _, _ in self.creature_grid.query_segment(start[0], start[1], pos[0], pos[1], reach) if j != i)
+        return [
+            (j, *(prev[j] if prev is not None else (creatures[j].x, creatures[j].y)), creatures[j].x, creatures[j].y, creatures[j].size)
+            for j in near
+        ]
+
+    def _eat(self, i, fpos):
+        cfg = self.config
+        st = self.creatures[i]
+        self.foods.remove(fpos)
+        self.food_grid.remove(fpos)
+        self.last_eat_tick = self.ticks
+        if cfg.food_regrowth_delay > 0:
+            self.events.schedule(self.now() + cfg.food_regrowth_delay, events.RESPAWN, fpos)
+        st.foods_eaten += 1
+        st.energy += simulation.food_energy_gain(st.size, cfg)
+
+    def _kill(self, i, j):
+        st = self.creatures[i]
+        prey = self.creatures[j]
+        self.active.discard(j)
+        self.killed.add(j)
+        self.creature_grid.remove(j)
+        prey.foods_eaten = 0
+        prey.energy = 0
+        st.foods_eaten += 1
+        st.energy += simulation.prey_energy_gain(prey.size, self.config)
+        st.kills += 1
+
+    def step(self):
+        """Un tick; si la generación terminó, la evalúa y arranca la siguiente."""
+        if self.generation == 0:
+            self.spawn_generation()
+        self.tick()
+        if self.generation_over():
+            self.end_generation()
+
+    def run(self, generations):
+        """Ejecuta `generations` generaciones completas. Devuelve los resultados acumulados."""
+        if self.generation == 0:
+            self.spawn_generation()
+        target = len(self.results) + generations
+        while len(self.results) < target:
+            self.tick()
+            if self.generation_over():
+                self.end_generation()
+        return self.results
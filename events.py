@@ -0,0 +1,88 @@
+"""Cola de eventos discretos del mundo (regeneración de comida, plazos y finales diferidos).
+
+`EventQueue` es un heap ordenado por instante simulado: programar y extraer cuestan
+O(log n) y el siguiente plazo se consulta en O(1), de modo que quien la consume
+(`GenerationAgent.EventBehav`, `engine.HeadlessWorld`) solo despierta cuando vence el
+siguiente evento en lugar de sondear el estado cada segundo. Cancelar es perezoso: el
+evento se marca y se descarta al llegar a la cima del heap.
+"""
+import heapq
+import itertools
+
+# tipos de evento
+REGROW = "regrow"  # aparece un pellet nuevo (tasa `food_regrowth_rate`) y se programa el siguiente
+RESPAWN = "respawn"  # reaparece un pellet comido en su sitio (`food_regrowth_delay`); data = (x, y)
+STARVE = "starve"  # plazo `last_eat_grace` sin comida: fin de generación si sigue sin haber
+DEADLINE = "deadline"  # plazo `generation_duration` de la generación
+END = "end"  # cierre diferido de la generación (tras avisar a las criaturas)
+
+
+class Event:
+    __slots__ = ("time", "kind", "data", "cancelled", "queued")
+
+    def __init__(self, time, kind, data=None):
+        self.time = time
+        self.kind = kind
+        self.data = data
+        self.cancelled = False
+        self.queued = True  # sigue en la cola (ni extraído ni cancelado)
+
+    def __repr__(self):
+        return f"Event({self.time:.3f}, {self.kind!r}, {self.data!r})"
+
+
+class EventQueue:
+    """Heap de `Event` por instante; a igual instante, en orden de programación."""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._live = 0
+        # se incrementa en cada `clear`: quien procesa una lista de `pop_due` deja de hacerlo
+        # si la cola se vació a mitad (p.ej. un END que arranca la generación siguiente)
+        self.epoch = 0
+
+    def __len__(self):
+        return self._live
+
+    def schedule(self, time, kind, data=None):
+        """Programa `kind` en el instante simulado `time`. Devuelve el `Event` (para cancelarlo)."""
+        event = Event(float(time), kind, data)
+        heapq.heappush(self._heap, (event.time, next(self._seq), event))
+        self._live += 1
+        return event
+
+    def cancel(self, event):
+        if event is not None and not event.cancelled:
+            event.cancelled = True
+            if event.queued:
+                event.queued = False
+                self._live -= 1
+
+    def clear(self):
+        """Descarta todos los eventos pendientes."""
+        for _, _, event in self._heap:
+            event.cancelled = True
+            event.queued = False
+        self._heap = []
+        self._live = 0
+        self.epoch += 1
+
+    def next_time(self):
+        """Instante del próximo evento pendiente, o None si no hay."""
+        heap = self._heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now):
+        """Lista de los eventos con instante <= now, en orden, retirados de la cola."""
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            event = heapq.heappop(heap)[2]
+            if not event.cancelled:
+                event.queued = False
+                self._live -= 1
+                due.append(event)
+        return due
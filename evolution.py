@@ -0,0 +1,332 @@
+"""Etapa de selección y reproducción por lotes para el fin de generación.
+
+La población se representa en columnas (un `array` por rasgo) y cada etapa
+(clasificación, estadísticas, descendencia) se resuelve en una sola pasada
+sobre esas columnas en lugar de iterar dicts por criatura.
+"""
+import heapq
+import random
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import utils
+
+TRAITS = ("speed", "size", "sense")
+
+# códigos de clasificación por individuo
+DEATH = 0
+SURVIVOR = 1
+REPRODUCER = 2
+
+
+class Population:
+    """Población columnar: rasgos, comida, kills y estado por índice."""
+
+    def __init__(self, bases=None, speed=None, size=None, sense=None, energy=None, foods=None, kills=None, alive=None):
+        self.bases = list(bases or [])
+        self.speed = array("d", speed or [])
+        self.size = array("d", size or [])
+        self.sense = array("d", sense or [])
+        self.energy = array("d", energy or [])
+        self.foods = array("l", foods or [])
+        self.kills = array("l", kills or [])
+        self.alive = array("b", alive or [])
+
+    def __len__(self):
+        return len(self.speed)
+
+    @classmethod
+    def from_creatures_info(cls, creatures_info, config=None):
+        """Construye la población a partir del registro `creatures_info` de GenerationAgent.
+
+        `creatures_info` puede ser la lista indexada por cid (las bases son entonces los
+        cids) o un dict clave -> registro. Los rasgos ausentes se completan con los
+        valores iniciales de `config` (solo para las entradas que realmente no los tienen).
+        """
+        items = list(creatures_info.items() if hasattr(creatures_info, "items") else enumerate(creatures_info))
+        infos = [info for _, info in items]
+        pop = cls(bases=[base for base, _ in items])
+        for trait in TRAITS:
+            default = getattr(config, f"initial_{trait}", 1.0) if config is not None else 1.0
+            column = [info.get(trait) for info in infos]
+            getattr(pop, trait).extend(default if v is None else float(v) for v in column)
+        pop.energy.extend(float(info.get("energy") or 0.0) for info in infos)
+        pop.foods.extend(int(info.get("foods_eaten", 0) or 0) for info in infos)
+        pop.kills.extend(int(info.get("kills", 0) or 0) for info in infos)
+        pop.alive.extend(1 if info.get("alive", True) else 0 for info in infos)
+        return pop
+
+    def rows(self):
+        """Itera tuplas (speed, energy, size, sense) listas para `spawn_generation`."""
+        return zip(self.speed, self.energy, self.size, self.sense)
+
+
+def classify(pop):
+    """Clasifica cada individuo como DEATH, SURVIVOR o REPRODUCER.
+
+    - muerto (depredado) o sin comida -> DEATH
+    - 1 comida -> SURVIVOR
+    - 2 o más comidas -> REPRODUCER (sobrevive y deja un hijo)
+    """
+    return array("b", (
+        DEATH if (not alive or foods == 0) else (SURVIVOR if foods == 1 else REPRODUCER)
+        for alive, foods in zip(pop.alive, pop.foods)
+    ))
+
+
+def percentile(sorted_values, q):
+    """Percentil `q` (0-100) con interpolación lineal sobre valores ya ordenados."""
+    n = len(sorted_values)
+    if n == 0:
+        return 0.0
+    if n == 1:
+        return float(sorted_values[0])
+    pos = (n - 1) * (q / 100.0)
+    lo = int(pos)
+    hi = min(lo + 1, n - 1)
+    frac = pos - lo
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * frac
+
+
+def column_stats(values, percentiles=(10, 50, 90)):
+    """Media y percentiles de una columna numérica."""
+    n = len(values)
+    if n == 0:
+        out = {"mean": 0.0}
+        out.update({f"p{q}": 0.0 for q in percentiles})
+        return out
+    ordered = sorted(values)
+    out = {"mean": sum(values) / n}
+    out.update({f"p{q}": percentile(ordered, q) for q in percentiles})
+    return out
+
+
+def draw_random_traits(n, config=None, rng=random):
+    """Genera `n` individuos con rasgos aleatorios en una pasada.
+
+    Devuelve una `Population` con speed/size/sense uniformes en los rangos de `config`
+    y energía inicial inversa a la velocidad.
+    """
+    size_min = getattr(config, "size_min", 0.6)
+    size_max = getattr(config, "size_max", 1.8)
+    sense_min = getattr(config, "sense_min", 0.0)
+    sense_max = getattr(config, "sense_max", 2.0)
+    uniform = rng.uniform
+    batch = Population()
+    batch.speed.extend(uniform(0.5, 2.0) for _ in range(n))
+    batch.size.extend(uniform(size_min, size_max) for _ in range(n))
+    batch.sense.extend(uniform(sense_min, sense_max) for _ in range(n))
+    batch.energy.extend(utils.default_energy_for_speed(s) for s in batch.speed)
+    return batch
+
+
+def trait_bounds(config=None):
+    """Límites (min, max) de cada rasgo; `None` indica sin límite."""
+    return {
+        "speed": (getattr(config, "min_speed", 0.1), None),
+        "size": (getattr(config, "size_min", 0.6), getattr(config, "size_max", 1.8)),
+        "sense": (getattr(config, "sense_min", 0.0), getattr(config, "sense_max", 2.0)),
+    }
+
+
+def _clamp(v, lo, hi):
+    if lo is not None and v < lo:
+        return lo
+    if hi is not None and v > hi:
+        return hi
+    return v
+
+
+def _mutated(values, sigma, bounds, rng):
+    """Aplica ruido gaussiano N(0, sigma) a una columna y la recorta a `bounds`."""
+    lo, hi = bounds
+    if sigma <= 0:
+        return [_clamp(v, lo, hi) for v in values]
+    gauss = rng.gauss
+    return [_clamp(v + gauss(0.0, sigma), lo, hi) for v in values]
+
+
+# Operadores genéticos: reciben la población evaluada, los índices de los padres
+# reproductores, la configuración y el RNG, y devuelven la `Population` de hijos
+# (un hijo por padre). Se seleccionan con `WorldConfig.reproduction_operator`.
+
+def op_random(pop, parents, config=None, rng=random):
+    """Hijos con rasgos completamente aleatorios (comportamiento original, sin herencia)."""
+    return draw_random_traits(len(parents), config, rng)
+
+
+def op_gaussian(pop, parents, config=None, rng=random):
+    """Herencia directa del padre con mutación gaussiana por rasgo, recortada a los límites."""
+    bounds = trait_bounds(config)
+    children = Population()
+    for trait in TRAITS:
+        column = getattr(pop, trait)
+        sigma = getattr(config, f"mutation_sigma_{trait}", 0.0)
+        getattr(children, trait).extend(_mutated([column[i] for i in parents], sigma, bounds[trait], rng))
+    children.energy.extend(utils.default_energy_for_speed(s) for s in children.speed)
+    return children
+
+
+def op_crossover(pop, parents, config=None, rng=random):
+    """Cruce aritmético con otro reproductor elegido al azar, seguido de mutación gaussiana.
+
+    Cada rasgo del hijo es `w * padre + (1 - w) * pareja` con `w ~ U(0, 1)` por rasgo.
+    """
+    if not parents:
+        return Population()
+    bounds = trait_bounds(config)
+    mates = [parents[rng.randrange(len(parents))] for _ in parents]
+    children = Population()
+    for trait in TRAITS:
+        column = getattr(pop, trait)
+        blended = []
+        for a, b in zip(parents, mates):
+            w = rng.random()
+            blended.append(w * column[a] + (1.0 - w) * column[b])
+        sigma = getattr(config, f"mutation_sigma_{trait}", 0.0)
+        getattr(children, trait).extend(_mutated(blended, sigma, bounds[trait], rng))
+    children.energy.extend(utils.default_energy_for_speed(s) for s in children.speed)
+    return children
+
+
+OPERATORS = {
+    "random": op_random,
+    "gaussian": op_gaussian,
+    "crossover": op_crossover,
+}
+
+
+def get_operator(config=None):
+    """Devuelve el operador configurado en `config.reproduction_operator`."""
+    name = getattr(config, "reproduction_operator", "gaussian")
+    try:
+        return OPERATORS[name]
+    except KeyError:
+        raise ValueError(f"Operador de reproducción desconocido: {name!r} (opciones: {', '.join(OPERATORS)})")
+
+
+# Capacidad de carga: cuando supervivientes + hijos superan `WorldConfig.carrying_capacity`
+# se eligen las plazas de la siguiente generación. Cada superviviente ocupa una plaza y
+# cada reproductor aporta además la plaza de su hijo, que compite con la aptitud del padre.
+
+def fitness(pop, i):
+    """Aptitud del individuo `i` para la selección: (comidas, kills, energía), en orden lexicográfico."""
+    return (pop.foods[i], pop.kills[i], pop.energy[i])
+
+
+def select_topk(pop, slots, k, config=None, rng=random):
+    """Las `k` plazas de mayor aptitud con un heap acotado (O(N log k)); en empate gana la primera."""
+    return heapq.nlargest(k, slots, key=lambda slot: fitness(pop, slot[1]))
+
+
+def select_tournament(pop, slots, k, config=None, rng=random):
+    """`k` torneos sin reemplazo de `config.tournament_size` plazas al azar; gana la de mayor aptitud (O(k·t))."""
+    size = max(1, int(getattr(config, "tournament_size", 3)))
+    remaining = list(slots)
+    chosen = []
+    for _ in range(min(k, len(remaining))):
+        best = max((rng.randrange(len(remaining)) for _ in range(size)), key=lambda j: fitness(pop, remaining[j][1]))
+        chosen.append(remaining[best])
+        # quitar la plaza ganadora en O(1): intercambiar con la última
+        remaining[best] = remaining[-1]
+        remaining.pop()
+    return chosen
+
+
+SELECTIONS = {
+    "topk": select_topk,
+    "tournament": select_tournament,
+}
+
+
+def apply_capacity(pop, keep, parents, config=None, rng=random):
+    """Recorta supervivientes y reproductores para que la siguiente generación quepa en la capacidad.
+
+    Devuelve `(keep, parents)` con los índices que conservan su plaza (en el orden
+    original); sin capacidad configurada o sin excederla se devuelven sin cambios.
+    """
+    capacity = int(getattr(config, "carrying_capacity", 0) or 0)
+    if capacity <= 0 or len(keep) + len(parents) <= capacity:
+        return keep, parents
+    name = getattr(config, "capacity_selection", "topk")
+    try:
+        select = SELECTIONS[name]
+    except KeyError:
+        raise ValueError(f"Selección por capacidad desconocida: {name!r} (opciones: {', '.join(SELECTIONS)})")
+    # (0, i) = plaza del superviviente i, (1, i) = plaza del hijo de i; los padres van primero
+    slots = [(0, i) for i in keep] + [(1, i) for i in parents]
+    chosen = select(pop, slots, capacity, config, rng)
+    kept = sorted(i for kind, i in chosen if kind == 0)
+    bred = sorted(i for kind, i in chosen if kind == 1)
+    return kept, bred
+
+
+@dataclass
+class GenerationResult:
+    """Resultado de evaluar una generación completa."""
+    initial: int = 0
+    deaths: int = 0
+    survivors: int = 0
+    reproducers: int = 0
+    survivors_bases: List[str] = field(default_factory=list)
+    reproducers_bases: List[str] = field(default_factory=list)
+    # plazas descartadas por `carrying_capacity` (supervivientes + hijos no incluidos)
+    culled: int = 0
+    # población de la siguiente generación (padres supervivientes + hijos)
+    next_population: Population = field(default_factory=Population)
+    # rasgo -> {"mean", "p10", "p50", "p90"}; también "foods"
+    stats: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+def evaluate_generation(creatures_info, config=None, rng=random):
+    """Clasifica la población, calcula estadísticas y genera la siguiente generación.
+
+    Los supervivientes conservan speed/size/sense y reinician su energía al valor por
+    defecto para su velocidad; cada reproductor añade además un hijo generado por el
+    operador genético configurado (ver `OPERATORS`), justo detrás de él en la siguiente
+    generación. Si el total supera
+    `config.carrying_capacity`, las plazas se eligen antes de generar los hijos (ver
+    `apply_capacity`).
+    """
+    operator = get_operator(config)
+    pop = Population.from_creatures_info(creatures_info, config)
+    codes = classify(pop)
+    keep = [i for i, c in enumerate(codes) if c != DEATH]
+    parents = [i for i, c in enumerate(codes) if c == REPRODUCER]
+
+    result = GenerationResult(initial=len(pop))
+    result.survivors = len(keep)
+    result.reproducers = len(parents)
+    result.deaths = len(pop) - len(keep)
+    result.survivors_bases = [pop.bases[i] for i in keep]
+    result.reproducers_bases = [pop.bases[i] for i in parents]
+    result.stats = {trait: column_stats(getattr(pop, trait)) for trait in TRAITS}
+    result.stats["foods"] = column_stats(pop.foods)
+
+    capped_keep, capped_parents = apply_capacity(pop, keep, parents, config, rng)
+    result.culled = len(keep) + len(parents) - len(capped_keep) - len(capped_parents)
+    keep, parents = capped_keep, capped_parents
+
+    # orden de la generación original: cada superviviente seguido de su hijo (si lo tiene);
+    # determina el punto de spawn y el cid de cada individuo en la siguiente generación
+    children = operator(pop, parents, config, rng)
+    child_of = {parent: k for k, parent in enumerate(parents)}
+    kept = set(keep)
+    order = []  # (columna de origen, índice)
+    for i in sorted(kept.union(child_of)):
+        if i in kept:
+            order.append((pop, i))
+        if i in child_of:
+            order.append((children, child_of[i]))
+
+    nxt = Population()
+    nxt.bases = [pop.bases[i] for i in keep]
+    for trait in TRAITS:
+        getattr(nxt, trait).extend(getattr(src, trait)[i] for src, i in order)
+    nxt.energy.extend(
+        utils.default_energy_for_speed(src.speed[i]) if src is pop else children.energy[i]
+        for src, i in order
+    )
+    result.next_population = nxt
+    return result
@@ -1,16 +1,31 @@
 import asyncio
 import csv
+import dataclasses
 import json
+import math
 import os
 import random
 import time
 import utils
+import evolution
+import events
+import layouts
+import checkpoint
+import reports
+import simulation
+import spatial
+import replay
+import tracing
+import backpressure
+import resolve
+from records import CreatureRecord, from_registry, jid_base
+from stats import LiveStats
 from world import WorldConfig
-from spade.agent import Agent
-from spade.behaviour import CyclicBehaviour, PeriodicBehaviour
-from spade.message import Message
+from timescale import TimeScale
+from transport import Agent, CyclicBehaviour, PeriodicBehaviour, Message, no_messages
 
 from creatureAgent import CreatureAgent
+from engine import creature_cell, food_cell
 from logger_setup import get_logger
 
 logger = get_logger('generation')
@@ -33,41 +48,102 @@ class GenerationAgent(Agent):
 
         # configuración del mundo (valores por defecto)
         self.config = WorldConfig()
+        # escala de tiempo global compartida con las criaturas (ver `timescale.py`)
+        self.timescale = TimeScale(self.config.time_scale)
 
         # Estado runtime
         self.generation = 0
+        # generaciones evaluadas desde el arranque, incluidos los reinicios (ver `benchmarks/soak.py`)
+        self.generations_completed = 0
         self.foods = []  # list of (x,y)
-        self.creatures_info = {}  # jid -> {foods_eaten, alive}
-        self.active_creature_jids = set()
-        self.last_eat_time = time.time()
+        # se incrementa en cada cambio de `foods` (caché de /fishes en HostAgent)
+        self.foods_version = 0
+        # tablas internas indexadas por el id entero denso (cid) asignado al spawn;
+        # los jids solo se usan para direccionar mensajes XMPP
+        self.creatures_info = []  # cid -> CreatureRecord (ver `records.py`)
+        self.active_cids = set()
+        self.cid_by_jid = {}  # jid -> cid, solo para mensajes que llegan sin `cid`
+        # reporte adaptativo (ver `simulation.quiet_ticks`): por cid, instante del último status,
+        # punto de spawn y movimiento conocido (t0, x, y, tx, ty, speed, period) de las criaturas
+        # que avanzan sin reportar; `food_watchers` comida -> cids en silencio que van hacia ella
+        self.last_report = []
+        self.spawn_points = []
+        self.motion = {}
+        self.food_watchers = {}
+        # índices espaciales (ver `spatial.py`): comida (clave = posición) y criaturas vivas
+        # (cid -> última posición conocida). `prev_pos` guarda el inicio del último paso de cada
+        # cid para las pruebas barridas
+        self.food_grid = spatial.SpatialGrid()
+        self.creature_grid = spatial.SpatialGrid()
+        self.prev_pos = {}
+        self.max_step = 0.0
+        # eventos con plazo (regeneración de comida, fin por hambre o por duración, cierre
+        # diferido); `EventBehav` duerme hasta que vence el siguiente (ver `events.py`)
+        self.events = events.EventQueue()
+        self.events_changed = asyncio.Event()
+        # agregados incrementales de la generación (ver `stats.py`; los expone `/stats`)
+        self.stats = LiveStats(self.config)
+        # instante (reloj simulado) de la última comida consumida
+        self.last_eat_time = self.timescale.now()
         # referencias a agentes spawnados para apagado ordenado
         self.spawned_agents = []
-        # mapa jid_full -> agent para control directo (uso en depredación)
+        # mapa cid -> agent para control directo (uso en depredación)
         self.spawned_map = {}
         # flag para evitar llamadas reentrantes a _end_generation
         self._ending = False
+        # modo barrera (`config.tick_barrier`): cid -> [inicio del camino, posición, status] del tick en
+        # curso, resueltos por lotes en `BarrierBehav` (se crea en setup)
+        self.tick_moves = {}
+        self.barrier = None
         # flag para señalar que se deben enviar mensajes de inicio
         self.pending_start_signal = False
-            # archivos CSV para reportes
-            # crear directorio de reportes y rutas de archivos CSV
-        self.report_dir = os.path.join(os.path.dirname(__file__), "report")
+        # directorio de reportes (CSV, checkpoint, replay, perfiles); ver `set_report_dir`
+        self.set_report_dir(os.path.join(os.path.dirname(__file__), "report"))
+        # si se fija (p.ej. `hostAgent.py --resume`), setup() continúa desde este checkpoint
+        self.resume_checkpoint = None
+        # estado leído de `resume_checkpoint` (ver `load_resume_state`)
+        self._resume_state = None
+        # grabador de replay (se crea en setup si `config.record_replay`)
+        self.recorder = None
+        # instante (reloj simulado) en que arrancó la generación actual
+        self.generation_t0 = 0.0
+        # perfilador por generación (se crea en setup si `config.profile_generations`)
+        self.profiler = None
+        # backpressure del buzón de RecvBehav (se recrea en setup con la configuración definitiva)
+        self.shedder = backpressure.LoadShedder.from_config(self.config)
+        # trazas de mensajes compartidas con criaturas y host (se crea en setup si `config.trace_messages`)
+        self.tracer = None
+        # si se fija, se llama con (generation, GenerationResult, segundos simulados) al evaluar
+        # cada generación (ver `runner.py`)
+        self.on_generation = None
+
+    def set_report_dir(self, directory):
+        """Fija el directorio de reportes y las rutas de los CSV y del checkpoint (antes de `start`)."""
+        self.report_dir = directory
         os.makedirs(self.report_dir, exist_ok=True)
         self.summary_file = os.path.join(self.report_dir, "generation_summary.csv")
         # CSV file for per-creature details (appended each generation)
         self.details_file = os.path.join(self.report_dir, "generation_details.csv")
         # CSV file for predation events
         self.predation_file = os.path.join(self.report_dir, "predation_events.csv")
+        # checkpoint binario del último límite de generación
+        self.checkpoint_file = checkpoint.checkpoint_path(self.report_dir)
 
     # colocación de comida y cálculos de distancia delegados a `utils`
 
     async def spawn_generation(self, spawn_list=None):
         """Crea y arranca las criaturas para la generación actual.
 
-        spawn_list: None para generación inicial; si es lista de dicts, cada dict debe
-        contener 'speed' y 'energy' para el nuevo individuo.
+        spawn_list: None para generación inicial; si es una `evolution.Population`, cada fila
+        (speed, energy, size, sense) define un individuo; también se aceptan listas de dicts
+        con 'speed' y 'energy' (y opcionalmente 'size'/'sense').
         """
         self.generation += 1
-        self.foods = utils.place_food(self.food_count, self.space_size)
+        if self.profiler is not None:
+            self.profiler.start(self.generation)
+        if self.tracer is not None:
+            self.tracer.begin_generation(self.generation)
+        self._set_foods(layouts.food_positions(self.config, self.food_count, self.space_size))
         # notify host UI that a new generation starts so it can clear previous creatures
         try:
             host_j = getattr(self, "host_jid", None)
@@ -78,8 +154,15 @@ class GenerationAgent(Agent):
                 await self.send(nm)
         except Exception:
             pass
-        self.creatures_info = {}
-        self.active_creature_jids = set()
+        self.creatures_info = []
+        self.active_cids = set()
+        self.cid_by_jid = {}
+        self.spawned_map = {}
+        self.motion = {}
+        self.food_watchers = {}
+        self.tick_moves = {}
+        self.stats = LiveStats(self.config, getattr(self.config, "stats_bins", 10))
+        self.stats.reset(self.generation)
 
         to_spawn = []
         if spawn_list is None:
@@ -108,13 +191,19 @@ class GenerationAgent(Agent):
                     size = utils.random_size()
                     sense = utils.random_sense()
                     to_spawn.append((speed, energy, size, sense))
+        elif isinstance(spawn_list, evolution.Population):
+            to_spawn = list(spawn_list.rows())
         else:
             for spec in spawn_list:
                 speed = spec.get("speed")
                 energy = spec.get("energy")
                 # preserve size and sense when provided; otherwise randomize
-                size = spec.get("size", utils.random_size())
-                sense = spec.get("sense", utils.random_sense())
+                size = spec.get("size")
+                if size is None:
+                    size = utils.random_size()
+                sense = spec.get("sense")
+                if sense is None:
+                    sense = utils.random_sense()
                 to_spawn.append((speed, energy, size, sense))
 
         print(f"Generation {self.generation}: spawning {len(to_spawn)} creatures, food={len(self.foods)}")
@@ -123,11 +212,15 @@ class GenerationAgent(Agent):
         except Exception:
             pass
 
-        # Calcular posiciones en el borde con distribución equidistante
-        spawn_positions = utils.spawn_positions_on_perimeter(len(to_spawn), self.space_size)
+        # posiciones de spawn según `config.spawn_layout` (por defecto equidistantes en el borde)
+        spawn_positions = layouts.spawn_positions(self.config, len(to_spawn), self.space_size)
+        self.spawn_points = list(spawn_positions)
+        self.last_report = [self.timescale.now()] * len(to_spawn)
 
         # arrancar agentes criatura (crear todos primero, luego iniciarlos en paralelo)
         agents_to_start = []
+        # las criaturas se registran en el mismo dominio XMPP que la generación
+        domain = str(self.jid).split("/")[0].split("@")[-1]
         i = 0
         for tup in to_spawn:
             if len(tup) >= 4:
@@ -136,8 +229,7 @@ class GenerationAgent(Agent):
                 speed, energy = tup[0], tup[1]
                 size = utils.random_size()
                 sense = utils.random_sense()
-            jid_base = f"creature{self.generation}_{i}"
-            jid = f"{jid_base}@localhost"
+            jid = f"creature{self.generation}_{i}@{domain}"
             passwd = "123456abcd."
             agent = CreatureAgent(jid, passwd)
             agent.init_speed = speed
@@ -151,12 +243,22 @@ class GenerationAgent(Agent):
             # Usar posición del borde en lugar de aleatoria
             agent.init_x, agent.init_y = spawn_positions[i]
             agent.config = self.config
-            self.spawned_map[jid] = agent
-            self.creatures_info[jid_base] = {"jid_full": jid, "foods_eaten": 0, "alive": True, "speed": speed, "energy": energy, "size": size, "sense": sense, "x": agent.init_x, "y": agent.init_y, "kills": 0}
-            self.active_creature_jids.add(jid)
+            agent.timescale = self.timescale
+            agent.tracer = self.tracer
+            agent.slow_down = self.shedder.control() if self.shedder.level else None
+            # id entero denso: índice de la criatura en las tablas de esta generación
+            agent.cid = i
+            agent.generation = self.generation
+            self.spawned_map[i] = agent
+            self.creatures_info.append(CreatureRecord(jid, speed=speed, energy=energy, size=size, sense=sense, x=agent.init_x, y=agent.init_y, cid=i))
+            self.cid_by_jid[jid] = i
+            self.active_cids.add(i)
+            self.stats.spawn(i, speed, size, sense, energy)
             self.spawned_agents.append(agent)
             agents_to_start.append((agent, jid, speed, energy, size, sense))
             i += 1
+        self._index_creatures()
+        self._schedule_generation_events()
         
         async def start_agent(agent_info):
             agent, jid, speed, energy, size, sense = agent_info
@@ -167,10 +269,16 @@ class GenerationAgent(Agent):
             except Exception:
                 pass
         
+        # abrir la generación en el replay antes de arrancar a las criaturas
+        self.generation_t0 = self.timescale.now()
+        if self.recorder is not None:
+            creatures = [{"jid": info.jid, "jid_base": jid_base(info.jid), "speed": info.speed, "size": info.size, "sense": info.sense, "energy": info.energy} for info in self.creatures_info]
+            self.recorder.begin_generation(self.generation, self.space_size, creatures, self.foods)
+
         await asyncio.gather(*[start_agent(info) for info in agents_to_start])
         
         # Esperar un momento para que todas las criaturas se registren completamente
-        await asyncio.sleep(0.5)
+        await self.timescale.sleep(0.5)
         
         # Marcar que se debe enviar señal de inicio (el behaviour lo hará)
         print(f"All creatures spawned. Signaling start...")
@@ -182,217 +290,75 @@ class GenerationAgent(Agent):
             if getattr(self.agent, "pending_start_signal", False):
                 self.agent.pending_start_signal = False
                 print("Sending start_moving messages to all creatures...")
-                for jid in list(self.agent.active_creature_jids):
-                    start_msg = Message(to=jid)
+                for cid in list(self.agent.active_cids):
+                    start_msg = Message(to=self.agent.creatures_info[cid].jid)
                     start_msg.set_metadata("performative", "inform")
                     start_msg.body = json.dumps({"type": "start_moving"})
                     await self.send(start_msg)
                 print("Start signal sent to all creatures.")
             
-            msg = await self.receive(timeout=1)
+            # con el buzón saturado se descartan statuses obsoletos y se degrada por escalones (ver `backpressure.py`)
+            shedder = self.agent.shedder
+            # espera como mucho un segundo simulado: la señal de inicio pendiente no espera a otro mensaje
+            msg, data = await shedder.next(self, timeout=min(1.0, self.agent.timescale.scaled(1.0)))
+            if shedder.update(shedder.pending(self)):
+                await self.agent._send_slow_down(self)
             if msg is None:
                 return
-            try:
-                data = json.loads(msg.body)
-            except Exception:
+            if data is None:
                 print("GenerationAgent: mensaje no JSON recibido")
                 return
 
             mtype = data.get("type")
-            sender = data.get("jid") or str(msg.sender).split("/")[0]
+            # id entero de la criatura; el jid solo se resuelve para mensajes sin `cid`
+            cid = self.agent._resolve_cid(data, msg)
+            info = self.agent.creatures_info[cid] if cid is not None else None
 
             if mtype == "status":
-                # Comprueba si hay comida cerca
+                if self.agent.tracer is not None and cid is not None:
+                    self.agent.tracer.received(data, cid, "generation", hop="creature_to_generation")
+                if info is None:
+                    return
                 pos = (data.get("x", 0), data.get("y", 0))
-                # buscar primera comida en rango
-                ate = False
-                remove_idx = None
-                for idx, fpos in enumerate(self.agent.foods):
-                    if utils.distance(pos, fpos) <= getattr(self.agent.config, "detection_radius", 1.0):
-                        ate = True
-                        remove_idx = idx
-                        break
-                if ate and remove_idx is not None:
-                    fpos = self.agent.foods.pop(remove_idx)
-                    self.agent.last_eat_time = time.time()
-                    # actualizar contador local
-                    base = sender.split("@")[0]
-                    info = self.agent.creatures_info.get(base)
-                    if info is not None:
-                        info["foods_eaten"] += 1
-                    # confirmar al creature
-                    reply = Message(to=str(msg.sender).split("/")[0])
-                    reply.set_metadata("performative", "inform")
-                    reply.body = json.dumps({"type": "eat_confirm", "jid": sender})
-                    await self.send(reply)
-                    print(f"  {sender} ate food at {fpos}")
-                    try:
-                        logger.info(f"{sender} ate food at {fpos}")
-                    except Exception:
-                        pass
-                # actualizar energía/estado en registro local para poder preservar atributos
-                base = sender.split("@")[0]
-                info = self.agent.creatures_info.get(base)
-                if info is not None:
-                    info["energy"] = data.get("energy", info.get("energy"))
-                    # actualizar posición/tamaño/sense si vienen en el status
-                    info["x"] = data.get("x", info.get("x"))
-                    info["y"] = data.get("y", info.get("y"))
-                    if "size" in data:
-                        info["size"] = data.get("size")
-                    if "sense" in data:
-                        info["sense"] = data.get("sense")
-                    # speed también puede actualizarse si el creature cambia (por seguridad)
-                    if "speed" in data:
-                        info["speed"] = data.get("speed")
-                    # actualizar kills si viene en el status
-                    if "kills" in data:
-                        info["kills"] = data.get("kills")
-
-                    # Predation: the reporting creature may attack nearby smaller creatures
-                    try:
-                        predator_size = float(info.get("size", 0))
-                        predator_sense = float(info.get("sense", 0))
-                    except Exception:
-                        predator_size = info.get("size", 0)
-                        predator_sense = info.get("sense", 0)
-                    cfg = getattr(self.agent, "config", None)
-                    attack_size_ratio = getattr(cfg, "attack_size_ratio", 1.2) if cfg is not None else 1.2
-                    attack_radius = getattr(cfg, "attack_radius", 1.0) if cfg is not None else 1.0
-                    prey_food_scale = getattr(cfg, "prey_food_scale", 1.0) if cfg is not None else 1.0
-                    sense_radius_mult = getattr(cfg, "sense_radius_mult", 0.5) if cfg is not None else 0.5
-
-                    # scale attack radius by predator sense (more sense -> larger effective radius)
-                    effective_attack_radius = attack_radius * (1.0 + predator_sense * sense_radius_mult)
-
-                    # iterate over known creatures and attempt to eat eligible prey
-                    for other_base, other_info in list(self.agent.creatures_info.items()):
-                        if other_base == base:
-                            continue
-                        if not other_info.get("alive", False):
-                            continue
-                        # need position and size for the prey
-                        ox = other_info.get("x", None)
-                        oy = other_info.get("y", None)
-                        o_size = other_info.get("size", None)
-                        if ox is None or oy is None or o_size is None:
-                            continue
-                        # distance between predator (pos) and prey
-                        d = utils.distance(pos, (ox, oy))
-                        if d <= effective_attack_radius and predator_size >= (attack_size_ratio * float(o_size)):
-                                    # el depredador mata exitosamente a la presa
-                            prey_jid = other_info.get("jid_full")
-                            # mark prey as dead in registry
-                            other_info["alive"] = False
-                            # clear prey's food count so it won't reproduce
-                            other_info["foods_eaten"] = 0
-                            other_info["energy"] = 0
-                            # remove from active set if present
-                            if prey_jid in self.agent.active_creature_jids:
-                                try:
-                                    self.agent.active_creature_jids.remove(prey_jid)
-                                except Exception:
-                                    pass
-                            # increase predator's foods_eaten and energy according to prey size
-                            gained = prey_food_scale * (float(o_size) ** 3)
-                            info["foods_eaten"] = info.get("foods_eaten", 0) + 1
-                            info["energy"] = float(info.get("energy", 0)) + gained
-                            # Incrementar contador de kills del depredador
-                            info["kills"] = info.get("kills", 0) + 1
-                            print(f"  {sender} predated on {other_base} at d={d:.2f}, energy+={gained:.2f}")
-                            try:
-                                logger.info(f"{sender} predated on {other_base} at d={d:.2f}, energy+={gained:.2f}")
-                            except Exception:
-                                pass
-                            # enviar `eat_confirm` al depredador para que el agente local también actualice su estado
-                            try:
-                                predator_jid_full = str(msg.sender).split("/")[0]
-                            except Exception:
-                                predator_jid_full = sender
-                            pred_ack = Message(to=predator_jid_full)
-                            pred_ack.set_metadata("performative", "inform")
-                            pred_ack.body = json.dumps({"type": "eat_confirm", "jid": sender, "energy_gain": gained, "prey": other_base})
-                            await self.send(pred_ack)
-                            
-                            # Enviar kill_confirmed para que el depredador actualice su contador
-                            kill_msg = Message(to=predator_jid_full)
-                            kill_msg.set_metadata("performative", "inform")
-                            kill_msg.body = json.dumps({"type": "kill_confirmed", "kills": info["kills"]})
-                            await self.send(kill_msg)
-                            # registrar evento de depredación en CSV
-                            try:
-                                write_header = not os.path.exists(self.agent.predation_file)
-                                with open(self.agent.predation_file, "a", newline="", encoding="utf-8") as pf:
-                                    pw = csv.writer(pf)
-                                    if write_header:
-                                        pw.writerow(["generation", "time", "predator_base", "predator_jid", "prey_base", "prey_jid", "energy_gained", "pred_x", "pred_y", "prey_x", "prey_y", "distance"])
-                                    pw.writerow([self.agent.generation, time.time(), base, predator_jid_full, other_base, prey_jid, f"{gained:.3f}", f"{pos[0]:.3f}", f"{pos[1]:.3f}", f"{ox:.3f}", f"{oy:.3f}", f"{d:.3f}"])
-                            except Exception as e:
-                                logger.error(f"Failed writing predation event: {e}")
-                            # instruir a la presa para que termine (muerta). Preferir detener el agente
-                            if prey_jid:
-                                prey_agent = self.agent.spawned_map.get(prey_jid)
-                                if prey_agent is not None:
-                                    try:
-                                        # stop the prey agent directly to avoid sending messages to stopped agents
-                                        await prey_agent.stop()
-                                    except Exception:
-                                        pass
-                                    # eliminar el mapeo y la entrada del conjunto activo si están presentes
-                                    self.agent.spawned_map.pop(prey_jid, None)
-                                    if prey_jid in self.agent.active_creature_jids:
-                                        try:
-                                            self.agent.active_creature_jids.remove(prey_jid)
-                                        except Exception:
-                                            pass
-                                    # notificar al Host UI que la presa fue eliminada (killed)
-                                    try:
-                                        host_j = getattr(self.agent, "host_jid", None)
-                                        if host_j:
-                                            rem = Message(to=host_j)
-                                            rem.set_metadata("performative", "inform")
-                                            rem.body = json.dumps({"type": "creature_removed", "jid": prey_jid, "reason": "killed", "killed_by": sender})
-                                            await self.send(rem)
-                                    except Exception:
-                                        pass
-                                else:
-                                    # alternativa: enviar generation_end si no tenemos el objeto agente
-                                    endm = Message(to=prey_jid)
-                                    endm.set_metadata("performative", "inform")
-                                    endm.body = json.dumps({"type": "generation_end", "killed_by": sender})
-                                    await self.send(endm)
-                                    # también notificar al Host UI en la ruta alternativa
-                                    try:
-                                        host_j = getattr(self.agent, "host_jid", None)
-                                        if host_j:
-                                            rem = Message(to=host_j)
-                                            rem.set_metadata("performative", "inform")
-                                            rem.body = json.dumps({"type": "creature_removed", "jid": prey_jid, "reason": "killed", "killed_by": sender})
-                                            await self.send(rem)
-                                    except Exception:
-                                        pass
-                            # do not allow multiple predators to eat the same prey (we marked it dead)
+                cfg = getattr(self.agent, "config", None)
+                # con `swept_collisions` se prueba el último paso (desde la posición anterior) y no
+                # solo el punto reportado: un tick grande no se salta la comida del camino
+                start = pos
+                if getattr(cfg, "swept_collisions", True) and info.x is not None:
+                    # statuses coalescidos: el camino desde el último procesado cubre varios pasos
+                    step = float(info.speed or 0.0) * simulation.tick_scale(cfg) * data.get("throttle", 1.0) * (1 + data.get("coalesced", 0))
+                    start = simulation.last_step((info.x, info.y), pos, step)
+                if getattr(cfg, "tick_barrier", False):
+                    # modo barrera: solo se registra el movimiento; comida y depredación se resuelven
+                    # por lotes al cerrar el tick (`BarrierBehav`)
+                    start = self.agent._record_move(cid, start, pos, data)
+                    self.agent._apply_status(cid, info, start, pos, data)
+                    return
+                # Comprueba si hay comida cerca
+                for fpos in simulation.find_foods_swept(start, pos, self.agent.food_grid, getattr(cfg, "detection_radius", 1.0), simulation.foods_per_tick(cfg)):
+                    await self.agent._apply_eat(self, cid, fpos, data)
+                now = self.agent._apply_status(cid, info, start, pos, data)
+
+                # Predation: the reporting creature may attack nearby smaller creatures
+                predator_size = float(info.size or 0)
+                predator_sense = float(info.sense or 0)
+                # candidatos: criaturas activas cerca del camino del depredador (rejilla), con el
+                # camino de su último paso; las que vuelven a casa sin reportar, en su posición extrapolada
+                candidates = self.agent._predation_candidates(cid, start, pos, predator_sense, now)
+
+                # presas dentro del radio de ataque (escalado por el sense del depredador) y suficientemente pequeñas
+                for other_cid, d in simulation.swept_predation_targets((start[0], start[1], pos[0], pos[1]), predator_size, predator_sense, candidates, cfg):
+                    await self.agent._apply_kill(self, cid, other_cid, d, data)
                 # En cualquier caso, enviar al creature el target (la comida más cercana restante)
                 # para que busque de forma dirigida
-                target_msg = Message(to=str(msg.sender).split("/")[0])
-                target_msg.set_metadata("performative", "inform")
-                if len(self.agent.foods) > 0:
-                    # buscar comida más cercana al creature
-                    nearest = None
-                    nearest_d = None
-                    for f in self.agent.foods:
-                        d = utils.distance(pos, f)
-                        if nearest is None or d < nearest_d:
-                            nearest = f
-                            nearest_d = d
-                    target_msg.body = json.dumps({"type": "target", "x": nearest[0], "y": nearest[1]})
-                else:
-                    target_msg.body = json.dumps({"type": "no_target"})
-                await self.send(target_msg)
+                await self.agent._send_target(self, cid, info, pos, data, now)
             elif mtype == "kill":
                 # Mensaje desde HostAgent para matar una criatura específica (UI curse tool)
-                target_jid = data.get("target_jid")
-                if target_jid and target_jid in self.agent.active_creature_jids:
+                target_cid = data.get("target_cid")
+                if target_cid is None:
+                    target_cid = self.agent.cid_by_jid.get(data.get("target_jid"))
+                if target_cid is not None and target_cid in self.agent.active_cids:
+                    target_jid = self.agent.creatures_info[target_cid].jid
                     logger.info(f"Kill request for {target_jid} from UI")
                     # Enviar mensaje de terminación a la criatura
                     end_msg = Message(to=target_jid)
@@ -402,27 +368,25 @@ class GenerationAgent(Agent):
                     
             elif mtype == "finished":
                 # Marca criatura como finalizada
-                base = sender.split("@")[0]
-                info = self.agent.creatures_info.get(base)
                 if info is not None:
-                    info["foods_eaten"] = data.get("foods_eaten", info.get("foods_eaten", 0))
-                    info["energy"] = data.get("energy", info.get("energy"))
+                    info.foods_eaten = data.get("foods_eaten", info.foods_eaten)
+                    info.energy = data.get("energy", info.energy)
+                    if info.alive:
+                        self.agent.stats.set_energy(cid, info.energy)
+                        self.agent.stats.finish(cid, satisfied=bool(data.get("satisfied")), exhausted=float(info.energy or 0) <= 0)
                 # eliminar de activos y del mapa de spawn si existe
-                jid_full = str(msg.sender).split("/")[0]
-                if jid_full in self.agent.active_creature_jids:
-                    try:
-                        self.agent.active_creature_jids.remove(jid_full)
-                    except Exception:
-                        pass
-                # remove from spawned_map if present
-                try:
-                    self.agent.spawned_map.pop(jid_full, None)
-                except Exception:
-                    pass
+                if cid is not None:
+                    self.agent.active_cids.discard(cid)
+                    self.agent.spawned_map.pop(cid, None)
+                    self.agent._clear_motion(cid)
+                    # sigue en la rejilla, quieta en su última posición: puede ser depredada
+                    self.agent.prev_pos.pop(cid, None)
+                    self.agent._check_idle()
+                name = info.jid if info is not None else data.get("jid")
 
                 # compute a reason for finishing: killed/exhausted/alive/will reproduce
-                foods_num = data.get("foods_eaten", info.get("foods_eaten") if info is not None else 0)
-                alive_flag = info.get("alive", True) if info is not None else True
+                foods_num = data.get("foods_eaten", info.foods_eaten if info is not None else 0)
+                alive_flag = info.alive if info is not None else True
                 if not alive_flag:
                     reason = "killed"
                 else:
@@ -440,34 +404,62 @@ class GenerationAgent(Agent):
                     else:
                         reason = "finished"
 
-                print(f"  {sender} finished (foods={foods_num}; {reason})")
+                print(f"  {name} finished (foods={foods_num}; {reason})")
+                if alive_flag and cid is not None:
+                    if data.get("satisfied"):
+                        removal = "finished"
+                    elif float(data.get("energy", 1) or 0) <= 0:
+                        removal = "exhausted"
+                    else:
+                        removal = "generation_end"
+                    self.agent._record_event(replay.EV_REMOVE, cid, replay.reason_code(removal))
+
+    class RecordBehav(PeriodicBehaviour):
+        """Graba un frame de posiciones de las criaturas activas en el replay."""
 
-    class MonitorBehav(PeriodicBehaviour):
         async def run(self):
-            # Finalizar generación cuando no queden criaturas activas
-            if len(self.agent.active_creature_jids) == 0:
-                await self.agent._end_generation(self)
+            agent = self.agent
+            rec = agent.recorder
+            if rec is None or agent._ending:
                 return
+            # el índice de criatura del replay coincide con el cid
+            creatures = agent.creatures_info
+            now = agent.timescale.now()
+            positions = [
+                (cid, *agent.position(cid, now)) if cid in agent.motion else (cid, creatures[cid].x or 0.0, creatures[cid].y or 0.0)
+                for cid in sorted(agent.active_cids)
+            ]
+            rec.frame(agent.timescale.now() - agent.generation_t0, positions)
+
+    class BarrierBehav(PeriodicBehaviour):
+        """Cierra el tick del modo barrera cada periodo de reporte y lo resuelve por lotes."""
+
+        async def run(self):
+            await self.agent._resolve_barrier(self)
 
-            # Timeout de seguridad: si no queda comida y han pasado 15 segundos sin comer,
-            # forzar fin de generación (evita criaturas que nunca vuelven a casa)
-            if len(self.agent.foods) == 0 and (time.time() - self.agent.last_eat_time) > getattr(self.agent.config, "last_eat_grace", 15.0):
-                print(f"Generation {self.agent.generation}: timeout reached (no food for 15s), forcing end...")
-                # instruir a las criaturas activas a terminar
-                for jid in list(self.agent.active_creature_jids):
-                    msg = Message(to=jid)
-                    msg.set_metadata("performative", "inform")
-                    msg.body = json.dumps({"type": "generation_end"})
-                    await self.send(msg)
-                # esperar un momento y luego forzar el end
-                await asyncio.sleep(1)
-                await self.agent._end_generation(self)
+    class EventBehav(CyclicBehaviour):
+        """Procesa los eventos de `agent.events`; duerme hasta que vence el siguiente (sin sondeo)."""
+
+        async def run(self):
+            agent = self.agent
+            queue = agent.events
+            agent.events_changed.clear()
+            due_at = queue.next_time()
+            if due_at is None or due_at > agent.timescale.now():
+                # despierta al vencer el plazo, al programarse un evento anterior o al cambiar la velocidad
+                await agent.timescale.sleep_until(due_at, agent.events_changed)
                 return
+            epoch = queue.epoch
+            for event in queue.pop_due(agent.timescale.now()):
+                if queue.epoch != epoch:
+                    break  # un END arrancó la generación siguiente: el resto ya no aplica
+                await agent._handle_event(self, event)
 
     async def _end_generation(self, behaviour):
         if self._ending:
             return
         self._ending = True
+        self.tick_moves = {}
         print(f"Generation {self.generation} ending. Evaluating population...")
         try:
             logger.info(f"Generation {self.generation} ending. Evaluating population...")
@@ -475,192 +467,740 @@ class GenerationAgent(Agent):
             pass
 
         # pedir a las criaturas activas que finalicen y esperar sus informes
-        for jid in list(self.active_creature_jids):
-            msg = Message(to=jid)
+        for cid in list(self.active_cids):
+            msg = Message(to=self.creatures_info[cid].jid)
             msg.set_metadata("performative", "inform")
             msg.body = json.dumps({"type": "generation_end"})
             await behaviour.send(msg)
 
         # esperar un breve periodo para recolectar mensajes 'finished'
-        await asyncio.sleep(1.5)
-
-        # Forzar parada de los agentes que siguen activos
-        if hasattr(self, "spawned_agents") and self.spawned_agents:
-            for ag in list(self.spawned_agents):
-                try:
-                    if str(ag.jid).split("/")[0] in self.active_creature_jids:
-                        await ag.stop()
-                except Exception:
-                    pass
-            self.spawned_agents = []
+        await self.timescale.sleep(1.5)
+
+        # Forzar parada de los agentes que siguen activos y soltar el estado por criatura
+        await self._release_generation()
 
         # Notify host UI that remaining active creatures are being removed (generation end)
         try:
             host_j = getattr(self, "host_jid", None)
             if host_j:
-                for jid_full in list(self.active_creature_jids):
+                for cid in list(self.active_cids):
                     try:
                         rem = Message(to=host_j)
                         rem.set_metadata("performative", "inform")
-                        rem.body = json.dumps({"type": "creature_removed", "jid": jid_full, "reason": "generation_end"})
+                        rem.body = json.dumps(self._traced({"type": "creature_removed", "cid": cid, "jid": self.creatures_info[cid].jid, "reason": "generation_end"}))
                         await self.send(rem)
                     except Exception:
                         pass
         except Exception:
             pass
 
-        # asegurar que active_creature_jids está vacio
-        self.active_creature_jids = set()
-
-        # calcular estadísticas y nueva lista de specs para siguiente generación
-        next_specs = []
-        survivors = 0
-        deaths = 0
-        reproducers = 0
-        speeds = []
-        foods_list = []
-        sizes = []
-        senses = []
-        survivors_bases = []
-        reproducers_bases = []
-
-        for base, info in list(self.creatures_info.items()):
-            foods = info.get("foods_eaten", 0)
-            speed_parent = info.get("speed", utils.random_speed())
-            size_parent = info.get("size", utils.random_size())
-            sense_parent = info.get("sense", utils.random_sense())
-            # Reset parent energy for next generation to the default for their speed
-            default_energy = utils.default_energy_for_speed(speed_parent)
-            energy_parent = default_energy
-            speeds.append(speed_parent)
-            foods_list.append(foods)
-            sizes.append(size_parent)
-            senses.append(sense_parent)
-            # if the creature was killed by predation or otherwise marked not alive, count as death
-            if not info.get("alive", True):
-                deaths += 1
-                continue
-            if foods == 0:
-                deaths += 1
-                continue
-            elif foods == 1:
-                # parent survives, keep same speed and remaining energy
-                # keep speed, size and sense; reset energy to default
-                next_specs.append({"speed": speed_parent, "energy": energy_parent, "size": size_parent, "sense": sense_parent})
-                survivors_bases.append(base)
-                survivors += 1
-            else:
-                # parent survives AND produces one child
-                # parent keeps same speed/size/sense and resets energy
-                next_specs.append({"speed": speed_parent, "energy": energy_parent, "size": size_parent, "sense": sense_parent})
-                survivors_bases.append(base)
-                # child with random speed and energy (inverse relation)
-                child_speed = utils.random_speed()
-                child_energy = utils.default_energy_for_speed(child_speed)
-                child_size = utils.random_size()
-                child_sense = utils.random_sense()
-                next_specs.append({"speed": child_speed, "energy": child_energy, "size": child_size, "sense": child_sense})
-                reproducers_bases.append(base)
-                survivors += 1
-                reproducers += 1
-
-        avg_speed = sum(speeds) / len(speeds) if speeds else 0
-        avg_foods = sum(foods_list) / len(foods_list) if foods_list else 0
-        avg_size = sum(sizes) / len(sizes) if sizes else 0
-        avg_sense = sum(senses) / len(senses) if senses else 0
+        # asegurar que active_cids está vacio
+        for cid in self.active_cids:
+            self.stats.finish(cid)
+        self.active_cids = set()
+
+        if self.recorder is not None:
+            self.recorder.end_generation(self.timescale.now() - self.generation_t0)
+
+        # clasificar, calcular estadísticas y generar descendencia en una sola pasada por lotes
+        result = evolution.evaluate_generation(self.creatures_info, self.config)
+        next_specs = result.next_population
+        self.generations_completed += 1
 
         print(f"  survivors/offspring for next gen: {len(next_specs)}")
+        if result.culled:
+            print(f"  carrying capacity {self.config.carrying_capacity}: {result.culled} slots culled ({self.config.capacity_selection})")
         # debug: list survivors/reproducers and next_specs content
         try:
-            print(f"  survivors bases: {survivors_bases}")
-            print(f"  reproducers bases: {reproducers_bases}")
-            print(f"  next_specs count detail: parents={len(survivors_bases)}, reproducers={len(reproducers_bases)}, total_specs={len(next_specs)}")
+            print(f"  survivors bases: {result.survivors_bases}")
+            print(f"  reproducers bases: {result.reproducers_bases}")
+            print(f"  next_specs count detail: parents={len(result.survivors_bases)}, reproducers={len(result.reproducers_bases)}, total_specs={len(next_specs)}")
         except Exception:
             pass
 
         # escribir resumen CSV
-        header = ["generation", "initial", "deaths", "survivors", "reproducers", "next_population", "avg_speed", "avg_foods", "avg_size", "avg_sense"]
-        row = [self.generation, len(speeds), deaths, survivors, reproducers, len(next_specs), f"{avg_speed:.3f}", f"{avg_foods:.3f}", f"{avg_size:.3f}", f"{avg_sense:.3f}"]
-        write_header = not os.path.exists(self.summary_file)
         try:
-            with open(self.summary_file, "a", newline="", encoding="utf-8") as csvf:
-                writer = csv.writer(csvf)
-                if write_header:
-                    writer.writerow(header)
-                writer.writerow(row)
+            reports.write_summary(self.summary_file, self.generation, result, self.stats)
         except Exception as e:
             print(f"Failed writing summary CSV: {e}")
 
         # escribir detalles por criatura
-        detail_header = ["generation", "jid_base", "jid_full", "speed", "energy", "size", "sense", "foods_eaten", "alive", "is_reproducer"]
-        write_details_header = not os.path.exists(self.details_file)
         try:
-            with open(self.details_file, "a", newline="", encoding="utf-8") as df:
-                dw = csv.writer(df)
-                if write_details_header:
-                    dw.writerow(detail_header)
-                for base, info in list(self.creatures_info.items()):
-                    jid_full = info.get("jid_full")
-                    speed = info.get("speed")
-                    energy = info.get("energy")
-                    size = info.get("size")
-                    sense = info.get("sense")
-                    foods = info.get("foods_eaten", 0)
-                    # alive flag refers to whether creature survived (not killed by predation)
-                    alive_flag = True if info.get("alive", False) else False
-                    # a reproducer is an alive creature that ate >=2
-                    is_reproducer = True if (alive_flag and foods >= 2) else False
-                    # format numbers sensibly
-                    speed_s = f"{speed:.3f}" if isinstance(speed, (int, float)) else str(speed)
-                    energy_s = f"{energy:.3f}" if isinstance(energy, (int, float)) else str(energy)
-                    size_s = f"{size:.3f}" if isinstance(size, (int, float)) else str(size)
-                    sense_s = f"{sense:.3f}" if isinstance(sense, (int, float)) else str(sense)
-                    dw.writerow([self.generation, base, jid_full, speed_s, energy_s, size_s, sense_s, foods, alive_flag, is_reproducer])
+            reports.write_details(self.details_file, self.generation, self.creatures_info)
         except Exception as e:
             print(f"Failed writing details CSV: {e}")
 
+        if self.on_generation is not None:
+            try:
+                self.on_generation(self.generation, result, self.timescale.now() - self.generation_t0)
+            except Exception as e:
+                print(f"on_generation callback failed: {e}")
+
+        # guardar checkpoint del límite de generación (después de escribir los CSV)
+        every = getattr(self.config, "checkpoint_every", 1)
+        if every and self.generation % every == 0:
+            self._save_checkpoint(next_specs)
+
+        self._stop_profiler()
+        self._export_trace()
+
         # si no quedan individuos -> terminar simulación
         if len(next_specs) == 0 or self.generation >= self.max_generations:
             print("Simulation finished (no descendants or max generations reached).")
             print("Restarting simulation in 3 seconds...")
-            await asyncio.sleep(3)
+            await self.timescale.sleep(3)
             await self._restart_simulation()
             return
 
         # spawn siguiente generación
-        await asyncio.sleep(0.5)
+        await self.timescale.sleep(0.5)
         self._ending = False
         await self.spawn_generation(spawn_list=next_specs)
 
+    async def _release_generation(self):
+        """Detiene las criaturas que sigan vivas y vacía las tablas por cid de la generación.
+
+        Tras esta llamada no queda ninguna referencia a los agentes de la generación (solo
+        `creatures_info`, que se evalúa y se reemplaza en el siguiente spawn): en una ejecución
+        que reinicia sin fin la memoria no crece con el número de generaciones.
+        """
+        agents = {id(agent): agent for agent in self.spawned_agents}
+        agents.update((id(agent), agent) for agent in self.spawned_map.values())
+        for agent in agents.values():
+            try:
+                if agent.is_alive():
+                    await agent.stop()
+            except Exception as e:
+                logger.error(f"Error stopping {agent.jid}: {e}")
+        self.spawned_agents = []
+        self.spawned_map = {}
+        self.cid_by_jid = {}
+        self.tick_moves = {}
+        self.motion = {}
+        self.food_watchers = {}
+        self.prev_pos = {}
+        self.creature_grid = spatial.SpatialGrid(self.creature_grid.cell)
+
+    def _resolve_cid(self, data, msg):
+        """cid de la criatura que envía `data`, o None si no pertenece a la generación actual.
+
+        Las criaturas incluyen `cid` y `gen` en sus mensajes; el jid del remitente solo se
+        consulta para mensajes sin `cid` (frontera XMPP).
+        """
+        cid = data.get("cid")
+        if cid is not None:
+            if data.get("gen", self.generation) != self.generation or not 0 <= cid < len(self.creatures_info):
+                return None
+            return cid
+        jid = data.get("jid") or (str(msg.sender).split("/")[0] if msg.sender else None)
+        return self.cid_by_jid.get(jid)
+
+    # --- reporte adaptativo -------------------------------------------------------------
+
+    def _quiet_ticks(self, cid, info, pos, food, now):
+        """Ticks que la criatura `cid` puede avanzar sin reportar (ver `simulation.quiet_ticks`).
+
+        Solo se consideran las criaturas de la rejilla a menos de `_quiet_reach`: las demás no
+        pueden interactuar con `cid` durante la ventana máxima.
+        """
+        max_quiet = getattr(self.config, "max_quiet_ticks", 0)
+        if max_quiet <= 0:
+            return 0
+        # otra criatura pudo dar hasta un paso por periodo mínimo (con jitter) desde su último status
+        scale = self._tick_scale()
+        speed = float(info.speed or 0.0) * scale
+        min_period = 0.9 * getattr(self.config, "creature_period", 1.0) * scale
+        creatures = self.creatures_info
+        others = []
+        for other_cid, _ in self.creature_grid.query_circle(pos[0], pos[1], self._quiet_reach(speed, float(info.sense or 0.0), max_quiet)):
+            other = creatures[other_cid]
+            if other_cid == cid or not other.alive or other.x is None or other.size is None:
+                continue
+            o_speed = float(other.speed or 0.0) * scale
+            if other_cid not in self.active_cids:
+                # terminó: sigue siendo presa posible, quieta en su última posición
+                others.append((other.x, other.y, float(other.size), float(other.sense or 0.0), 0.0, 0.0))
+                continue
+            if other_cid in self.motion:
+                # movimiento conocido: posición extrapolada con un paso de margen
+                ox, oy = self.position(other_cid, now)
+                slack = o_speed
+            else:
+                ox, oy = other.x, other.y
+                slack = o_speed * ((now - self.last_report[other_cid]) / min_period + 1.0)
+            others.append((ox, oy, float(other.size), float(other.sense or 0.0), o_speed, slack))
+        food_distance = math.hypot(food[0] - pos[0], food[1] - pos[1]) if food is not None else None
+        return simulation.quiet_ticks(pos, speed, float(info.size or 0.0), float(info.sense or 0.0), food_distance, others, self.config, max_quiet)
+
+    def _quiet_reach(self, speed, sense, max_quiet):
+        """Radio alrededor de la última posición conocida fuera del cual ninguna criatura afecta a la ventana.
+
+        Cota como la de `_predation_candidates`: radio de ataque máximo (el propio o el de
+        cualquier `sense` posible) más lo que pueden acercarse ambas durante la ventana; las otras
+        cuentan dos veces su paso máximo, porque la rejilla guarda su último status y pudieron
+        avanzar otra ventana en silencio desde entonces.
+        """
+        attack = simulation.effective_attack_radius(max(sense, getattr(self.config, "sense_max", 2.0)), self.config)
+        return attack + (max_quiet + 1) * (speed + 2.0 * self.max_step * simulation.PERIOD_JITTER_MARGIN)
+
+    def _set_motion(self, cid, now, pos, target, period=None, watch=True):
+        """Registra que `cid` avanza en línea recta hacia `target` sin reportar desde `now`.
+
+        Con `watch`, `target` es una comida: si otra criatura se la come, `cid` recibe un
+        objetivo nuevo (`_retarget_watchers`).
+        """
+        scale = self._tick_scale()
+        period = period or getattr(self.config, "creature_period", 1.0) * scale
+        target = tuple(target)
+        self.motion[cid] = (now, pos[0], pos[1], target[0], target[1], float(self.creatures_info[cid].speed or 0.0) * scale, period)
+        if watch:
+            self.food_watchers.setdefault(target, set()).add(cid)
+
+    def _clear_motion(self, cid):
+        m = self.motion.pop(cid, None)
+        if m is not None:
+            watchers = self.food_watchers.get((m[3], m[4]))
+            if watchers is not None:
+                watchers.discard(cid)
+
+    def position(self, cid, now=None):
+        """Posición de la criatura `cid`, extrapolada si está avanzando sin reportar."""
+        info = self.creatures_info[cid]
+        m = self.motion.get(cid)
+        if m is None:
+            return info.x, info.y
+        t0, x, y, tx, ty, speed, period = m
+        now = self.timescale.now() if now is None else now
+        ticks = int((now - t0) / period) if period > 0 else 0
+        return simulation.extrapolate(x, y, tx, ty, speed, ticks)
+
+    # --- índices espaciales ---------------------------------------------------------------
+
+    def _set_foods(self, foods):
+        """Reemplaza la comida de la generación y reconstruye su rejilla."""
+        self.foods = foods
+        self.food_grid = spatial.SpatialGrid.from_points(foods, food_cell(self.config))
+        self.foods_version += 1
+
+    def _remove_food(self, fpos):
+        self.foods.remove(fpos)
+        self.food_grid.remove(fpos)
+        self.foods_version += 1
+
+    def _index_creatures(self):
+        """Rejilla de criaturas activas y paso máximo por tick de la generación recién creada."""
+        self.creature_grid = spatial.SpatialGrid(creature_cell(self.config))
+        for cid in self.active_cids:
+            info = self.creatures_info[cid]
+            self.creature_grid.insert(cid, info.x, info.y)
+        self.prev_pos = {}
+        speeds = [float(info.speed or 0.0) for info in self.creatures_info]
+        self.max_step = max(speeds, default=0.0) * self._tick_scale()
+
+    def _barrier_period(self):
+        """Duración (segundos simulados) de un tick del modo barrera: un periodo de reporte de las criaturas."""
+        return getattr(self.config, "creature_period", 1.0) * self._tick_scale()
+
+    def _tick_scale(self):
+        """Ticks base por tick de las criaturas: `tick_scale` por el factor de `slow_down` vigente."""
+        return simulation.tick_scale(self.config) * self.shedder.factor
+
+    async def _send_slow_down(self, behaviour):
+        """Comunica a las criaturas activas el escalón de backpressure actual (ver `backpressure.py`)."""
+        control = self.shedder.control()
+        logger.warning(f"Backpressure level {control['level']}: depth={self.shedder.depth} factor={control['factor']:.2f} host_every={control['host_every']}")
+        if self.shedder.factor > 1.0:
+            # criaturas con pasos más largos: el radio de búsqueda de presas no puede quedarse corto
+            speeds = [float(info.speed or 0.0) for info in self.creatures_info]
+            self.max_step = max(self.max_step, max(speeds, default=0.0) * self._tick_scale())
+        if self.barrier is not None:
+            self.timescale.subscribe(self.barrier, self._barrier_period())
+        body = json.dumps(control)
+        for cid in list(self.active_cids):
+            msg = Message(to=self.creatures_info[cid].jid)
+            msg.set_metadata("performative", "inform")
+            msg.body = body
+            await behaviour.send(msg)
+        self.shedder.controls_sent += 1
+
+    def _unindex_creature(self, cid):
+        self.creature_grid.remove(cid)
+        self.prev_pos.pop(cid, None)
+
+    def _predation_candidates(self, cid, start, pos, sense, now):
+        """(cid, x0, y0, x1, y1, size) de las posibles presas del paso start -> pos de `cid`.
+
+        La rejilla solo devuelve criaturas a menos de radio de ataque + paso máximo del camino;
+        las que avanzan sin reportar se prueban en su posición extrapolada. Como en la versión
+        original, las vivas que ya terminaron también son presas posibles.
+        """
+        reach = simulation.effective_attack_radius(sense, self.config) + self.max_step
+        near = {other for other, _, _ in self.creature_grid.query_segment(start[0], start[1], pos[0], pos[1], reach)}
+        near.discard(cid)
+        creatures = self.creatures_info
+        out = []
+        for other_cid in sorted(near):
+            other = creatures[other_cid]
+            if not other.alive or other.x is None or other.size is None:
+                continue
+            if other_cid in self.motion:
+                x, y = self.position(other_cid, now)
+                out.append((other_cid, x, y, x, y, float(other.size)))
+            else:
+                x0, y0 = self.prev_pos.get(other_cid, (other.x, other.y))
+                out.append((other_cid, x0, y0, other.x, other.y, float(other.size)))
+        return out
+
+    # --- eventos -------------------------------------------------------------------------
+
+    def _schedule(self, delay, kind, data=None):
+        """Programa `kind` dentro de `delay` segundos simulados; despierta a `EventBehav` si pasa a ser el próximo."""
+        at = self.timescale.now() + max(0.0, delay)
+        due_at = self.events.next_time()
+        event = self.events.schedule(at, kind, data)
+        if due_at is None or at < due_at:
+            self.events_changed.set()
+        return event
+
+    def _schedule_generation_events(self):
+        """Eventos iniciales de la generación recién creada (descarta los de la anterior)."""
+        self.events.clear()
+        self.events_changed.set()
+        duration = getattr(self.config, "generation_duration", 0.0)
+        if duration > 0:
+            self._schedule(duration, events.DEADLINE)
+        interval = simulation.regrowth_interval(self.config)
+        if interval is not None:
+            self._schedule(interval, events.REGROW)
+        if not self.foods:
+            self._schedule_starve()
+        self._check_idle()
+
+    def _schedule_starve(self):
+        """Sin comida: fin de generación a `last_eat_grace` segundos de la última comida."""
+        grace = getattr(self.config, "last_eat_grace", 15.0)
+        self._schedule(self.last_eat_time + grace - self.timescale.now(), events.STARVE)
+
+    def _check_idle(self):
+        """Sin criaturas activas: cerrar la generación en cuanto despierte `EventBehav`."""
+        if not self.active_cids and not self._ending:
+            self._schedule(0.0, events.END)
+
+    def _food_eaten(self, fpos):
+        """Eventos que dispara una comida: reaparición en su sitio y plazo sin comida."""
+        delay = getattr(self.config, "food_regrowth_delay", 0.0)
+        if delay > 0:
+            self._schedule(delay, events.RESPAWN, fpos)
+        if not self.foods:
+            self._schedule_starve()
+
+    async def _handle_event(self, behaviour, event):
+        kind = event.kind
+        if kind == events.REGROW:
+            if len(self.foods) < simulation.food_capacity(self.config, self.food_count):
+                await self._add_food(behaviour, simulation.regrowth_position(self.config, self.space_size))
+            interval = simulation.regrowth_interval(self.config)
+            if interval is not None:
+                self._schedule(interval, events.REGROW)
+        elif kind == events.RESPAWN:
+            if len(self.foods) < simulation.food_capacity(self.config, self.food_count):
+                await self._add_food(behaviour, event.data)
+        elif kind == events.STARVE:
+            # el plazo pudo quedar obsoleto si después apareció (o se comió) comida
+            grace = getattr(self.config, "last_eat_grace", 15.0)
+            if not self.foods and self.timescale.now() - self.last_eat_time >= grace - 1e-9:
+                print(f"Generation {self.generation}: timeout reached (no food for {grace:g}s), forcing end...")
+                await self._force_end(behaviour)
+        elif kind == events.DEADLINE:
+            print(f"Generation {self.generation}: generation_duration reached, forcing end...")
+            await self._force_end(behaviour)
+        elif kind == events.END:
+            await self._end_generation(behaviour)
+
+    async def _force_end(self, behaviour):
+        """Pide a las criaturas activas que terminen y cierra la generación un segundo (simulado) después."""
+        for cid in list(self.active_cids):
+            msg = Message(to=self.creatures_info[cid].jid)
+            msg.set_metadata("performative", "inform")
+            msg.body = json.dumps({"type": "generation_end"})
+            await behaviour.send(msg)
+        self._schedule(1.0, events.END)
+
+    async def _add_food(self, behaviour, fpos):
+        """Añade un pellet; las criaturas en silencio para las que queda más cerca que su objetivo lo reciben."""
+        fpos = tuple(fpos)
+        self.foods.append(fpos)
+        self.food_grid.insert(fpos, fpos[0], fpos[1])
+        self.foods_version += 1
+        detection_radius = getattr(self.config, "detection_radius", 1.0)
+        now = self.timescale.now()
+        for cid, m in list(self.motion.items()):
+            x, y = self.position(cid, now)
+            # con margen de detección: el pellet puede quedar junto al camino hacia el objetivo actual
+            if math.hypot(fpos[0] - x, fpos[1] - y) - detection_radius < math.hypot(m[3] - x, m[4] - y):
+                self._clear_motion(cid)
+                await self._push_target(behaviour, cid, fpos)
+
+    async def _push_target(self, behaviour, cid, target):
+        """Objetivo nuevo (o `no_target`) para una criatura en silencio; vuelve a reportar en el siguiente tick."""
+        msg = Message(to=self.creatures_info[cid].jid)
+        msg.set_metadata("performative", "inform")
+        if target is not None:
+            msg.body = json.dumps(self._traced({"type": "target", "x": target[0], "y": target[1], "quiet": 0, "push": True}))
+        else:
+            msg.body = json.dumps(self._traced({"type": "no_target", "quiet": 0, "push": True}))
+        await behaviour.send(msg)
+
+    def _record_move(self, cid, start, pos, data):
+        """Acumula el `status` de `cid` en el tick en curso. Devuelve el inicio de su camino en el tick.
+
+        Si la criatura reporta dos veces en el mismo tick se conserva el inicio del primero y la
+        respuesta del último cuenta también para el anterior (`coalesced`).
+        """
+        move = self.tick_moves.get(cid)
+        if move is None:
+            self.tick_moves[cid] = [start, pos, data]
+            return start
+        data["coalesced"] = data.get("coalesced", 0) + 1 + move[2].get("coalesced", 0)
+        move[1] = pos
+        move[2] = data
+        return move[0]
+
+    async def _resolve_barrier(self, behaviour):
+        """Resuelve comida y depredación de todos los movimientos del tick (ver `resolve.py`) y responde."""
+        moves, self.tick_moves = self.tick_moves, {}
+        if not moves or self._ending:
+            return
+        now = self.timescale.now()
+        creatures = self.creatures_info
+        movers = []
+        for cid, ((sx, sy), (px, py), _) in moves.items():
+            info = creatures[cid]
+            if cid in self.active_cids and info.alive:
+                movers.append((cid, sx, sy, px, py, float(info.size or 0), float(info.sense or 0)))
+        results = resolve.resolve_tick(movers, self.food_grid, lambda m: self._predation_candidates(m[0], (m[1], m[2]), (m[3], m[4]), m[6], now), self.config)
+        for kind, cid, target, d in results:
+            if kind == resolve.EAT:
+                await self._apply_eat(behaviour, cid, target, moves[cid][2])
+            else:
+                await self._apply_kill(behaviour, cid, target, d, moves[cid][2])
+        for cid, *_ in movers:
+            info = creatures[cid]
+            if cid in self.active_cids and info.alive:
+                await self._send_target(behaviour, cid, info, moves[cid][1], moves[cid][2], now)
+
+    async def _apply_eat(self, behaviour, cid, fpos, data):
+        """`cid` se come la comida `fpos`: la retira, actualiza el registro y confirma a la criatura."""
+        info = self.creatures_info[cid]
+        self._remove_food(fpos)
+        # las criaturas en silencio que iban hacia esta comida reciben un objetivo nuevo
+        await self._retarget_watchers(behaviour, fpos, exclude=cid)
+        self.last_eat_time = self.timescale.now()
+        self._food_eaten(fpos)
+        # actualizar contador local
+        info.foods_eaten += 1
+        self.stats.eat(cid)
+        # confirmar al creature
+        reply = Message(to=info.jid)
+        reply.set_metadata("performative", "inform")
+        reply.body = json.dumps(self._traced({"type": "eat_confirm", "cid": cid}, data))
+        await behaviour.send(reply)
+        print(f"  {info.jid} ate food at {fpos}")
+        self._record_event(replay.EV_EAT, cid, x=fpos[0], y=fpos[1])
+        try:
+            logger.info(f"{info.jid} ate food at {fpos}")
+        except Exception:
+            pass
+
+    def _apply_status(self, cid, info, start, pos, data):
+        """Copia un `status` al registro, la rejilla y la extrapolación. Devuelve el instante simulado."""
+        # actualizar energía, posición, tamaño, sense, speed y kills presentes en el status
+        info.update_from_status(data)
+        self.stats.status(cid, info.energy, data.get("satisfied"), data.get("survival"))
+        now = self.timescale.now()
+        self.last_report[cid] = now
+        self._clear_motion(cid)
+        if cid in self.active_cids:
+            self.creature_grid.move(cid, pos[0], pos[1])
+            self.prev_pos[cid] = start
+        return now
+
+    async def _apply_kill(self, behaviour, cid, other_cid, d, data):
+        """`cid` depreda a `other_cid` (distancia `d`): registro, mensajes, CSV y parada de la presa."""
+        info = self.creatures_info[cid]
+        cfg = self.config
+        other_info = self.creatures_info[other_cid]
+        if not other_info.alive:
+            return
+        ox, oy, o_size = other_info.x, other_info.y, other_info.size
+        # el depredador mata exitosamente a la presa
+        prey_jid = other_info.jid
+        # mark prey as dead in registry
+        other_info.alive = False
+        # clear prey's food count so it won't reproduce
+        other_info.foods_eaten = 0
+        other_info.energy = 0
+        # remove from active set if present
+        self.active_cids.discard(other_cid)
+        self._clear_motion(other_cid)
+        self._unindex_creature(other_cid)
+        self._check_idle()
+        # increase predator's foods_eaten and energy according to prey size
+        gained = simulation.prey_energy_gain(o_size, cfg)
+        info.foods_eaten = (info.foods_eaten or 0) + 1
+        info.energy = float(info.energy or 0) + gained
+        # Incrementar contador de kills del depredador
+        info.kills = (info.kills or 0) + 1
+        self.stats.kill(cid, other_cid)
+        self.stats.set_energy(cid, info.energy)
+        self._record_event(replay.EV_KILL, cid, other_cid, x=ox, y=oy)
+        print(f"  {info.jid} predated on {prey_jid} at d={d:.2f}, energy+={gained:.2f}")
+        try:
+            logger.info(f"{info.jid} predated on {prey_jid} at d={d:.2f}, energy+={gained:.2f}")
+        except Exception:
+            pass
+        # enviar `eat_confirm` al depredador para que el agente local también actualice su estado
+        pred_ack = Message(to=info.jid)
+        pred_ack.set_metadata("performative", "inform")
+        pred_ack.body = json.dumps(self._traced({"type": "eat_confirm", "cid": cid, "energy_gain": gained, "prey": other_cid}, data))
+        await behaviour.send(pred_ack)
+
+        # Enviar kill_confirmed para que el depredador actualice su contador
+        kill_msg = Message(to=info.jid)
+        kill_msg.set_metadata("performative", "inform")
+        kill_msg.body = json.dumps({"type": "kill_confirmed", "kills": info.kills})
+        await behaviour.send(kill_msg)
+        # registrar evento de depredación en CSV
+        try:
+            write_header = not os.path.exists(self.predation_file)
+            with open(self.predation_file, "a", newline="", encoding="utf-8") as pf:
+                pw = csv.writer(pf)
+                if write_header:
+                    pw.writerow(["generation", "time", "predator_base", "predator_jid", "prey_base", "prey_jid", "energy_gained", "pred_x", "pred_y", "prey_x", "prey_y", "distance"])
+                pw.writerow([self.generation, time.time(), jid_base(info.jid), info.jid, jid_base(prey_jid), prey_jid, f"{gained:.3f}", f"{info.x:.3f}", f"{info.y:.3f}", f"{ox:.3f}", f"{oy:.3f}", f"{d:.3f}"])
+        except Exception as e:
+            logger.error(f"Failed writing predation event: {e}")
+        # instruir a la presa para que termine (muerta). Preferir detener el agente
+        prey_agent = self.spawned_map.pop(other_cid, None)
+        if prey_agent is not None:
+            try:
+                # stop the prey agent directly to avoid sending messages to stopped agents
+                await prey_agent.stop()
+            except Exception:
+                pass
+        else:
+            # alternativa: enviar generation_end si no tenemos el objeto agente
+            endm = Message(to=prey_jid)
+            endm.set_metadata("performative", "inform")
+            endm.body = json.dumps({"type": "generation_end", "killed_by": info.jid})
+            await behaviour.send(endm)
+        # notificar al Host UI que la presa fue eliminada (killed)
+        try:
+            host_j = getattr(self, "host_jid", None)
+            if host_j:
+                rem = Message(to=host_j)
+                rem.set_metadata("performative", "inform")
+                rem.body = json.dumps(self._traced({"type": "creature_removed", "cid": other_cid, "jid": prey_jid, "reason": "killed", "killed_by": info.jid}))
+                await behaviour.send(rem)
+        except Exception:
+            pass
+
+    async def _send_target(self, behaviour, cid, info, pos, data, now):
+        """Responde a un `status` con la comida más cercana (o `no_target`) y la ventana `quiet`."""
+        cfg = self.config
+        target_msg = Message(to=info.jid)
+        target_msg.set_metadata("performative", "inform")
+        nearest = self.food_grid.nearest(pos[0], pos[1])
+        # ticks que puede avanzar sin reportar (0 = reportar en el siguiente tick)
+        # sin comida y con regeneración, reportar en cada tick: el pellet nuevo puede aparecer en cualquier sitio
+        regrowing = nearest is None and getattr(cfg, "food_regrowth_rate", 0.0) > 0
+        quiet = 0 if regrowing else self._quiet_ticks(cid, info, pos, nearest, now)
+        if quiet > 0 and data.get("home"):
+            # de vuelta a casa la posición se extrapola hacia el spawn, con la misma ventana que
+            # las demás: reporta antes de poder comer o entrar en un radio de ataque
+            self._set_motion(cid, now, pos, self.spawn_points[cid], data.get("period"), watch=False)
+        if nearest is not None:
+            # buscar comida más cercana al creature
+            body = {"type": "target", "x": nearest[0], "y": nearest[1], "quiet": quiet}
+            if quiet > 0 and not data.get("home"):
+                self._set_motion(cid, now, pos, nearest, data.get("period"))
+        else:
+            body = {"type": "no_target", "quiet": quiet}
+        if data.get("coalesced"):
+            # esta respuesta también cuenta para los statuses descartados por backpressure
+            body["coalesced"] = data["coalesced"]
+        target_msg.body = json.dumps(self._traced(body, data))
+        await behaviour.send(target_msg)
+
+    async def _retarget_watchers(self, behaviour, fpos, exclude=None):
+        """Envía un objetivo nuevo a las criaturas en silencio que iban hacia la comida `fpos`."""
+        watchers = self.food_watchers.pop(tuple(fpos), None)
+        if not watchers:
+            return
+        now = self.timescale.now()
+        for cid in list(watchers):
+            if cid == exclude or cid not in self.motion or cid not in self.active_cids:
+                continue
+            pos = self.position(cid, now)
+            self._clear_motion(cid)
+            await self._push_target(behaviour, cid, self.food_grid.nearest(pos[0], pos[1]))
+
+    def _stop_profiler(self):
+        """Cierra el perfil de la generación actual y registra sus funciones más costosas."""
+        if self.profiler is None:
+            return
+        try:
+            saved = self.profiler.stop()
+        except Exception as e:
+            logger.error(f"Failed writing profile for generation {self.generation}: {e}")
+            return
+        if saved is not None:
+            path, summary = saved
+            logger.info(f"Generation {self.generation} profile saved to {path}\n{summary}")
+
+    def _traced(self, payload, origin=None):
+        """Añade id de traza y marca de envío a `payload` si el trazado está activo.
+
+        `origin` es el `status` al que responde: se reutiliza su id y se copia su marca
+        (`origin_ts`) para que la criatura mida la ida y vuelta.
+        """
+        if self.tracer is None:
+            return payload
+        return self.tracer.stamp(payload, origin.get("trace") if origin else None, origin)
+
+    def _export_trace(self):
+        """Escribe los mensajes de la generación actual en report/trace_gen<N>.json."""
+        if self.tracer is None:
+            return
+        try:
+            path = self.tracer.export_chrome(tracing.trace_path(self.report_dir, self.generation))
+        except Exception as e:
+            logger.error(f"Failed writing trace for generation {self.generation}: {e}")
+            return
+        logger.info(f"Generation {self.generation} message trace saved to {path}\n{self.tracer.summary()}")
+
+    def _record_event(self, code, who=None, other=0, x=0.0, y=0.0):
+        """Registra un evento en el replay; `who`/`other` son cids (o jid_base, que se traducen a índice)."""
+        rec = self.recorder
+        if rec is None:
+            return
+        a = rec.creature_id(who) if isinstance(who, str) else (who or 0)
+        b = rec.creature_id(other) if isinstance(other, str) else other
+        if a is None or b is None:
+            return
+        rec.event(self.timescale.now() - self.generation_t0, code, a, b, x, y)
+
+    def _save_checkpoint(self, next_population):
+        """Guarda el estado completo al final de la generación actual."""
+        state = {
+            "generation": self.generation,
+            "max_generations": self.max_generations,
+            "num_initial": self.num_initial,
+            "food_count": self.food_count,
+            "space_size": self.space_size,
+            "creatures_info": self.creatures_info,
+            "foods": list(self.foods),
+            "next_population": {name: getattr(next_population, name) for name in ("speed", "energy", "size", "sense")},
+            "rng_state": random.getstate(),
+            "config": dataclasses.asdict(self.config),
+            "time": time.time(),
+        }
+        try:
+            checkpoint.save_checkpoint(self.checkpoint_file, state)
+            logger.info(f"Checkpoint saved at generation {self.generation}: {self.checkpoint_file}")
+        except Exception as e:
+            logger.error(f"Failed writing checkpoint: {e}")
+
+    def load_resume_state(self):
+        """Lee `resume_checkpoint` (una sola vez) y adopta su configuración. Devuelve el estado o None.
+
+        Se llama antes de crear los componentes que dependen de la configuración (escala de
+        tiempo, backpressure, barrera, replay, trazas): `setup` lo hace al
+        empezar y `HostAgent.setup` antes, para compartir la misma configuración.
+        """
+        if self._resume_state is not None or not self.resume_checkpoint:
+            return self._resume_state
+        try:
+            state = checkpoint.load_checkpoint(self.resume_checkpoint)
+        except Exception as e:
+            logger.error(f"Failed reading checkpoint {self.resume_checkpoint}: {e}")
+            state = None
+        if state is None:
+            print(f"No checkpoint found at {self.resume_checkpoint}, starting from generation 1")
+            self.resume_checkpoint = None
+            return None
+        self.config = checkpoint.config_from_state(state, type(self.config))
+        self._resume_state = state
+        return state
+
+    async def _resume_from_checkpoint(self, state):
+        """Restaura el estado de un checkpoint (ya aplicada su configuración) y arranca la generación siguiente."""
+        self.max_generations = state["max_generations"]
+        self.num_initial = state["num_initial"]
+        self.food_count = state["food_count"]
+        self.space_size = state["space_size"]
+        # checkpoints anteriores guardaban dicts por criatura
+        self.creatures_info = from_registry(state["creatures_info"])
+        self._set_foods(state["foods"])
+        self.generation = state["generation"]
+        random.setstate(state["rng_state"])
+        population = evolution.Population(**state["next_population"])
+        print(f"Resuming from checkpoint: generation {self.generation} completed, next population={len(population)}")
+        logger.info(f"Resuming from checkpoint at generation {self.generation} ({self.resume_checkpoint})")
+        if len(population) == 0 or self.generation >= self.max_generations:
+            await self._restart_simulation()
+            return
+        await self.spawn_generation(spawn_list=population)
+
     async def _restart_simulation(self):
         """Reinicia la simulacion desde cero."""
         print("Restarting simulation: stopping all agents...")
-        for agent in self.spawned_agents:
-            try:
-                await agent.stop()
-            except Exception as e:
-                print(f"Error stopping agent: {e}")
+        await self._release_generation()
 
         self.generation = 0
-        self.spawned_agents = []
-        self.spawned_map = {}
-        self.creatures_info = {}
-        self.active_creature_jids = set()
-        self.foods = []
+        self.creatures_info = []
+        self.active_cids = set()
+        self.cid_by_jid = {}
+        self._set_foods([])
         self._ending = False
-        self.last_eat_time = time.time()
+        self.last_eat_time = self.timescale.now()
 
         print("Restarting simulation: spawning generation 1...")
-        await asyncio.sleep(1)
+        await self.timescale.sleep(1)
         await self.spawn_generation()
 
     async def setup(self):
         print(f"GenerationAgent {str(self.jid)} started")
+        # al reanudar manda la configuración del checkpoint: cargarla antes de crear los componentes
+        state = self.load_resume_state()
+        # la configuración puede haberse reemplazado tras el constructor (ver HostAgent.setup)
+        self.timescale.set_speed(getattr(self.config, "time_scale", 1.0))
+        self.shedder = backpressure.LoadShedder.from_config(self.config)
         # añadir behaviours primero para no perder mensajes entrantes
         self.add_behaviour(self.RecvBehav())
-        self.add_behaviour(self.MonitorBehav(period=1))
-        # iniciar primera generación
-        await self.spawn_generation()
+        # los behaviours que no reciben mensajes llevan una plantilla vacía (ver `transport.no_messages`)
+        self.add_behaviour(self.EventBehav(), no_messages())
+        if getattr(self.config, "tick_barrier", False):
+            period = self._barrier_period()
+            self.barrier = self.BarrierBehav(period=self.timescale.scaled(period))
+            self.timescale.subscribe(self.barrier, period)
+            self.add_behaviour(self.barrier, no_messages())
+        if getattr(self.config, "profile_generations", False):
+            import profiling
+            self.profiler = profiling.GenerationProfiler(self.report_dir, top=getattr(self.config, "profile_top", 20))
+        if getattr(self.config, "trace_messages", False):
+            self.tracer = tracing.Tracer(max_events=getattr(self.config, "trace_max_events", 200_000))
+        if getattr(self.config, "record_replay", False):
+            self.recorder = replay.ReplayRecorder(replay.replay_path(self.report_dir))
+            replay_period = getattr(self.config, "replay_period", 0.25)
+            recorder_behav = self.RecordBehav(period=self.timescale.scaled(replay_period))
+            self.timescale.subscribe(recorder_behav, replay_period)
+            self.add_behaviour(recorder_behav, no_messages())
+        # continuar desde un checkpoint si se solicitó, si no iniciar la primera generación
+        if state is not None:
+            await self._resume_from_checkpoint(state)
+        else:
+            await self.spawn_generation()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,17 @@
-import spade
-from spade.agent import Agent
-from spade.behaviour import CyclicBehaviour
+import transport
+from transport import Agent, CyclicBehaviour, Message
 from generationAgent import GenerationAgent
 from world import WorldConfig
 import asyncio
-import aiohttp.web
 import os
 import json
-import webbrowser
 import time
+from collections import deque
+import backpressure
+import replay
+import reports
+import snapshot
+from records import CreatureRecord
 from logger_setup import get_logger
 
 logger = get_logger('host')
@@ -16,54 +19,65 @@ logger = get_logger('host')
 class HostAgent(Agent):
     class RecvBehav(CyclicBehaviour):
         async def run(self):
-            msg = await self.receive(timeout=1)
-            if msg is None:
+            # la UI solo necesita el último status de cada criatura: con el buzón saturado se
+            # descartan los obsoletos (ver `backpressure.py`)
+            shedder = self.agent.shedder
+            msg, data = await shedder.next(self)
+            shedder.update(shedder.pending(self))
+            if msg is None or data is None:
                 return
+            # Registrar en nivel DEBUG cada evento recibido para trazabilidad (formateo diferido:
+            # con el nivel INFO de los manejadores no se construye el texto)
             try:
-                data = json.loads(msg.body)
-            except Exception:
-                return
-            # Registrar en nivel DEBUG cada evento recibido para trazabilidad
-            try:
-                logger.info(f"Host received: {data}")
+                logger.debug("Host received: %s", data)
             except Exception:
                 pass
 
+            # latencia de llegada al host de los mensajes trazados (ver `tracing.py`)
+            tracer = getattr(getattr(self.agent, "gen", None), "tracer", None)
+            if tracer is not None and "ts" in data:
+                if data.get("type") == "status" and data.get("cid") is not None:
+                    tracer.received(data, data["cid"], "host", hop="creature_to_host")
+                elif data.get("type") == "creature_removed":
+                    # las eliminaciones por depredación o fin de generación las envía la generación
+                    src = data["cid"] if data.get("reason") in ("exhausted", "finished") else "generation"
+                    tracer.received(data, src, "host", hop="removal_to_host")
+
             if data.get("type") == "status":
                 jid = data.get("jid")
-                if jid is None:
+                cid = data.get("cid")
+                gen = data.get("gen", self.agent.generation)
+                if cid is not None and gen != self.agent.generation:
+                    # status tardío de una generación anterior (los cids se reasignan en cada generación;
+                    # tras un reinicio desde la generación 1 la adopta `generation_start`)
+                    if gen < self.agent.generation:
+                        return
+                    # de una generación posterior: `generation_start` se perdió o aún no llegó
+                    self.agent._start_generation(gen)
+                # fishes se indexa por cid; el jid solo se usa si el mensaje no trae cid
+                key = cid if cid is not None else jid
+                if key is None:
                     return
-                # Si este jid fue eliminado hace muy poco, ignorar el estado entrante
-                try:
-                    cutoff = time.time() - 3.0
-                    if hasattr(self.agent, 'removals'):
-                        for r in getattr(self.agent, 'removals'):
-                            if r.get('jid') == jid and r.get('time', 0) >= cutoff:
-                                # ignore stale status arriving after removal
-                                logger.info(f"Host: ignoring status for recently removed {jid}")
-                                return
-                except Exception:
-                    pass
-                # almacenar información mínima para la interfaz web
-                self.agent.fishes[jid] = {
-                    "jid": jid,
-                    "x": data.get("x", 0),
-                    "y": data.get("y", 0),
-                    "energy": data.get("energy", 0),
-                    "foods_eaten": data.get("foods_eaten", 0),
-                    "speed": data.get("speed", 0),
-                    "size": data.get("size", None),
-                    "sense": data.get("sense", None),
-                    "kills": data.get("kills", 0),
-                }
+                # Si esta criatura fue eliminada hace muy poco, ignorar el estado entrante
+                removed_at = self.agent.removed_keys.get(key)
+                if removed_at is not None and removed_at >= time.time() - 3.0:
+                    # ignore stale status arriving after removal
+                    logger.info(f"Host: ignoring status for recently removed {jid}")
+                    return
+                # almacenar información mínima para la interfaz web (registro reutilizado entre statuses)
+                fish = self.agent.fishes.get(key)
+                if fish is None:
+                    fish = self.agent.fishes[key] = CreatureRecord(jid, cid=cid)
+                fish.update_from_status(data)
+                fish.foods_eaten = data.get("foods_eaten", 0)
+                self.agent.world_version += 1
             elif data.get("type") == "generation_start":
                 # limpiar las criaturas previas al iniciar una nueva generación
                 try:
-                    # keep a short history of removals
-                    if not hasattr(self.agent, 'removals'):
-                        self.agent.removals = []
-                    self.agent.fishes = {}
-                    logger.info(f"Host: generation {data.get('generation')} started — cleared fishes")
+                    generation = data.get('generation', self.agent.generation)
+                    # un status de la generación nueva pudo adelantarse y ya limpió el estado
+                    if generation != self.agent.generation:
+                        self.agent._start_generation(generation)
                 except Exception:
                     pass
             elif data.get("type") in ("finished", "creature_removed"):
@@ -71,41 +85,63 @@ class HostAgent(Agent):
                 jid = data.get("jid") or (str(msg.sender).split("/")[0] if msg and msg.sender else None)
                 reason = data.get("reason") or ("finished" if data.get("type") == "finished" else "removed")
                 killed_by = data.get("killed_by") or data.get("killed_by")
+                key = data.get("cid") if data.get("cid") is not None else jid
                 if jid:
                     # fetch last known position before popping
                     pos = None
                     try:
-                        if jid in self.agent.fishes:
-                            pos = (self.agent.fishes[jid].get('x'), self.agent.fishes[jid].get('y'))
+                        if key in self.agent.fishes:
+                            pos = (self.agent.fishes[key].x, self.agent.fishes[key].y)
                     except Exception:
                         pos = None
                     try:
-                        self.agent.fishes.pop(jid, None)
+                        self.agent.fishes.pop(key, None)
                     except Exception:
                         pass
+                    self.agent.world_version += 1
                     # record removal event for frontend flashing
                     try:
-                        if not hasattr(self.agent, 'removals'):
-                            self.agent.removals = []
+                        now = time.time()
                         if pos is not None:
-                            self.agent.removals.append({"jid": jid, "x": pos[0], "y": pos[1], "time": time.time(), "reason": reason, "killed_by": killed_by})
+                            self.agent.removals.append({"key": key, "jid": jid, "x": pos[0], "y": pos[1], "time": now, "reason": reason, "killed_by": killed_by})
                         else:
                             # still append without coords so frontend can ignore if missing
-                            self.agent.removals.append({"jid": jid, "time": time.time(), "reason": reason, "killed_by": killed_by})
+                            self.agent.removals.append({"key": key, "jid": jid, "time": now, "reason": reason, "killed_by": killed_by})
+                        self.agent.removed_keys[key] = now
                         logger.info(f"Host: removed {jid} reason={reason} killed_by={killed_by}")
-                        # trim old removals (keep last 5 seconds)
-                        cutoff = time.time() - 5.0
-                        self.agent.removals = [r for r in self.agent.removals if r.get('time', 0) >= cutoff]
+                        self.agent._trim_removals(now - 5.0)
                     except Exception:
                         pass
 
+    def _start_generation(self, generation):
+        """Limpia las criaturas de la generación anterior y pasa a `generation`."""
+        # los cids se reasignan en cada generación: las eliminaciones recientes ya no
+        # deben ocultar los statuses de las criaturas nuevas con el mismo cid
+        self.removed_keys.clear()
+        self.fishes = {}
+        self.generation = generation
+        self.world_version += 1
+        logger.info(f"Host: generation {generation} started — cleared fishes")
+
+    def _trim_removals(self, cutoff):
+        """Descarta las eliminaciones anteriores a `cutoff` (llegan en orden: solo por la izquierda)."""
+        removals = self.removals
+        while removals and removals[0].get("time", 0) < cutoff:
+            r = removals.popleft()
+            if self.removed_keys.get(r.get("key")) == r.get("time"):
+                del self.removed_keys[r["key"]]
+
     async def _start_web(self, port=10000):
+        # el stack web se importa solo al arrancar la UI (no al importar el módulo)
+        import aiohttp.web
+        import webbrowser
+
         base_dir = os.path.dirname(os.path.abspath(__file__))
         static_folder = os.path.join(base_dir, "static")
 
         app = aiohttp.web.Application()
 
-        async def fishes_controller(request):
+        def build_state(view):
             # return list of fishes and current foods for web interface
             fishes = list(self.fishes.values())
             foods = []
@@ -116,7 +152,7 @@ class HostAgent(Agent):
             # include recent removals for frontend flashing
             removals = []
             try:
-                removals = list(self.removals) if hasattr(self, 'removals') else []
+                removals = list(self.removals)
             except Exception:
                 removals = []
             # obtener número de generación actual
@@ -125,7 +161,26 @@ class HostAgent(Agent):
                 generation = self.gen.generation if hasattr(self, "gen") else 0
             except Exception:
                 generation = 0
-            return aiohttp.web.json_response({"fishes": fishes, "foods": foods, "space_size": self.gen.space_size if hasattr(self, "gen") else (30, 30), "removals": removals, "generation": generation})
+            space_size = self.gen.space_size if hasattr(self, "gen") else (30, 30)
+            # si el cliente envía su viewport, solo se detalla lo visible (resto en teselas de densidad)
+            if view is not None:
+                return snapshot.viewport_snapshot(fishes, foods, removals, generation, space_size, view)
+            return snapshot.world_snapshot(fishes, foods, removals, generation, space_size)
+
+        async def fishes_controller(request):
+            # la respuesta codificada se comparte entre todos los clientes mientras no cambie
+            # el mundo: versión de fishes/removals (RecvBehav), de la comida y la generación
+            gen = getattr(self, "gen", None)
+            version = (self.world_version, getattr(gen, "foods_version", 0), getattr(gen, "generation", 0))
+            view = snapshot.parse_viewport(request.query)
+            entry = self.snapshot_cache.get(version, view, lambda: build_state(view))
+            headers = {"ETag": entry.etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+            if request.headers.get("If-None-Match") == entry.etag:
+                return aiohttp.web.Response(status=304, headers=headers)
+            encoding = snapshot.choose_encoding(request.headers.get("Accept-Encoding"))
+            if encoding != "identity":
+                headers["Content-Encoding"] = encoding
+            return aiohttp.web.Response(body=entry.body(encoding), content_type="application/json", headers=headers)
 
         async def set_speed(request):
             try:
@@ -133,18 +188,13 @@ class HostAgent(Agent):
                 speed = float(data.get('speed', 1.0))
                 # Limitar velocidad entre 0.25 y 2.0
                 speed = max(0.25, min(2.0, speed))
-                
-                # Actualizar el periodo de reporte de las criaturas
-                if hasattr(self, 'gen') and hasattr(self.gen, 'spawned_agents'):
-                    for creature in self.gen.spawned_agents:
-                        if hasattr(creature, 'state'):
-                            # Ajustar el periodo del behaviour de reporte
-                            report_behav = creature.behaviours[0] if creature.behaviours else None
-                            if report_behav and hasattr(report_behav, 'period'):
-                                # Periodo inverso a la velocidad (más rápido = menor periodo)
-                                base_period = 1.0
-                                report_behav.period = base_period / speed
-                
+
+                # La escala de tiempo global reescala todos los behaviours periódicos y esperas
+                # suscritos (criaturas y generación) de una sola vez
+                if not hasattr(self, 'gen') or getattr(self.gen, 'timescale', None) is None:
+                    return aiohttp.web.json_response({"success": False, "error": "no_generation"}, status=500)
+                speed = self.gen.timescale.set_speed(speed)
+
                 return aiohttp.web.json_response({"success": True, "speed": speed})
             except Exception as e:
                 return aiohttp.web.json_response({"success": False, "error": str(e)}, status=400)
@@ -177,16 +227,39 @@ class HostAgent(Agent):
             try:
                 msg = Message(to=gen_jid)
                 msg.set_metadata("performative", "inform")
-                msg.body = json.dumps({"type": "kill", "target_jid": jid})
+                msg.body = json.dumps({"type": "kill", "target_jid": jid, "target_cid": payload.get("cid")})
                 await self.send(msg)
             except Exception:
                 return aiohttp.web.json_response({"ok": False, "error": "send_failed"}, status=500)
 
             return aiohttp.web.json_response({"ok": True})
 
+        async def stats_controller(request):
+            # agregados incrementales de la generación actual (ver `stats.py`)
+            gen = getattr(self, "gen", None)
+            if gen is None or getattr(gen, "stats", None) is None:
+                return aiohttp.web.json_response({"error": "no_generation"}, status=500)
+            snap = gen.stats.snapshot()
+            # acciones de backpressure aplicadas (descartes, escalones, slow_down enviados)
+            snap["backpressure"] = {"generation": gen.shedder.snapshot(), "host": self.shedder.snapshot()}
+            return aiohttp.web.json_response(snap)
+
+        async def latency_controller(request):
+            # histogramas de latencia por salto (solo con `trace_messages`, ver `tracing.py`)
+            tracer = getattr(getattr(self, "gen", None), "tracer", None)
+            if tracer is None:
+                return aiohttp.web.json_response({"enabled": False})
+            return aiohttp.web.json_response({"enabled": True, **tracer.snapshot()})
+
         app.router.add_get('/fishes', fishes_controller)
+        app.router.add_get('/stats', stats_controller)
+        app.router.add_get('/latency', latency_controller)
         app.router.add_post('/set_speed', set_speed)
         app.router.add_post('/kill', kill_controller)
+        # reproducción offline del replay.bin que graba la generación (no requiere agentes)
+        gen = getattr(self, "gen", None)
+        report_dir = gen.report_dir if gen is not None else os.path.join(base_dir, "report")
+        replay.register_replay_routes(app, replay.replay_path(report_dir))
         # servir archivos estáticos
         if os.path.isdir(static_folder):
             app.router.add_static('/static/', path=static_folder, name='static')
@@ -205,47 +278,71 @@ class HostAgent(Agent):
         # conservar referencia del runner para detenerlo más tarde
         self._web_runner = runner
 
-    async def setup(self):
-        print("Host starting: creating GenerationAgent")
-        cfg = WorldConfig()
-        # mapeo jid -> estado para el frontend
+    def _init_state(self, cfg):
+        """Estado del frontend y `RecvBehav` (sin servidor web ni GenerationAgent; ver `benchmarks/soak.py`)."""
+        # mapeo cid -> CreatureRecord para el frontend (generación actual)
         self.fishes = {}
+        # eliminaciones de los últimos 5 s en orden de llegada (destello en el frontend) y
+        # clave -> instante de la última, para descartar statuses tardíos en O(1)
+        self.removals = deque()
+        self.removed_keys = {}
+        self.generation = 0
+        # versión de fishes/removals: invalida la caché de respuestas de /fishes (ver `snapshot.SnapshotCache`)
+        self.world_version = 0
+        self.snapshot_cache = snapshot.SnapshotCache(min_interval=getattr(cfg, "snapshot_interval", 0.1))
+        # el host solo coalesce statuses: la degradación por escalones la decide la generación
+        self.shedder = backpressure.LoadShedder.from_config(cfg, policies=(backpressure.COALESCE,))
         # añadir comportamiento para recibir estados de las criaturas (se espera que las criaturas también reporten al host)
         self.add_behaviour(self.RecvBehav())
-        # iniciar el servidor web en segundo plano pronto para que la UI pueda conectarse y el host reciba notificaciones de eliminación
-        asyncio.create_task(self._start_web(port=10000))
 
-        # crear GenerationAgent después de registrar los behaviours del host para evitar perder mensajes
-        gen = GenerationAgent("generation@localhost", cfg.generation_password, num_initial=cfg.num_initial, food_count=cfg.food_count, space_size=cfg.space_size, max_generations=cfg.max_generations)
+    async def setup(self):
+        print("Host starting: creating GenerationAgent")
+        # `config`, `web`, `port` y `report_dir` se pueden fijar antes de `start` (ver `runner.py`)
+        cfg = getattr(self, "config", None) or WorldConfig()
+        domain = str(self.jid).split("/")[0].split("@")[-1]
+        gen = GenerationAgent(f"generation@{domain}", cfg.generation_password, num_initial=cfg.num_initial, food_count=cfg.food_count, space_size=cfg.space_size, max_generations=cfg.max_generations)
         # asegurar que GenerationAgent use la misma configuración completa (detection_radius, energy cost, etc.)
         gen.config = cfg
+        if getattr(self, "report_dir", None):
+            gen.set_report_dir(self.report_dir)
+        # continuar desde el último checkpoint si se arrancó con --resume: su configuración
+        # reemplaza a la actual antes de crear el estado del host y los componentes de la generación
+        if getattr(self, "resume", False):
+            gen.resume_checkpoint = gen.checkpoint_file
+            gen.load_resume_state()
+            cfg = gen.config
+        if getattr(self, "profile", False):
+            cfg.profile_generations = True
+        if getattr(self, "trace", False):
+            cfg.trace_messages = True
+        self._init_state(cfg)
         # indicar a generation cómo contactar al host para actualizaciones del frontend
         gen.host_jid = str(self.jid).split("/")[0]
         # mantener referencia para un apagado ordenado
         self.gen = gen
+        # iniciar el servidor web en segundo plano pronto para que la UI pueda conectarse y el host reciba notificaciones de eliminación
+        if getattr(self, "web", True):
+            asyncio.create_task(self._start_web(port=getattr(self, "port", 10000)))
+        # arrancar GenerationAgent después de registrar los behaviours del host para evitar perder mensajes
         await gen.start(auto_register=True)
         print("GenerationAgent started")
 
 
-async def main():
-    # Limpiar archivos CSV del directorio report
+async def main(resume=False, profile=False, trace=False):
+    # Limpiar archivos CSV del directorio report (salvo al reanudar: se anexan a los existentes)
     report_dir = os.path.join(os.path.dirname(__file__), "report")
-    if os.path.exists(report_dir):
-        csv_files = ["generation_summary.csv", "generation_details.csv", "predation_events.csv"]
-        for csv_file in csv_files:
-            file_path = os.path.join(report_dir, csv_file)
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                    print(f"Cleaned: {csv_file}")
-                except Exception as e:
-                    print(f"Warning: Could not clean {csv_file}: {e}")
+    if not resume and os.path.exists(report_dir):
+        for path in reports.clean_report_dir(report_dir):
+            print(f"Cleaned: {os.path.basename(path)}")
     
     host = HostAgent('host@localhost', '123456abcd.')
+    host.resume = resume
+    host.profile = profile
+    host.trace = trace
     await host.start()
     print("Host agent started")
     try:
-        await spade.wait_until_finished(host)
+        await transport.wait_until_finished(host)
     except KeyboardInterrupt:
         print("Keyboard interrupt received — shutting down agents...")
         # attempt clean shutdown
@@ -260,5 +357,16 @@ async def main():
             pass
 
 
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulación SPADE de selección natural")
+    parser.add_argument("--resume", action="store_true", help="continuar desde el último checkpoint en report/ y anexar a los CSV existentes (el checkpoint se lee con pickle: usar solo archivos de confianza)")
+    parser.add_argument("--profile", action="store_true", help="perfilar cada generación con cProfile (report/profile_gen<N>.prof)")
+    parser.add_argument("--trace", action="store_true", help="trazar los mensajes entre agentes (latencias en /latency, report/trace_gen<N>.json para Perfetto)")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    spade.run(main())
\ No newline at end of file
+    args = parse_args()
+    transport.run(main(resume=args.resume, profile=args.profile, trace=args.trace))
\ No newline at end of file
@@ -0,0 +1,457 @@
+"""Kernels opcionales compilados con Numba para los bucles calientes del motor headless.
+
+Con miles de criaturas el tick pasa casi todo el tiempo en cuatro bucles: la búsqueda de
+vecinos por rejilla (comida cerca del camino de cada criatura), el barrido de
+depredación (test de tamaño `attack_size_ratio`, radio `effective_attack_radius` escalado
+por `sense` y una sola muerte por presa), la comida más cercana y el gasto de energía.
+Vectorizarlos con NumPy obliga a temporales O(N²); aquí se escriben como bucles sobre
+arrays con una rejilla CSR (celdas ordenadas por conteo) y Numba los compila.
+
+Cada función pública acepta secuencias de Python y devuelve listas, con dos caminos:
+
+- "numba": los kernels `_*` de este módulo compilados con `numba.njit` (requiere numpy);
+- "python": la implementación de referencia con `spatial.SpatialGrid`, `spatial.closest_approach`
+  y `utils.energy_drain_per_tick`, la misma que usa el resto del código.
+
+Con `backend="nojit"` una llamada ejecuta los mismos kernels `_*` sin compilar (sus
+`py_func`), solo con numpy: es lento, pero permite probar y depurar el código del camino
+"numba" donde Numba no está instalado.
+
+El camino se elige con la variable de entorno `SIM_KERNELS` ("auto" por defecto: Numba si
+está instalado; "numba" lo exige; "python" lo desactiva). `HeadlessWorld` usa los kernels
+en el tick con barrera (`tick_barrier`) solo con el camino "numba"; con "python" conserva
+sus rejillas incrementales. `benchmarks/bench_kernels.py` compara ambos caminos sobre las
+mismas entradas antes de medirlos.
+"""
+import math
+import os
+
+import simulation
+import spatial
+import utils
+
+NUMBA = "numba"
+PYTHON = "python"
+NOJIT = "nojit"
+
+MODE = os.environ.get("SIM_KERNELS", "auto").strip().lower()
+if MODE not in ("auto", NUMBA, PYTHON):
+    raise ValueError(f"SIM_KERNELS desconocido: {MODE!r} (usar 'auto', 'numba' o 'python')")
+
+# kernels que se compilan al primer uso (en este orden: los posteriores llaman a los anteriores)
+_JIT = ("_grow", "_bucket", "_segment_hits", "_predation_claims", "_single_kill", "_nearest", "_drain")
+_np = None  # módulo numpy que usan los kernels, False si no está instalado
+_compiled = None  # kernels compilados (`_kernels`), False si no hay Numba
+
+
+def _numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _np = numpy
+    return _np or None
+
+
+def _kernels(jit):
+    """Espacio de nombres con numpy (`np`) y los kernels `_*`, compilados o sus `py_func`."""
+    import types
+
+    g = globals()
+    funcs = {name: g[name] if jit else getattr(g[name], "py_func", g[name]) for name in _JIT}
+    return types.SimpleNamespace(np=_np, **funcs)
+
+
+def _numba_module():
+    global _compiled
+    if _compiled is None:
+        if MODE == PYTHON:
+            _compiled = False
+            return None
+        try:
+            from numba import njit
+        except ImportError:
+            if MODE == NUMBA:
+                raise
+            _compiled = False
+            return None
+        _numpy()
+        g = globals()
+        for name in _JIT:
+            # los kernels resuelven las globales al compilar: los que se llaman entre sí ven la versión jit
+            g[name] = njit(cache=True)(g[name])
+        _compiled = _kernels(jit=True)
+    return _compiled or None
+
+
+def backend():
+    """Camino activo: "numba" o "python"."""
+    return NUMBA if _numba_module() is not None else PYTHON
+
+
+# --- API ---------------------------------------------------------------------------------
+#
+# `backend` (None = `backend()`) fuerza un camino en una llamada; el benchmark lo usa para
+# comparar ambos sobre las mismas entradas.
+
+def _select(backend):
+    """Kernels `_*` del camino de la llamada (ver `_kernels`), None para el de referencia."""
+    if backend == PYTHON:
+        return None
+    if backend == NOJIT:
+        if _numpy() is None:
+            raise RuntimeError("el camino 'nojit' requiere numpy")
+        return _kernels(jit=False)
+    k = _numba_module()
+    if k is None and backend == NUMBA:
+        raise RuntimeError("los kernels Numba no están disponibles (instalar numba)")
+    return k
+
+
+def segment_hits(px, py, x0, y0, x1, y1, radius, cell=1.0, backend=None):
+    """Puntos a distancia <= radius de cada segmento (x0, y0) -> (x1, y1).
+
+    Devuelve cuatro listas paralelas (segmento, punto, distancia, t), con t en [0, 1] el
+    punto del segmento más cercano; el orden no está especificado.
+    """
+    k = _select(backend)
+    if k is not None:
+        if not len(x0) or not len(px):
+            return [], [], [], []
+        np = k.np
+        px, py = _array(np, px), _array(np, py)
+        grid = k._bucket(px, py, cell)
+        return [a.tolist() for a in k._segment_hits(px, py, *grid, cell, _array(np, x0), _array(np, y0), _array(np, x1), _array(np, y1), float(radius))]
+    grid = spatial.SpatialGrid(cell)
+    for j in range(len(px)):
+        grid.insert(j, px[j], py[j])
+    out = ([], [], [], [])
+    for q in range(len(x0)):
+        for j, d, t in grid.query_segment(x0[q], y0[q], x1[q], y1[q], radius):
+            out[0].append(q)
+            out[1].append(j)
+            out[2].append(d)
+            out[3].append(t)
+    return out
+
+
+def predation_claims(x0, y0, x1, y1, size, sense, max_step=0.0, config=None, backend=None):
+    """Pares depredador -> presa del barrido de un tick, sin resolver conflictos.
+
+    Cada criatura i recorre (x0[i], y0[i]) -> (x1[i], y1[i]) en el mismo intervalo; i puede
+    atacar a j si `size[i] >= attack_size_ratio * size[j]` y el máximo acercamiento de ambos
+    caminos es <= `effective_attack_radius(sense[i])`. `max_step` es el paso máximo de una
+    criatura en el tick (amplía la búsqueda en la rejilla de posiciones finales). Devuelve
+    cuatro listas paralelas (depredador, presa, distancia, t).
+    """
+    attack_size_ratio = getattr(config, "attack_size_ratio", 1.2) if config is not None else 1.2
+    attack = [simulation.effective_attack_radius(s, config) for s in sense]
+    cell = max(max(attack, default=0.0), 0.5)
+    k = _select(backend)
+    if k is not None:
+        if not len(x0):
+            return [], [], [], []
+        np = k.np
+        x1a, y1a = _array(np, x1), _array(np, y1)
+        grid = k._bucket(x1a, y1a, cell)
+        return [a.tolist() for a in k._predation_claims(_array(np, x0), _array(np, y0), x1a, y1a, _array(np, size), _array(np, attack), float(max_step), float(attack_size_ratio), *grid, cell)]
+    grid = spatial.SpatialGrid(cell)
+    for j in range(len(x1)):
+        grid.insert(j, x1[j], y1[j])
+    out = ([], [], [], [])
+    for i in range(len(x0)):
+        for j, _, _ in grid.query_segment(x0[i], y0[i], x1[i], y1[i], attack[i] + max_step):
+            if j == i or size[i] < attack_size_ratio * size[j]:
+                continue
+            d, t = spatial.closest_approach(x0[i], y0[i], x1[i], y1[i], x0[j], y0[j], x1[j], y1[j])
+            if d <= attack[i]:
+                out[0].append(i)
+                out[1].append(j)
+                out[2].append(d)
+                out[3].append(t)
+    return out
+
+
+def predation_sweep(x0, y0, x1, y1, size, sense, max_step=0.0, config=None, backend=None):
+    """Muertes de un tick solo con depredación: (depredador, presa, distancia) en orden de aplicación.
+
+    Las reclamaciones de `predation_claims` se aplican ordenadas por (t, distancia,
+    depredador, presa), como `resolve.resolve_tick`: una presa muere una vez y una criatura
+    muerta ya no depreda después.
+    """
+    pred, prey, dist, t = predation_claims(x0, y0, x1, y1, size, sense, max_step, config, backend)
+    k = _select(backend)
+    if k is not None:
+        if not pred:
+            return []
+        np = k.np
+        pred_a, prey_a = np.asarray(pred, dtype=np.int64), np.asarray(prey, dtype=np.int64)
+        order = np.lexsort((prey_a, pred_a, np.asarray(dist), np.asarray(t)))
+        keep = k._single_kill(pred_a, prey_a, order, len(x0))
+        return [(pred[s], prey[s], dist[s]) for s in keep.tolist()]
+    dead = set()
+    out = []
+    for _, d, i, j in sorted(zip(t, dist, pred, prey)):
+        if i in dead or j in dead:
+            continue
+        dead.add(j)
+        out.append((i, j, d))
+    return out
+
+
+def nearest(px, py, qx, qy, cell=1.0, backend=None):
+    """Índice del punto más cercano a cada consulta (qx[q], qy[q]), o -1 si no hay puntos.
+
+    Con empates a la misma distancia el índice elegido puede variar entre caminos.
+    """
+    k = _select(backend)
+    if k is not None:
+        if not len(qx):
+            return []
+        np = k.np
+        px, py = _array(np, px), _array(np, py)
+        return k._nearest(px, py, *k._bucket(px, py, cell), cell, _array(np, qx), _array(np, qy)).tolist()
+    grid = spatial.SpatialGrid(cell)
+    for j in range(len(px)):
+        grid.insert(j, px[j], py[j])
+    out = []
+    for q in range(len(qx)):
+        j = grid.nearest(qx[q], qy[q])
+        out.append(-1 if j is None else j)
+    return out
+
+
+def drain(energy, size, speed, sense, seeking, scale, config=None, backend=None):
+    """Energía tras el gasto de un tick de cada criatura (`simulation.tick_drain` * `scale`)."""
+    energy_scale = getattr(config, "energy_scale", 0.02) if config is not None else 0.02
+    sense_scale = getattr(config, "sense_scale", 0.02) if config is not None else 0.02
+    seek = getattr(config, "seek_energy_multiplier", 1.3) if config is not None else 1.3
+    k = _select(backend)
+    if k is not None:
+        if not len(energy):
+            return []
+        np = k.np
+        return k._drain(_array(np, energy), _array(np, size), _array(np, speed), _array(np, sense), np.asarray(seeking, dtype=np.bool_), _array(np, scale), energy_scale, sense_scale, seek).tolist()
+    out = []
+    for i in range(len(energy)):
+        d = utils.energy_drain_per_tick(size[i], speed[i], sense[i], energy_scale, sense_scale)
+        if seeking[i]:
+            d *= seek
+        out.append(energy[i] - d * scale[i])
+    return out
+
+
+def _array(np, values):
+    return np.asarray(values, dtype=np.float64)
+
+
+# --- kernels (subconjunto compatible con Numba; se compilan en `_numba_module`) ------------
+
+def _grow(a, k):
+    """Copia de `a` con el doble de capacidad (los primeros `k` elementos)."""
+    out = _np.empty(2 * a.shape[0], a.dtype)
+    out[:k] = a[:k]
+    return out
+
+
+def _bucket(xs, ys, cell):
+    """Rejilla CSR de los puntos: (ix0, iy0, nx, ny, starts, order).
+
+    La celda (ix, iy) relativa a (ix0, iy0) es `c = ix * ny + iy` y sus puntos son
+    `order[starts[c]:starts[c + 1]]`, en orden creciente de índice.
+    """
+    n = xs.shape[0]
+    cx = _np.empty(n, _np.int64)
+    cy = _np.empty(n, _np.int64)
+    ix0 = iy0 = 0
+    ix1 = iy1 = -1
+    for i in range(n):
+        a = math.floor(xs[i] / cell)
+        b = math.floor(ys[i] / cell)
+        cx[i] = a
+        cy[i] = b
+        if i == 0:
+            ix0 = ix1 = a
+            iy0 = iy1 = b
+        else:
+            ix0 = min(ix0, a)
+            ix1 = max(ix1, a)
+            iy0 = min(iy0, b)
+            iy1 = max(iy1, b)
+    nx = ix1 - ix0 + 1
+    ny = iy1 - iy0 + 1
+    starts = _np.zeros(nx * ny + 1, _np.int64)
+    for i in range(n):
+        starts[(cx[i] - ix0) * ny + cy[i] - iy0 + 1] += 1
+    for c in range(nx * ny):
+        starts[c + 1] += starts[c]
+    fill = starts[:-1].copy()
+    order = _np.empty(n, _np.int64)
+    for i in range(n):
+        c = (cx[i] - ix0) * ny + cy[i] - iy0
+        order[fill[c]] = i
+        fill[c] += 1
+    return ix0, iy0, nx, ny, starts, order
+
+
+def _segment_hits(px, py, ix0, iy0, nx, ny, starts, order, cell, x0, y0, x1, y1, radius):
+    cap = max(16, 4 * x0.shape[0])
+    qs = _np.empty(cap, _np.int64)
+    js = _np.empty(cap, _np.int64)
+    ds = _np.empty(cap, _np.float64)
+    ts = _np.empty(cap, _np.float64)
+    k = 0
+    for q in range(x0.shape[0]):
+        ax, ay, bx, by = x0[q], y0[q], x1[q], y1[q]
+        lo_x = max(math.floor((min(ax, bx) - radius) / cell) - ix0, 0)
+        hi_x = min(math.floor((max(ax, bx) + radius) / cell) - ix0, nx - 1)
+        lo_y = max(math.floor((min(ay, by) - radius) / cell) - iy0, 0)
+        hi_y = min(math.floor((max(ay, by) + radius) / cell) - iy0, ny - 1)
+        dx = bx - ax
+        dy = by - ay
+        len2 = dx * dx + dy * dy
+        for cxi in range(lo_x, hi_x + 1):
+            for cyi in range(lo_y, hi_y + 1):
+                c = cxi * ny + cyi
+                for s in range(starts[c], starts[c + 1]):
+                    j = order[s]
+                    # spatial.segment_point_distance
+                    if len2 <= 0.0:
+                        t = 0.0
+                        d = math.hypot(px[j] - ax, py[j] - ay)
+                    else:
+                        t = ((px[j] - ax) * dx + (py[j] - ay) * dy) / len2
+                        if t < 0.0:
+                            t = 0.0
+                        elif t > 1.0:
+                            t = 1.0
+                        d = math.hypot(px[j] - (ax + t * dx), py[j] - (ay + t * dy))
+                    if d <= radius:
+                        if k == qs.shape[0]:
+                            qs = _grow(qs, k)
+                            js = _grow(js, k)
+                            ds = _grow(ds, k)
+                            ts = _grow(ts, k)
+                        qs[k] = q
+                        js[k] = j
+                        ds[k] = d
+                        ts[k] = t
+                        k += 1
+    return qs[:k], js[:k], ds[:k], ts[:k]
+
+
+def _predation_claims(x0, y0, x1, y1, size, attack, max_step, ratio, ix0, iy0, nx, ny, starts, order, cell):
+    n = x0.shape[0]
+    cap = max(16, n)
+    ps = _np.empty(cap, _np.int64)
+    js = _np.empty(cap, _np.int64)
+    ds = _np.empty(cap, _np.float64)
+    ts = _np.empty(cap, _np.float64)
+    k = 0
+    for i in range(n):
+        # una presa alcanzable termina el tick a menos de `attack + max_step` del camino de i
+        reach = attack[i] + max_step
+        lo_x = max(math.floor((min(x0[i], x1[i]) - reach) / cell) - ix0, 0)
+        hi_x = min(math.floor((max(x0[i], x1[i]) + reach) / cell) - ix0, nx - 1)
+        lo_y = max(math.floor((min(y0[i], y1[i]) - reach) / cell) - iy0, 0)
+        hi_y = min(math.floor((max(y0[i], y1[i]) + reach) / cell) - iy0, ny - 1)
+        for cxi in range(lo_x, hi_x + 1):
+            for cyi in range(lo_y, hi_y + 1):
+                c = cxi * ny + cyi
+                for s in range(starts[c], starts[c + 1]):
+                    j = order[s]
+                    if j == i or size[i] < ratio * size[j]:
+                        continue
+                    # spatial.closest_approach: distancia del origen al segmento relativo
+                    ax = x0[i] - x0[j]
+                    ay = y0[i] - y0[j]
+                    dx = (x1[i] - x1[j]) - ax
+                    dy = (y1[i] - y1[j]) - ay
+                    len2 = dx * dx + dy * dy
+                    if len2 <= 0.0:
+                        t = 0.0
+                        d = math.hypot(0.0 - ax, 0.0 - ay)
+                    else:
+                        t = ((0.0 - ax) * dx + (0.0 - ay) * dy) / len2
+                        if t < 0.0:
+                            t = 0.0
+                        elif t > 1.0:
+                            t = 1.0
+                        d = math.hypot(0.0 - (ax + t * dx), 0.0 - (ay + t * dy))
+                    if d <= attack[i]:
+                        if k == ps.shape[0]:
+                            ps = _grow(ps, k)
+                            js = _grow(js, k)
+                            ds = _grow(ds, k)
+                            ts = _grow(ts, k)
+                        ps[k] = i
+                        js[k] = j
+                        ds[k] = d
+                        ts[k] = t
+                        k += 1
+    return ps[:k], js[:k], ds[:k], ts[:k]
+
+
+def _single_kill(pred, prey, order, n):
+    """Índices de `order` que sobreviven a la regla de una muerte por presa."""
+    dead = _np.zeros(n, _np.bool_)
+    keep = _np.empty(order.shape[0], _np.int64)
+    k = 0
+    for s in order:
+        if dead[pred[s]] or dead[prey[s]]:
+            continue
+        dead[prey[s]] = True
+        keep[k] = s
+        k += 1
+    return keep[:k]
+
+
+def _nearest(px, py, ix0, iy0, nx, ny, starts, order, cell, qx, qy):
+    m = qx.shape[0]
+    out = _np.full(m, -1, _np.int64)
+    if px.shape[0] == 0:
+        return out
+    for q in range(m):
+        x = qx[q]
+        y = qy[q]
+        cx = math.floor(x / cell) - ix0
+        cy = math.floor(y / cell) - iy0
+        # anillos necesarios para cubrir toda la rejilla desde la celda de la consulta
+        max_ring = max(cx, nx - 1 - cx, cy, ny - 1 - cy, 0)
+        best = -1
+        best_d2 = math.inf
+        for ring in range(max_ring + 1):
+            for cxi in range(max(cx - ring, 0), min(cx + ring, nx - 1) + 1):
+                edge = cxi == cx - ring or cxi == cx + ring
+                step = 1 if edge else 2 * ring
+                cyi = cy - ring
+                while cyi <= cy + ring:
+                    if 0 <= cyi < ny:
+                        c = cxi * ny + cyi
+                        for s in range(starts[c], starts[c + 1]):
+                            j = order[s]
+                            ddx = px[j] - x
+                            ddy = py[j] - y
+                            d2 = ddx * ddx + ddy * ddy
+                            if d2 < best_d2:
+                                best = j
+                                best_d2 = d2
+                    cyi += step
+            # lo que quede en anillos posteriores está al menos a `ring * cell` de (x, y)
+            if best >= 0 and best_d2 <= (ring * cell) ** 2:
+                break
+        out[q] = best
+    return out
+
+
+def _drain(energy, size, speed, sense, seeking, scale, energy_scale, sense_scale, seek):
+    out = _np.empty(energy.shape[0], _np.float64)
+    for i in range(energy.shape[0]):
+        # utils.energy_drain_per_tick
+        d = energy_scale * (size[i] ** 3 * (speed[i] ** 2)) + sense_scale * sense[i]
+        if seeking[i]:
+            d *= seek
+        out[i] = energy[i] - d * scale[i]
+    return out
@@ -0,0 +1,216 @@
+"""Generadores de posiciones para la comida y el spawn de las criaturas.
+
+Cada generador devuelve dos columnas `array("d")` (xs, ys) en lugar de una lista de
+tuplas, igual que las columnas de `evolution.Population`: se construyen en una sola
+pasada con el `random` ya enlazado y ocupan 16 bytes por punto. `points(xs, ys)` las
+convierte en la lista de tuplas (x, y) que usan `GenerationAgent.foods` y el motor.
+
+Comida (`WorldConfig.food_layout`):
+- "uniform": uniforme en todo el mundo
+- "poisson_disk": separación mínima entre pellets (rejilla de celdas como acelerador)
+- "clusters": parches gaussianos alrededor de centros aleatorios
+- "gradient": densidad que crece linealmente a lo largo de un eje
+
+Spawn (`WorldConfig.spawn_layout`): "perimeter" (equidistantes en el borde), "ring"
+(círculo centrado) y "random" (uniforme).
+"""
+import math
+import random
+from array import array
+from bisect import bisect_left
+from itertools import repeat
+
+# fracción de la densidad de saturación del dart throwing (~0.696 / min_dist^2) usada para
+# elegir `min_dist` a partir de `count`: deja margen para llegar a `count` sin reintentos
+POISSON_FILL = 0.7
+POISSON_JAMMING = 0.696
+
+
+# --- comida ------------------------------------------------------------------------------
+
+def uniform(count, space_size, rng=random):
+    """Posiciones uniformes en [0, w] x [0, h]."""
+    w, h = float(space_size[0]), float(space_size[1])
+    r = rng.random
+    xs = array("d", [r() * w for _ in range(count)])
+    ys = array("d", [r() * h for _ in range(count)])
+    return xs, ys
+
+
+def poisson_disk(count, space_size, rng=random, min_dist=None, attempts=30):
+    """Hasta `count` posiciones separadas al menos `min_dist` (dart throwing).
+
+    Acelerador: rejilla plana de celdas de lado min_dist / sqrt(2), con a lo sumo un punto
+    por celda, así que cada candidato se compara solo con las 20 celdas vecinas (de la más
+    cercana a la más lejana). Sin `min_dist` se elige para que `count` quepa con holgura;
+    si no cabe, se devuelven los puntos aceptados tras `attempts * count` intentos.
+    """
+    w, h = float(space_size[0]), float(space_size[1])
+    xs, ys = array("d"), array("d")
+    if count <= 0:
+        return xs, ys
+    if min_dist is None:
+        min_dist = math.sqrt(POISSON_JAMMING * POISSON_FILL * w * h / count)
+    if min_dist <= 0:
+        return uniform(count, space_size, rng)
+    r2 = min_dist * min_dist
+    inv = math.sqrt(2) / min_dist
+    # celdas con 2 de margen por lado para no comprobar límites en los vecinos
+    nx = int(w * inv) + 5
+    ny = int(h * inv) + 5
+    grid = array("l", [-1]) * (nx * ny)
+    offsets = sorted(
+        ((dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if abs(dx) + abs(dy) < 4 and (dx or dy)),
+        key=lambda p: p[0] * p[0] + p[1] * p[1],
+    )
+    neighbours = tuple(dx * ny + dy for dx, dy in offsets)
+    r = rng.random
+    max_tries = attempts * count
+    tries = 0
+    accepted = 0
+    while accepted < count and tries < max_tries:
+        tries += 1
+        x = r() * w
+        y = r() * h
+        key = int(x * inv + 2) * ny + int(y * inv + 2)
+        if grid[key] >= 0:
+            continue
+        for off in neighbours:
+            i = grid[key + off]
+            if i >= 0:
+                dx = xs[i] - x
+                dy = ys[i] - y
+                if dx * dx + dy * dy < r2:
+                    break
+        else:
+            grid[key] = accepted
+            xs.append(x)
+            ys.append(y)
+            accepted += 1
+    return xs, ys
+
+
+def clusters(count, space_size, rng=random, patches=8, patch_radius=None):
+    """Posiciones en `patches` parches gaussianos (desviación `patch_radius`) de centro uniforme."""
+    w, h = float(space_size[0]), float(space_size[1])
+    patches = max(1, int(patches))
+    sigma = patch_radius if patch_radius is not None else 0.05 * min(w, h)
+    r = rng.random
+    g = rng.gauss
+    cx = [r() * w for _ in range(patches)]
+    cy = [r() * h for _ in range(patches)]
+    picks = [int(r() * patches) for _ in range(count)]
+    xs = array("d", [_fold(cx[p] + g(0.0, sigma), w) for p in picks])
+    ys = array("d", [_fold(cy[p] + g(0.0, sigma), h) for p in picks])
+    return xs, ys
+
+
+def gradient(count, space_size, rng=random, axis="x", lo=0.2, hi=1.0):
+    """Densidad lineal de `lo` (en 0) a `hi` (en el extremo) a lo largo de `axis`; uniforme en el otro eje.
+
+    Muestreo por inversa de la CDF: con densidad lo + (hi - lo) * t sobre t en [0, 1],
+    t = (-lo + sqrt(lo^2 + u * (hi^2 - lo^2))) / (hi - lo).
+    """
+    w, h = float(space_size[0]), float(space_size[1])
+    length, other = (w, h) if axis == "x" else (h, w)
+    r = rng.random
+    lo = max(0.0, float(lo))
+    hi = max(0.0, float(hi))
+    if abs(hi - lo) < 1e-12 or lo + hi <= 0:
+        along = array("d", [r() * length for _ in range(count)])
+    else:
+        sqrt = math.sqrt
+        lo2 = lo * lo
+        span = hi * hi - lo2
+        scale = length / (hi - lo)
+        along = array("d", [(sqrt(lo2 + r() * span) - lo) * scale for _ in range(count)])
+    across = array("d", [r() * other for _ in range(count)])
+    return (along, across) if axis == "x" else (across, along)
+
+
+def _fold(v, hi):
+    """Refleja `v` dentro de [0, hi] (evita acumular puntos en el borde al recortar)."""
+    if v < 0.0:
+        v = -v
+    if v > hi:
+        v = 2.0 * hi - v
+    return 0.0 if v < 0.0 else (hi if v > hi else v)
+
+
+# --- spawn -------------------------------------------------------------------------------
+
+def perimeter(count, space_size, rng=None):
+    """Posiciones equidistantes sobre el borde, desde (0, 0) en sentido horario.
+
+    En lugar de decidir el lado punto a punto, se localiza con `bisect` el primer índice
+    de cada lado sobre las distancias acumuladas y cada tramo se genera de una vez.
+    """
+    w, h = float(space_size[0]), float(space_size[1])
+    if count <= 0:
+        return array("d"), array("d")
+    spacing = 2 * (w + h) / count
+    d = [i * spacing for i in range(count)]
+    a = bisect_left(d, w)
+    b = bisect_left(d, w + h)
+    c = bisect_left(d, 2 * w + h)
+    # superior (t, 0) | derecho (w, t - w) | inferior (w - (t - w - h), h) | izquierdo (0, h - (t - 2w - h))
+    xs = array("d", d[:a])
+    xs.extend(repeat(w, b - a))
+    xs.extend([2 * w + h - t for t in d[b:c]])
+    xs.extend(repeat(0.0, count - c))
+    ys = array("d", repeat(0.0, a))
+    ys.extend([t - w for t in d[a:b]])
+    ys.extend(repeat(h, c - b))
+    ys.extend([2 * (w + h) - t for t in d[c:]])
+    return xs, ys
+
+
+def ring(count, space_size, rng=None, radius=None):
+    """Posiciones equidistantes en un círculo centrado de radio `radius` (default 0.4 * lado menor)."""
+    w, h = float(space_size[0]), float(space_size[1])
+    radius = radius if radius is not None else 0.4 * min(w, h)
+    cx, cy = w / 2.0, h / 2.0
+    step = 2 * math.pi / count if count > 0 else 0.0
+    cos, sin = math.cos, math.sin
+    xs = array("d", [cx + radius * cos(i * step) for i in range(count)])
+    ys = array("d", [cy + radius * sin(i * step) for i in range(count)])
+    return xs, ys
+
+
+FOOD_LAYOUTS = {
+    "uniform": uniform,
+    "poisson_disk": poisson_disk,
+    "clusters": clusters,
+    "gradient": gradient,
+}
+
+SPAWN_LAYOUTS = {
+    "perimeter": perimeter,
+    "ring": ring,
+    "random": uniform,
+}
+
+
+def points(xs, ys):
+    """Lista de tuplas (x, y) a partir de las columnas."""
+    return list(zip(xs, ys))
+
+
+def _layout(registry, name, kind):
+    try:
+        return registry[name]
+    except KeyError:
+        raise ValueError(f"{kind} desconocido: {name!r} (opciones: {', '.join(registry)})") from None
+
+
+def food_positions(config, count, space_size, rng=random):
+    """Comida según `config.food_layout` / `config.food_layout_params`, como lista de tuplas."""
+    generate = _layout(FOOD_LAYOUTS, getattr(config, "food_layout", "uniform"), "food_layout")
+    params = getattr(config, "food_layout_params", None) or {}
+    return points(*generate(count, space_size, rng, **params))
+
+
+def spawn_positions(config, count, space_size, rng=random):
+    """Posiciones de spawn según `config.spawn_layout`, como lista de tuplas."""
+    generate = _layout(SPAWN_LAYOUTS, getattr(config, "spawn_layout", "perimeter"), "spawn_layout")
+    return points(*generate(count, space_size, rng))
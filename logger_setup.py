@@ -1,33 +1,96 @@
 import logging
-import logging.handlers
 import os
 
+# directorio de logs (se crea en la primera escritura, no al importar)
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'report')
+LOG_PATH = os.path.join(LOG_DIR, 'run.log')
+FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
 
-def get_logger(name='spade_sim'):
-    # asegurar que existe el directorio `report`
-    base = os.path.dirname(__file__)
-    report_dir = os.path.join(base, 'report')
-    os.makedirs(report_dir, exist_ok=True)
-    log_path = os.path.join(report_dir, 'run.log')
+# manejadores compartidos por todos los loggers de la simulación
+_file_handler = None
+_console_handler = None
+
+
+class LazyRotatingFileHandler(logging.Handler):
+    """Manejador que crea `report/` y el `RotatingFileHandler` en el primer registro emitido.
+
+    Así importar los módulos de agentes (que llaman a `get_logger` a nivel de módulo) no
+    toca el sistema de archivos.
+    """
+
+    def __init__(self, path, level=logging.NOTSET, **kwargs):
+        super().__init__(level)
+        self.path = path
+        self.kwargs = kwargs
+        self._handler = None
+
+    def set_path(self, path):
+        """Cambia el archivo de destino; el anterior se cierra y el nuevo se abre en el próximo registro."""
+        self.acquire()
+        try:
+            if self._handler is not None:
+                self._handler.close()
+                self._handler = None
+            self.path = path
+        finally:
+            self.release()
+
+    def _target(self):
+        if self._handler is None:
+            import logging.handlers
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(self.path, **self.kwargs)
+            handler.setLevel(self.level)
+            handler.setFormatter(self.formatter)
+            self._handler = handler
+        return self._handler
+
+    def emit(self, record):
+        try:
+            target = self._target()
+        except Exception:
+            self.handleError(record)
+            return
+        target.emit(record)
 
+    def close(self):
+        if self._handler is not None:
+            self._handler.close()
+        super().close()
+
+
+def _shared_handlers():
+    global _file_handler, _console_handler
+    if _file_handler is None:
+        fmt = logging.Formatter(FORMAT)
+        # manejador de archivo (rotativo, hasta 3 respaldos)
+        _file_handler = LazyRotatingFileHandler(LOG_PATH, level=logging.INFO, maxBytes=2_000_000, backupCount=3, encoding='utf-8')
+        _file_handler.setFormatter(fmt)
+        # añadir también un manejador a consola en nivel INFO
+        _console_handler = logging.StreamHandler()
+        _console_handler.setLevel(logging.INFO)
+        _console_handler.setFormatter(fmt)
+    return _file_handler, _console_handler
+
+
+def set_log_path(path):
+    """Escribe el log compartido en `path` en lugar de `report/run.log` (también para los loggers ya creados)."""
+    global LOG_PATH
+    LOG_PATH = path
+    if _file_handler is not None:
+        _file_handler.set_path(path)
+
+
+def get_logger(name='spade_sim'):
     logger = logging.getLogger(name)
     if logger.handlers:
         return logger
 
     logger.setLevel(logging.DEBUG)
-
-    # manejador de archivo (rotativo)
-    fh = logging.handlers.RotatingFileHandler(log_path, maxBytes=2_000_000, backupCount=3, encoding='utf-8')
-    fh.setLevel(logging.INFO)
-    fmt = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
-    fh.setFormatter(fmt)
-    logger.addHandler(fh)
-
-    # añadir también un manejador a consola en nivel INFO
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
-    ch.setFormatter(fmt)
-    logger.addHandler(ch)
+    # un único archivo rotativo compartido: varios RotatingFileHandler sobre run.log
+    # rotarían el mismo archivo de forma independiente
+    for handler in _shared_handlers():
+        logger.addHandler(handler)
 
     # evitar duplicación de logs hacia handlers superiores
     logger.propagate = False
@@ -0,0 +1,321 @@
+"""Transporte en memoria que sustituye a XMPP para ejecutar los agentes en un solo proceso.
+
+Implementa el subconjunto de la API de SPADE que usan `CreatureAgent`, `GenerationAgent`
+y `HostAgent` (`Agent`, `CyclicBehaviour`, `PeriodicBehaviour`, `Message`, `run`,
+`wait_until_finished`) con la misma semántica de entrega: cada agente registrado en el
+`LoopbackRouter` tiene un buzón por behaviour (`asyncio.Queue`), un mensaje se encola en
+todos los behaviours cuyo template coincide (sin template coinciden todos) y los mensajes
+a agentes no registrados o detenidos se descartan. Como en SPADE, un agente recibe mensajes
+desde que empieza su `setup()`: los que llegan mientras tanto esperan en el buzón de los
+behaviours ya añadidos hasta que estos arrancan. Sin servidor XMPP, sin red y sin
+serialización adicional al `body` JSON que ya construyen los agentes.
+
+Se selecciona con la variable de entorno `SIM_TRANSPORT=loopback` (ver `transport.py`).
+"""
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("loopback")
+
+
+class Message:
+    """Mensaje con la misma forma que `spade.message.Message` (to, sender, body, thread, metadata)."""
+
+    def __init__(self, to=None, sender=None, body=None, thread=None, metadata=None):
+        self.to = to
+        self.sender = sender
+        self.body = body
+        self.thread = thread
+        self.metadata = dict(metadata or {})
+
+    def set_metadata(self, key, value):
+        self.metadata[key] = value
+
+    def get_metadata(self, key):
+        return self.metadata.get(key)
+
+    def make_reply(self):
+        return Message(to=self.sender, sender=self.to, body=self.body, thread=self.thread, metadata=self.metadata)
+
+    def __repr__(self):
+        return f"<Message to={self.to} sender={self.sender} body={self.body!r}>"
+
+
+class Template:
+    """Filtro de mensajes equivalente a `spade.template.Template` (campos None = comodín)."""
+
+    def __init__(self, to=None, sender=None, body=None, thread=None, metadata=None):
+        self.to = to
+        self.sender = sender
+        self.body = body
+        self.thread = thread
+        self.metadata = dict(metadata or {})
+
+    def match(self, message):
+        for field in ("to", "sender", "body", "thread"):
+            expected = getattr(self, field)
+            if expected is not None and str(expected) != str(getattr(message, field)):
+                return False
+        return all(message.metadata.get(k) == v for k, v in self.metadata.items())
+
+
+def bare_jid(jid):
+    return str(jid).split("/")[0]
+
+
+class LoopbackRouter:
+    """Registro jid -> agente y entrega directa en los buzones de sus behaviours."""
+
+    def __init__(self):
+        self.agents = {}
+        self.sent = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    def register(self, agent):
+        self.agents[bare_jid(agent.jid)] = agent
+
+    def unregister(self, agent):
+        key = bare_jid(agent.jid)
+        if self.agents.get(key) is agent:
+            del self.agents[key]
+
+    def deliver(self, msg):
+        """Entrega `msg` a su destinatario. Devuelve False si no hay agente con ese jid que acepte mensajes."""
+        self.sent += 1
+        if msg.body:
+            self.bytes += len(msg.body)
+        agent = self.agents.get(bare_jid(msg.to))
+        if agent is None or not agent.accepts_messages():
+            self.dropped += 1
+            return False
+        matched = False
+        for behaviour in agent.behaviours:
+            if behaviour.match(msg):
+                behaviour.queue.put_nowait(msg)
+                matched = True
+        if matched:
+            self.delivered += 1
+        else:
+            self.dropped += 1
+            logger.debug(f"No behaviour matched for message {msg}")
+        return matched
+
+    def reset_stats(self):
+        self.sent = self.delivered = self.dropped = self.bytes = 0
+        self.started = time.perf_counter()
+
+    def stats(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "agents": len(self.agents),
+            "sent": self.sent,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "bytes": self.bytes,
+            "seconds": elapsed,
+            "messages_per_second": self.sent / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+# router compartido por defecto (un proceso = un "servidor")
+default_router = LoopbackRouter()
+
+
+class CyclicBehaviour:
+    """Behaviour que ejecuta `run()` repetidamente hasta que se mata o termina el agente."""
+
+    def __init__(self):
+        self.agent = None
+        self.template = None
+        self.queue = asyncio.Queue()
+        self.exit_code = 0
+        self._killed = False
+        self._task = None
+
+    def set_agent(self, agent):
+        self.agent = agent
+
+    def set_template(self, template):
+        self.template = template
+
+    def match(self, message):
+        return self.template is None or self.template.match(message)
+
+    @property
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        self._killed = False
+        self._task = asyncio.get_running_loop().create_task(self._run_loop())
+
+    def kill(self, exit_code=None):
+        self._killed = True
+        if exit_code is not None:
+            self.exit_code = exit_code
+
+    def is_killed(self):
+        return self._killed
+
+    def is_done(self):
+        return False
+
+    async def on_start(self):
+        pass
+
+    async def on_end(self):
+        pass
+
+    async def run(self):
+        raise NotImplementedError
+
+    async def _step(self):
+        await self.run()
+
+    async def _run_loop(self):
+        try:
+            await self.on_start()
+            while not self._killed and not self.is_done():
+                try:
+                    await self._step()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Exception running behaviour {self}: {e}")
+                    self.kill(exit_code=e)
+                await asyncio.sleep(0)
+        finally:
+            await self.on_end()
+
+    async def send(self, msg):
+        if msg.sender is None:
+            msg.sender = bare_jid(self.agent.jid)
+        self.agent.router.deliver(msg)
+
+    async def receive(self, timeout=None):
+        """Como SPADE: con `timeout` espera hasta ese tiempo; sin él devuelve None si el buzón está vacío."""
+        if timeout:
+            try:
+                return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+        try:
+            return self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    def mailbox_size(self):
+        return self.queue.qsize()
+
+
+class PeriodicBehaviour(CyclicBehaviour):
+    """Behaviour que ejecuta `run()` cada `period` segundos (la primera vez de inmediato)."""
+
+    def __init__(self, period, start_at=None):
+        super().__init__()
+        self.period = period
+        self._next_activation = start_at
+
+    @property
+    def period(self):
+        return self._period
+
+    @period.setter
+    def period(self, value):
+        if value < 0:
+            raise ValueError("Period must be greater or equal than zero.")
+        self._period = value
+
+    async def _step(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._next_activation is None:
+            self._next_activation = now
+        if now >= self._next_activation:
+            await self.run()
+            while self._next_activation <= now:
+                self._next_activation += self._period if self._period > 0 else 1e-6
+        else:
+            await asyncio.sleep(self._next_activation - now)
+
+
+class Agent:
+    """Agente en memoria con el ciclo de vida de `spade.agent.Agent`."""
+
+    def __init__(self, jid, password=None, verify_security=False, router=None, **kwargs):
+        self.jid = jid
+        self.password = password
+        self.router = router or default_router
+        self.behaviours = []
+        self._alive = False
+        # acepta mensajes desde el inicio de `setup()` (antes de estar vivo), como SPADE
+        self._accepting = False
+
+    async def setup(self):
+        pass
+
+    async def start(self, auto_register=True):
+        self.router.register(self)
+        self._accepting = True
+        await self.setup()
+        self._alive = True
+        for behaviour in self.behaviours:
+            if not behaviour.is_running:
+                behaviour.start()
+
+    async def stop(self):
+        self._alive = False
+        self._accepting = False
+        self.router.unregister(self)
+        current = asyncio.current_task()
+        for behaviour in self.behaviours:
+            behaviour.kill()
+            task = behaviour._task
+            # el behaviour que llama a stop() termina solo al volver de run()
+            if task is not None and task is not current and not task.done():
+                task.cancel()
+
+    def is_alive(self):
+        return self._alive
+
+    def accepts_messages(self):
+        return self._accepting
+
+    async def send(self, msg):
+        """Envío directo desde el agente (fuera de un behaviour), como `generation_start`."""
+        if msg.sender is None:
+            msg.sender = bare_jid(self.jid)
+        self.router.deliver(msg)
+
+    def add_behaviour(self, behaviour, template=None):
+        behaviour.set_agent(self)
+        if template is not None:
+            behaviour.set_template(template)
+        self.behaviours.append(behaviour)
+        if self._alive:
+            behaviour.start()
+
+    def remove_behaviour(self, behaviour):
+        if behaviour in self.behaviours:
+            behaviour.kill()
+            self.behaviours.remove(behaviour)
+
+    def has_behaviour(self, behaviour):
+        return behaviour in self.behaviours
+
+
+async def wait_until_finished(agents):
+    """Espera a que todos los agentes dejen de estar vivos."""
+    if not isinstance(agents, (list, tuple, set)):
+        agents = [agents]
+    while any(agent.is_alive() for agent in agents):
+        await asyncio.sleep(0.1)
+
+
+def run(main):
+    """Equivalente a `spade.run`: ejecuta la corrutina principal en un bucle nuevo."""
+    return asyncio.run(main)
@@ -0,0 +1,88 @@
+"""Perfilado opt-in por generación (cProfile) para localizar puntos calientes a posteriori.
+
+Todos los agentes comparten el mismo bucle asyncio (un hilo), así que un único perfil
+activo entre `spawn_generation` y `_end_generation` cubre generación, criaturas y host.
+Cada perfil se guarda como `profile_gen<N>.prof` (abrir con `pstats`, snakeviz, etc.) y un
+resumen de las funciones más costosas se escribe en el log.
+"""
+import cProfile
+import glob
+import io
+import os
+import pstats
+
+PROFILE_PATTERN = "profile_gen*.prof"
+
+
+def profile_path(report_dir, generation):
+    return os.path.join(report_dir, f"profile_gen{generation}.prof")
+
+
+def clean_profiles(report_dir):
+    """Elimina los perfiles de una ejecución anterior. Devuelve las rutas eliminadas."""
+    removed = []
+    for path in glob.glob(os.path.join(report_dir, PROFILE_PATTERN)):
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:
+            pass
+    return removed
+
+
+def top_functions(stats_or_path, limit=20, sort="cumulative"):
+    """Texto con las `limit` funciones más costosas de un perfil (objeto pstats o ruta .prof)."""
+    out = io.StringIO()
+    stats = stats_or_path if isinstance(stats_or_path, pstats.Stats) else pstats.Stats(stats_or_path, stream=out)
+    stats.stream = out
+    stats.sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+
+class GenerationProfiler:
+    """Un `cProfile.Profile` por generación, guardado en `report_dir` al cerrar la generación."""
+
+    def __init__(self, report_dir, top=20, sort="cumulative"):
+        self.report_dir = report_dir
+        self.top = top
+        self.sort = sort
+        self.generation = None
+        self._profile = None
+
+    @property
+    def active(self):
+        return self._profile is not None
+
+    def start(self, generation):
+        """Empieza a perfilar la generación `generation` (cierra la anterior si seguía abierta)."""
+        if self._profile is not None:
+            self.stop()
+        self.generation = generation
+        self._profile = cProfile.Profile()
+        try:
+            self._profile.enable()
+        except ValueError:
+            # otro profiler ya está activo en este hilo (p.ej. cProfile externo)
+            self._profile = None
+
+    def stop(self):
+        """Detiene el perfil actual y lo guarda. Devuelve (ruta, resumen) o None si no había perfil."""
+        profile = self._profile
+        if profile is None:
+            return None
+        self._profile = None
+        profile.disable()
+        os.makedirs(self.report_dir, exist_ok=True)
+        path = profile_path(self.report_dir, self.generation)
+        profile.dump_stats(path)
+        summary = top_functions(pstats.Stats(profile), self.top, self.sort)
+        return path, summary
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("uso: py profiling.py report/profile_gen<N>.prof [top]")
+        sys.exit(1)
+    print(top_functions(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 20))
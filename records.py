@@ -0,0 +1,130 @@
+"""Registro compacto por criatura compartido por `GenerationAgent` y `HostAgent`.
+
+`CreatureRecord` usa `__slots__` (sin `__dict__` por instancia) y acceso por atributo en
+los caminos calientes (cada mensaje `status`). Conserva además una interfaz de mapeo
+(`rec["x"]`, `rec.get("x")`, `"x" in rec`) para el código que trata el registro como
+dict, incluido el alias `jid_full` de `creatures_info`.
+"""
+
+FIELDS = ("cid", "jid", "foods_eaten", "alive", "speed", "energy", "size", "sense", "x", "y", "kills")
+# campos del status que actualizan el registro (ver `CreatureRecord.update_from_status`)
+STATUS_FIELDS = ("x", "y", "energy", "size", "sense", "speed", "kills")
+# nombres alternativos usados históricamente en los dicts de `creatures_info`
+ALIASES = {"jid_full": "jid"}
+
+
+class CreatureRecord:
+    __slots__ = FIELDS
+
+    def __init__(self, jid, speed=None, energy=None, size=None, sense=None, x=None, y=None, foods_eaten=0, kills=0, alive=True, cid=None):
+        # id entero denso asignado al spawn (índice en `GenerationAgent.creatures_info`)
+        self.cid = cid
+        self.jid = jid
+        self.foods_eaten = foods_eaten
+        self.alive = alive
+        self.speed = speed
+        self.energy = energy
+        self.size = size
+        self.sense = sense
+        self.x = x
+        self.y = y
+        self.kills = kills
+
+    @classmethod
+    def from_mapping(cls, data):
+        """Construye un registro desde un dict con la forma antigua de `creatures_info` o `fishes`."""
+        if isinstance(data, cls):
+            return data
+        rec = cls(data.get("jid_full") or data.get("jid"))
+        for name in FIELDS[2:]:
+            if name in data:
+                setattr(rec, name, data[name])
+        return rec
+
+    def update_from_status(self, data):
+        """Copia al registro los campos presentes en un mensaje `status` (sin crear objetos)."""
+        # desenrollado a propósito: se ejecuta en cada status recibido
+        get = data.get
+        value = get("x")
+        if value is not None:
+            self.x = value
+        value = get("y")
+        if value is not None:
+            self.y = value
+        value = get("energy")
+        if value is not None:
+            self.energy = value
+        value = get("size")
+        if value is not None:
+            self.size = value
+        value = get("sense")
+        if value is not None:
+            self.sense = value
+        value = get("speed")
+        if value is not None:
+            self.speed = value
+        value = get("kills")
+        if value is not None:
+            self.kills = value
+
+    def to_dict(self):
+        """Forma JSON que consume la interfaz web (`/fishes`)."""
+        return {
+            "cid": self.cid,
+            "jid": self.jid,
+            "x": self.x if self.x is not None else 0,
+            "y": self.y if self.y is not None else 0,
+            "energy": self.energy if self.energy is not None else 0,
+            "foods_eaten": self.foods_eaten,
+            "speed": self.speed if self.speed is not None else 0,
+            "size": self.size,
+            "sense": self.sense,
+            "kills": self.kills,
+        }
+
+    # --- interfaz de mapeo (compatibilidad con el antiguo dict por criatura) -----------
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, ALIASES.get(key, key))
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        name = ALIASES.get(key, key)
+        if name not in FIELDS:
+            raise KeyError(key)
+        setattr(self, name, value)
+
+    def __contains__(self, key):
+        return ALIASES.get(key, key) in FIELDS
+
+    def get(self, key, default=None):
+        value = getattr(self, ALIASES.get(key, key), None)
+        return default if value is None else value
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in FIELDS)
+
+    def __setstate__(self, state):
+        for name, value in zip(FIELDS, state):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"CreatureRecord({', '.join(f'{n}={getattr(self, n)!r}' for n in FIELDS)})"
+
+
+def from_registry(creatures_info):
+    """Convierte un `creatures_info` antiguo (dict jid_base -> dict) a la lista indexada por cid."""
+    infos = creatures_info.values() if hasattr(creatures_info, "values") else creatures_info
+    table = []
+    for cid, info in enumerate(infos):
+        rec = CreatureRecord.from_mapping(info)
+        rec.cid = cid
+        table.append(rec)
+    return table
+
+
+def jid_base(jid):
+    """Nombre de la criatura sin dominio (solo para CSV/logs: frontera con XMPP)."""
+    return str(jid).split("@")[0]
@@ -0,0 +1,412 @@
+"""Grabación append-only de posiciones/eventos por tick y reproducción offline.
+
+Formato del archivo `.bin` (little-endian), una secuencia de chunks:
+
+    cabecera  '<4sIIII'  magic b"RPLC", generation, first_tick, raw_len, comp_len
+    cuerpo    zlib(comp_len bytes) -> registros concatenados
+
+Registros dentro de un chunk:
+
+    META   '<BI'   kind=3, longitud + JSON (criaturas, comida y tamaño del mundo)
+    FRAME  '<BIdI' kind=1, tick, t, n + n * '<Iff' (índice de criatura, x, y)
+    EVENT  '<BdBIIff' kind=2, t, código, a, b, x, y
+
+Un chunk nunca mezcla generaciones. Junto al archivo se escribe un índice `.idx`
+con una entrada '<IIQ' (generation, first_tick, offset) por chunk, de modo que el
+lector salta directamente a cualquier generación; si falta, se reconstruye leyendo
+solo las cabeceras de los chunks.
+"""
+import json
+import os
+import struct
+import zlib
+from collections import OrderedDict
+
+CHUNK_MAGIC = b"RPLC"
+CHUNK_HEADER = struct.Struct("<4sIIII")
+INDEX_ENTRY = struct.Struct("<IIQ")
+
+KIND_FRAME = 1
+KIND_EVENT = 2
+KIND_META = 3
+
+FRAME_HEADER = struct.Struct("<BIdI")
+FRAME_ITEM = struct.Struct("<Iff")
+EVENT = struct.Struct("<BdBIIff")
+META_HEADER = struct.Struct("<BI")
+
+# códigos de evento
+EV_EAT = 1
+EV_KILL = 2
+EV_REMOVE = 3
+EV_GEN_START = 4
+EV_GEN_END = 5
+
+REMOVE_REASONS = ["finished", "exhausted", "killed", "generation_end", "removed"]
+
+
+def reason_code(reason):
+    try:
+        return REMOVE_REASONS.index(reason)
+    except ValueError:
+        return REMOVE_REASONS.index("removed")
+
+
+class ReplayRecorder:
+    """Graba frames de posiciones y eventos de la simulación en un archivo append-only.
+
+    Los registros se acumulan en memoria y se escriben como un chunk comprimido cada
+    `chunk_frames` frames o al cerrar la generación.
+    """
+
+    def __init__(self, path, chunk_frames=64):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.chunk_frames = chunk_frames
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._buf = bytearray()
+        self._buf_frames = 0
+        self._chunk_first_tick = 0
+        self.generation = 0
+        self.tick = 0
+        # jid_base/jid -> índice de criatura dentro de la generación
+        self.ids = {}
+
+    def creature_id(self, key):
+        return self.ids.get(key)
+
+    def begin_generation(self, generation, space_size, creatures, foods, t=0.0):
+        """Abre una generación. `creatures` es una lista de dicts con jid/jid_base y rasgos."""
+        self.flush()
+        self.generation = generation
+        self.tick = 0
+        self._chunk_first_tick = 0
+        self.ids = {}
+        for idx, c in enumerate(creatures):
+            for key in (c.get("jid"), c.get("jid_base")):
+                if key:
+                    self.ids[key] = idx
+        meta = json.dumps({
+            "generation": generation,
+            "space_size": list(space_size),
+            "creatures": creatures,
+            "foods": [list(f) for f in foods],
+        }).encode("utf-8")
+        self._buf += META_HEADER.pack(KIND_META, len(meta))
+        self._buf += meta
+        self.event(t, EV_GEN_START)
+
+    def frame(self, t, positions):
+        """Registra un frame; `positions` es un iterable de (índice, x, y)."""
+        items = list(positions)
+        self._buf += FRAME_HEADER.pack(KIND_FRAME, self.tick, t, len(items))
+        pack = FRAME_ITEM.pack
+        for idx, x, y in items:
+            self._buf += pack(idx, x, y)
+        self.tick += 1
+        self._buf_frames += 1
+        if self._buf_frames >= self.chunk_frames:
+            self.flush()
+
+    def event(self, t, code, a=0, b=0, x=0.0, y=0.0):
+        self._buf += EVENT.pack(KIND_EVENT, t, code, a, b, x, y)
+
+    def end_generation(self, t):
+        self.event(t, EV_GEN_END)
+        self.flush()
+
+    def flush(self):
+        """Escribe los registros pendientes como un chunk y añade su entrada al índice."""
+        if not self._buf:
+            return
+        raw = bytes(self._buf)
+        comp = zlib.compress(raw, 6)
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(CHUNK_HEADER.pack(CHUNK_MAGIC, self.generation, self._chunk_first_tick, len(raw), len(comp)))
+            f.write(comp)
+        with open(self.index_path, "ab") as f:
+            f.write(INDEX_ENTRY.pack(self.generation, self._chunk_first_tick, offset))
+        self._buf = bytearray()
+        self._buf_frames = 0
+        self._chunk_first_tick = self.tick
+
+    def close(self):
+        self.flush()
+
+
+def decode_records(raw):
+    """Decodifica los registros de un chunk descomprimido."""
+    pos = 0
+    n = len(raw)
+    while pos < n:
+        kind = raw[pos]
+        if kind == KIND_FRAME:
+            _, tick, t, count = FRAME_HEADER.unpack_from(raw, pos)
+            pos += FRAME_HEADER.size
+            items = [FRAME_ITEM.unpack_from(raw, pos + i * FRAME_ITEM.size) for i in range(count)]
+            pos += count * FRAME_ITEM.size
+            yield ("frame", tick, t, items)
+        elif kind == KIND_EVENT:
+            _, t, code, a, b, x, y = EVENT.unpack_from(raw, pos)
+            pos += EVENT.size
+            yield ("event", t, code, a, b, x, y)
+        elif kind == KIND_META:
+            _, length = META_HEADER.unpack_from(raw, pos)
+            pos += META_HEADER.size
+            yield ("meta", json.loads(raw[pos:pos + length].decode("utf-8")))
+            pos += length
+        else:
+            raise ValueError(f"registro de replay desconocido: {kind}")
+
+
+class ReplayReader:
+    """Lectura de un archivo de replay con acceso directo por generación."""
+
+    def __init__(self, path):
+        self.path = path
+        self.index = self._load_index()
+
+    def _load_index(self):
+        entries = []
+        idx_path = self.path + ".idx"
+        if os.path.exists(idx_path):
+            with open(idx_path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size
+            entries = [INDEX_ENTRY.unpack_from(data, i) for i in range(0, usable, INDEX_ENTRY.size)]
+        else:
+            # reconstruir saltando de cabecera en cabecera
+            with open(self.path, "rb") as f:
+                offset = 0
+                while True:
+                    head = f.read(CHUNK_HEADER.size)
+                    if len(head) < CHUNK_HEADER.size:
+                        break
+                    magic, gen, first_tick, _, comp_len = CHUNK_HEADER.unpack(head)
+                    if magic != CHUNK_MAGIC:
+                        raise ValueError(f"{self.path}: chunk corrupto en offset {offset}")
+                    entries.append((gen, first_tick, offset))
+                    f.seek(comp_len, os.SEEK_CUR)
+                    offset += CHUNK_HEADER.size + comp_len
+        index = OrderedDict()
+        for gen, first_tick, offset in entries:
+            # una generación repetida (reinicio de la simulación) sustituye a la anterior
+            if first_tick == 0:
+                index[gen] = []
+            index.setdefault(gen, []).append(offset)
+        return index
+
+    def generations(self):
+        return sorted(self.index)
+
+    def iter_records(self, generation):
+        with open(self.path, "rb") as f:
+            for offset in self.index.get(generation, []):
+                f.seek(offset)
+                magic, _, _, raw_len, comp_len = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+                if magic != CHUNK_MAGIC:
+                    raise ValueError(f"{self.path}: chunk corrupto en offset {offset}")
+                yield from decode_records(zlib.decompress(f.read(comp_len)))
+
+    def iter_snapshots(self, generation, removal_window=5.0):
+        """Reconstruye estados con la misma forma que `/fishes` para cada frame.
+
+        Devuelve tuplas (t, dict) donde el dict tiene fishes, foods, removals,
+        space_size y generation.
+        """
+        for t, build in self.iter_frames(generation, removal_window):
+            yield t, build()
+
+    def iter_frames(self, generation, removal_window=5.0):
+        """Como `iter_snapshots`, pero devuelve (t, build) sin construir el snapshot.
+
+        `build()` construye el dict del frame a partir del estado en curso, así que solo
+        es válido hasta avanzar el iterador (después refleja los registros posteriores).
+        """
+        creatures = []
+        foods = []
+        space_size = [30, 30]
+        positions = {}
+        removed = set()
+        removals = []
+        for rec in self.iter_records(generation):
+            kind = rec[0]
+            if kind == "meta":
+                meta = rec[1]
+                creatures = meta["creatures"]
+                foods = [tuple(f) for f in meta["foods"]]
+                space_size = meta["space_size"]
+            elif kind == "event":
+                _, t, code, a, b, x, y = rec
+                if code == EV_EAT and foods:
+                    # quitar el pellet más cercano a la posición registrada
+                    j = min(range(len(foods)), key=lambda k: (foods[k][0] - x) ** 2 + (foods[k][1] - y) ** 2)
+                    foods.pop(j)
+                elif code in (EV_KILL, EV_REMOVE):
+                    idx = b if code == EV_KILL else a
+                    if idx < len(creatures) and idx not in removed:
+                        removed.add(idx)
+                        px, py = positions.get(idx, (x, y))
+                        entry = {"jid": creatures[idx].get("jid"), "x": px, "y": py, "time": t}
+                        if code == EV_KILL:
+                            entry["reason"] = "killed"
+                            entry["killed_by"] = creatures[a].get("jid") if a < len(creatures) else None
+                        else:
+                            entry["reason"] = REMOVE_REASONS[b] if b < len(REMOVE_REASONS) else "removed"
+                        removals.append(entry)
+            elif kind == "frame":
+                _, tick, t, items = rec
+                for idx, x, y in items:
+                    positions[idx] = (x, y)
+                removals = [r for r in removals if r["time"] >= t - removal_window]
+
+                def build(tick=tick, t=t):
+                    fishes = []
+                    for idx, (x, y) in positions.items():
+                        if idx in removed or idx >= len(creatures):
+                            continue
+                        c = creatures[idx]
+                        fishes.append({"jid": c.get("jid"), "x": x, "y": y, "speed": c.get("speed"), "size": c.get("size"), "sense": c.get("sense"), "energy": c.get("energy", 0), "foods_eaten": 0, "kills": 0})
+                    return {"fishes": fishes, "foods": list(foods), "removals": list(removals), "space_size": space_size, "generation": generation, "tick": tick, "t": t}
+
+                yield t, build
+
+
+class ReplaySource:
+    """Lector compartido entre espectadores; el índice se recarga si el archivo crece."""
+
+    def __init__(self, path):
+        self.path = path
+        self._reader = None
+        self._mtime = None
+
+    def reader(self):
+        mtime = os.path.getmtime(self.path + ".idx") if os.path.exists(self.path + ".idx") else os.path.getmtime(self.path)
+        if self._reader is None or mtime != self._mtime:
+            # el archivo creció (grabación en curso): recargar el índice
+            self._reader = ReplayReader(self.path)
+            self._mtime = mtime
+        return self._reader
+
+    def frames(self, generation, min_dt=0.0):
+        """Itera (t, snapshot) de la generación con al menos `min_dt` de tiempo simulado entre frames.
+
+        Los chunks se leen y descomprimen a medida que se consumen: en memoria solo está
+        el chunk en curso, no la generación entera. Los frames que se saltan no llegan a
+        construirse; si el último se salta se emite al final con el estado final.
+        """
+        last_sent = None
+        held = None
+        for t, build in self.reader().iter_frames(generation):
+            if last_sent is not None and t - last_sent < min_dt:
+                held = (t, build)
+                continue
+            held = None
+            last_sent = t
+            yield t, build()
+        if held is not None:
+            t, build = held
+            yield t, build()
+
+
+def encode_line(snap):
+    """Línea NDJSON codificada de un snapshot."""
+    return (json.dumps(snap, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def register_replay_routes(app, path, max_fps=30.0):
+    """Añade `/replay/generations` y `/replay/{generation}` a una aplicación aiohttp.
+
+    `/replay/{generation}?speed=50` emite NDJSON con un snapshot por línea, respetando
+    los tiempos grabados divididos por `speed`; a velocidades altas se omiten frames
+    intermedios para no superar `max_fps` líneas por segundo.
+    """
+    import asyncio
+
+    import aiohttp.web
+
+    source = ReplaySource(path)
+
+    def next_line(frames):
+        item = next(frames, None)
+        return None if item is None else (item[0], encode_line(item[1]))
+
+    async def generations_controller(request):
+        if not os.path.exists(path):
+            return aiohttp.web.json_response({"generations": []})
+        return aiohttp.web.json_response({"generations": source.reader().generations()})
+
+    async def replay_controller(request):
+        if not os.path.exists(path):
+            return aiohttp.web.json_response({"ok": False, "error": "no_replay"}, status=404)
+        try:
+            generation = int(request.match_info["generation"])
+            speed = float(request.query.get("speed", 1.0))
+        except ValueError:
+            return aiohttp.web.json_response({"ok": False, "error": "invalid_params"}, status=400)
+        if speed <= 0:
+            return aiohttp.web.json_response({"ok": False, "error": "invalid_speed"}, status=400)
+        frames = source.frames(generation, min_dt=speed / max_fps)
+        loop = asyncio.get_running_loop()
+        # leer, descomprimir y codificar fuera del bucle de eventos: una ráfaga de frames
+        # saltados a velocidades altas no bloquea a los demás espectadores ni al host
+        pending = await loop.run_in_executor(None, next_line, frames)
+        if pending is None:
+            return aiohttp.web.json_response({"ok": False, "error": "unknown_generation"}, status=404)
+
+        resp = aiohttp.web.StreamResponse(headers={"Content-Type": "application/x-ndjson", "Cache-Control": "no-cache"})
+        await resp.prepare(request)
+        start_wall = loop.time()
+        t0 = pending[0]
+        while pending is not None:
+            t, line = pending
+            delay = start_wall + (t - t0) / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await resp.write(line)
+            pending = await loop.run_in_executor(None, next_line, frames)
+        await resp.write_eof()
+        return resp
+
+    app.router.add_get("/replay/generations", generations_controller)
+    app.router.add_get("/replay/{generation}", replay_controller)
+    return app
+
+
+async def serve(path, port=10001):
+    """Sirve la UI y los endpoints de replay sin ningún agente en ejecución."""
+    import asyncio
+
+    import aiohttp.web
+
+    app = aiohttp.web.Application()
+    register_replay_routes(app, path)
+    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+    if os.path.isdir(static_folder):
+        app.router.add_static("/static/", path=static_folder, name="static")
+    runner = aiohttp.web.AppRunner(app)
+    await runner.setup()
+    site = aiohttp.web.TCPSite(runner, "0.0.0.0", port)
+    await site.start()
+    print(f"Replay UI available at http://localhost:{port}/static/index.html?replay=1")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await runner.cleanup()
+
+
+def replay_path(report_dir):
+    return os.path.join(report_dir, "replay.bin")
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="Reproductor offline de simulaciones grabadas")
+    parser.add_argument("path", nargs="?", default=replay_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "report")))
+    parser.add_argument("--port", type=int, default=10001)
+    args = parser.parse_args()
+    asyncio.run(serve(args.path, args.port))
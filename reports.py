@@ -0,0 +1,108 @@
+"""Escritura de los reportes CSV de fin de generación."""
+import csv
+import os
+
+import evolution
+import records
+
+SUMMARY_HEADER = ["generation", "initial", "deaths", "survivors", "reproducers", "next_population", "avg_speed", "avg_foods", "avg_size", "avg_sense"]
+DETAILS_HEADER = ["generation", "jid_base", "jid_full", "speed", "energy", "size", "sense", "foods_eaten", "alive", "is_reproducer"]
+# archivos de una ejecución que se reemplazan al arrancar una nueva (el checkpoint se conserva para `--resume`)
+RUN_FILES = ("generation_summary.csv", "generation_details.csv", "predation_events.csv", "replay.bin", "replay.bin.idx")
+
+
+def _fmt(value):
+    return f"{value:.3f}" if isinstance(value, (int, float)) else str(value)
+
+
+def summary_row(generation, result, live=None):
+    """Cabecera y fila de `generation_summary.csv` para un `evolution.GenerationResult`.
+
+    `live` (opcional) es el `stats.LiveStats` de la generación: añade sus conteos y la
+    media/desviación de los rasgos de las criaturas vivas al final.
+    """
+    stats = result.stats
+    header = list(SUMMARY_HEADER)
+    row = [generation, result.initial, result.deaths, result.survivors, result.reproducers, len(result.next_population), f"{stats['speed']['mean']:.3f}", f"{stats['foods']['mean']:.3f}", f"{stats['size']['mean']:.3f}", f"{stats['sense']['mean']:.3f}"]
+    # percentiles de los rasgos heredables
+    for trait in evolution.TRAITS:
+        for q in ("p10", "p50", "p90"):
+            header.append(f"{trait}_{q}")
+            row.append(f"{stats[trait][q]:.3f}")
+    if live is not None:
+        extra_header, extra_row = live.summary_columns()
+        header += extra_header
+        row += extra_row
+    return header, row
+
+
+def needs_header(path, header):
+    """True si hay que escribir `header` antes de anexar filas a `path`.
+
+    Si el archivo ya existe con otras columnas (p.ej. `--resume` sobre reportes escritos por
+    una versión anterior), se conserva renombrado a `<nombre>.<n>.csv` y se empieza uno nuevo.
+    """
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            first = next(csv.reader(f), None)
+    except FileNotFoundError:
+        return True
+    if first is None:
+        return True
+    if first == list(header):
+        return False
+    stem, ext = os.path.splitext(path)
+    n = 1
+    while os.path.exists(f"{stem}.{n}{ext}"):
+        n += 1
+    os.replace(path, f"{stem}.{n}{ext}")
+    return True
+
+
+def write_summary(path, generation, result, live=None):
+    """Anexa la fila de resumen de la generación (escribe la cabecera si el archivo es nuevo)."""
+    header, row = summary_row(generation, result, live)
+    write_header = needs_header(path, header)
+    with open(path, "a", newline="", encoding="utf-8") as csvf:
+        writer = csv.writer(csvf)
+        if write_header:
+            writer.writerow(header)
+        writer.writerow(row)
+
+
+def details_rows(generation, creatures_info):
+    """Filas de `generation_details.csv`, una por criatura (lista indexada por cid o dict)."""
+    for info in (creatures_info.values() if hasattr(creatures_info, "values") else creatures_info):
+        base = records.jid_base(info.get("jid_full"))
+        foods = info.get("foods_eaten", 0)
+        # alive flag refers to whether creature survived (not killed by predation)
+        alive_flag = True if info.get("alive", False) else False
+        # a reproducer is an alive creature that ate >=2
+        is_reproducer = True if (alive_flag and foods >= 2) else False
+        yield [generation, base, info.get("jid_full"), _fmt(info.get("speed")), _fmt(info.get("energy")), _fmt(info.get("size")), _fmt(info.get("sense")), foods, alive_flag, is_reproducer]
+
+
+def write_details(path, generation, creatures_info):
+    """Anexa el detalle por criatura de la generación."""
+    write_header = needs_header(path, DETAILS_HEADER)
+    with open(path, "a", newline="", encoding="utf-8") as df:
+        dw = csv.writer(df)
+        if write_header:
+            dw.writerow(DETAILS_HEADER)
+        dw.writerows(details_rows(generation, creatures_info))
+
+
+def clean_report_dir(report_dir):
+    """Elimina los reportes, perfiles y trazas de una ejecución anterior. Devuelve las rutas eliminadas."""
+    import profiling
+    import tracing
+
+    removed = []
+    for name in RUN_FILES:
+        path = os.path.join(report_dir, name)
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:
+            pass
+    return removed + profiling.clean_profiles(report_dir) + tracing.clean_traces(report_dir)
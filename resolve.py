@@ -0,0 +1,88 @@
+"""Resolución por lotes de un tick (modo barrera, `WorldConfig.tick_barrier`).
+
+Sin barrera, comer y depredar se resuelven status a status en el orden de llegada: el
+primero que llega gana el pellet y un depredador puede matar a una presa cuyo propio status
+aún viaja. Con barrera se reúnen primero los movimientos de todo el tick y después
+`resolve_tick` decide en una sola pasada, sin depender del orden de entrada:
+
+1. cada criatura que se movió reclama las comidas a distancia <= `detection_radius` de su
+   camino (rejilla de comida) y las presas a distancia <= radio de ataque (máximo
+   acercamiento de ambos caminos, candidatas de la rejilla de criaturas);
+2. las reclamaciones se ordenan por (t, tipo, distancia, criatura, objetivo): t es el
+   punto del camino en [0, 1] donde ocurre, a igual t se come antes de depredar, y después
+   gana la más cercana y el cid menor;
+3. se aplican en ese orden: un pellet se come una vez, cada criatura come como mucho
+   `foods_per_tick` pellets, una presa muere una vez y una criatura muerta en t ya no
+   come ni depreda después.
+
+La función es pura (no modifica las rejillas): devuelve la lista de resultados y el
+llamador aplica los efectos (`engine.HeadlessWorld`, `GenerationAgent._resolve_barrier`).
+Las reclamaciones de cada criatura son independientes entre sí, de modo que la fase 1 se
+puede repartir entre trabajadores sin cambiar el resultado.
+"""
+import simulation
+import spatial
+
+EAT = 0
+KILL = 1
+
+
+def claims(mover, food_grid, candidates, config=None):
+    """Reclamaciones (t, tipo, distancia, key, objetivo) de una criatura que se movió.
+
+    `mover` es (key, x0, y0, x1, y1, size, sense) y `candidates` un iterable de
+    (key, x0, y0, x1, y1, size) con las posibles presas y su camino en el mismo tick.
+    """
+    key, x0, y0, x1, y1, size, sense = mover
+    radius = getattr(config, "detection_radius", 1.0) if config is not None else 1.0
+    out = [(t, EAT, d, key, food) for food, d, t in food_grid.query_segment(x0, y0, x1, y1, radius)]
+    attack_size_ratio = getattr(config, "attack_size_ratio", 1.2) if config is not None else 1.2
+    attack = simulation.effective_attack_radius(sense, config)
+    for other, qx0, qy0, qx1, qy1, o_size in candidates:
+        if other == key or size < attack_size_ratio * o_size:
+            continue
+        d, t = spatial.closest_approach(x0, y0, x1, y1, qx0, qy0, qx1, qy1)
+        if d <= attack:
+            out.append((t, KILL, d, key, other))
+    return out
+
+
+def resolve_tick(movers, food_grid, candidates, config=None):
+    """Resuelve comida y depredación de un tick completo con desempate determinista.
+
+    `movers` es un iterable de (key, x0, y0, x1, y1, size, sense) y `candidates(mover)`
+    devuelve las posibles presas de cada uno (ver `claims`). Devuelve una lista de
+    (EAT, key, comida, distancia) y (KILL, depredador, presa, distancia) en el orden de
+    aplicación; el resultado no depende del orden de `movers`.
+    """
+    pending = []
+    for mover in movers:
+        pending.extend(claims(mover, food_grid, candidates(mover), config))
+    return apply_claims(pending, config)
+
+
+def apply_claims(pending, config=None):
+    """Fase 3 de `resolve_tick` sobre reclamaciones (t, tipo, distancia, key, objetivo) ya calculadas.
+
+    Permite generar las reclamaciones por otro camino (`kernels.py`) con el mismo desempate.
+    """
+    pending = sorted(pending)
+    limit = simulation.foods_per_tick(config)
+    eaten = set()
+    dead = set()
+    count = {}
+    out = []
+    for _, kind, d, key, target in pending:
+        if key in dead:
+            continue
+        if kind == EAT:
+            if target in eaten or count.get(key, 0) >= limit:
+                continue
+            eaten.add(target)
+            count[key] = count.get(key, 0) + 1
+        elif target in dead:
+            continue
+        else:
+            dead.add(target)
+        out.append((kind, key, target, d))
+    return out
@@ -0,0 +1,257 @@
+"""Ejecución por línea de comandos sin interfaz web, pensada para lotes en nodos de cómputo.
+
+    python runner.py --generations 50 --output runs/exp1
+    python runner.py --config exp.toml --set carrying_capacity=200 --seed 7
+    python runner.py --mode agents --transport loopback --set time_scale=20 --generations 5
+
+La configuración parte de `WorldConfig()` y se sobrescribe, en este orden, con un archivo
+TOML o JSON (`--config`, claves = campos de `WorldConfig`) y con `--set campo=valor` (el
+valor se interpreta como JSON si es posible: `--set space_size=[60,60]`). El modo `engine`
+usa el motor headless (`engine.HeadlessWorld`); el modo `agents`, `HostAgent` y
+`GenerationAgent` sin servidor web ni navegador. Los CSV (y checkpoint, replay, perfiles y
+`run.log`) se escriben en `--output`; al terminar se imprime en stdout un resumen JSON con la duración,
+los ticks por segundo y las estadísticas de cada generación. La salida de los agentes va a
+stderr para que stdout contenga solo el JSON.
+"""
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+import logger_setup
+import reports
+from world import WorldConfig
+
+MODES = ("engine", "agents")
+FIELDS = {f.name: f for f in dataclasses.fields(WorldConfig)}
+
+
+def read_config_file(path):
+    """Lee un archivo `.toml` o `.json` con campos de `WorldConfig`. Devuelve un dict."""
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ValueError("leer TOML requiere Python 3.11+ o el paquete opcional `tomli`; usar JSON")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def parse_override(text):
+    """`campo=valor` -> (campo, valor); el valor se decodifica como JSON y, si no lo es, queda como texto."""
+    name, sep, raw = text.partition("=")
+    if not sep:
+        raise ValueError(f"--set espera campo=valor: {text!r}")
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    return name.strip(), value
+
+
+def coerce(name, value):
+    """Convierte `value` al tipo del valor por defecto del campo `name` de `WorldConfig`."""
+    if name not in FIELDS:
+        raise ValueError(f"campo desconocido de WorldConfig: {name!r}")
+    default = getattr(WorldConfig(), name)
+    if value is None or default is None:
+        return value
+    if isinstance(default, bool):
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+    if isinstance(default, tuple):
+        if isinstance(value, str):
+            value = json.loads(f"[{value}]")  # "60,60"
+        return tuple(value)
+    if isinstance(default, (int, float)):
+        return type(default)(value)
+    return value
+
+
+def build_config(path=None, overrides=()):
+    """`WorldConfig` con los valores del archivo `path` y luego los de `overrides` [(campo, valor)]."""
+    values = dict(read_config_file(path)) if path else {}
+    values.update(overrides)
+    return dataclasses.replace(WorldConfig(), **{name: coerce(name, value) for name, value in values.items()})
+
+
+def generation_row(generation, result, ticks, seconds):
+    """Entrada por generación del resumen JSON."""
+    return {
+        "generation": generation,
+        "initial": result.initial,
+        "deaths": result.deaths,
+        "survivors": result.survivors,
+        "reproducers": result.reproducers,
+        "culled": result.culled,
+        "next_population": len(result.next_population),
+        "ticks": ticks,
+        "seconds": seconds,
+        "stats": result.stats,
+    }
+
+
+def run_engine(cfg, generations, seed, output=None):
+    """Ejecuta `generations` generaciones con el motor headless. Devuelve (filas, ticks, ticks de criatura)."""
+    import engine
+
+    world = engine.HeadlessWorld(cfg, rng=random.Random(seed))
+    world.spawn_generation()
+    rows = []
+    ticks = creature_ticks = 0
+    while len(rows) < generations:
+        creature_ticks += len(world.active)
+        world.tick()
+        ticks += 1
+        if not world.generation_over():
+            continue
+        generation = world.generation
+        if output:
+            # el detalle por criatura se toma antes de que `end_generation` cree la siguiente población
+            reports.write_details(os.path.join(output, "generation_details.csv"), generation, world.creatures_info())
+        world.end_generation()
+        # solo se conserva la fila del resumen: la memoria no crece con el número de generaciones
+        _, result, gen_ticks, seconds = world.results.pop()
+        if output:
+            reports.write_summary(os.path.join(output, "generation_summary.csv"), generation, result)
+        rows.append(generation_row(generation, result, gen_ticks, seconds))
+    return rows, ticks, creature_ticks
+
+
+async def run_agents(cfg, generations, output=None, domain="localhost", max_seconds=None):
+    """Ejecuta `generations` generaciones con los agentes (sin web). Devuelve (filas, ticks, ticks de criatura).
+
+    Los ticks equivalentes se obtienen del tiempo simulado de cada generación dividido por el
+    periodo de reporte de las criaturas, igual que un tick del motor headless.
+    """
+    from hostAgent import HostAgent
+    import simulation
+
+    period = max(cfg.creature_period * simulation.tick_scale(cfg), 1e-9)
+    rows = []
+
+    def on_generation(generation, result, sim_seconds):
+        rows.append(generation_row(generation, result, sim_seconds / period, sim_seconds))
+
+    host = HostAgent(f"host@{domain}", cfg.generation_password)
+    host.config = cfg
+    host.web = False
+    host.report_dir = output
+    await host.start()
+    host.gen.on_generation = on_generation
+    start = time.perf_counter()
+    try:
+        while len(rows) < generations:
+            if max_seconds is not None and time.perf_counter() - start > max_seconds:
+                print(f"Timeout: {len(rows)}/{generations} generations after {max_seconds:g} s", file=sys.stderr)
+                break
+            await asyncio.sleep(0.1)
+    finally:
+        gen = host.gen
+        for agent in list(gen.spawned_agents):
+            await agent.stop()
+        await gen.stop()
+        await host.stop()
+    rows = rows[:generations]
+    ticks = sum(r["ticks"] for r in rows)
+    creature_ticks = sum(r["ticks"] * r["initial"] for r in rows)
+    return rows, ticks, creature_ticks
+
+
+def summary(mode, cfg, seed, rows, ticks, creature_ticks, elapsed, output=None):
+    """Resumen JSON de la ejecución."""
+    return {
+        "mode": mode,
+        "seed": seed,
+        "output": output,
+        "generations": len(rows),
+        "runtime_seconds": elapsed,
+        "ticks": ticks,
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else 0.0,
+        "creature_ticks_per_second": creature_ticks / elapsed if elapsed > 0 else 0.0,
+        "config": dataclasses.asdict(cfg),
+        "per_generation": rows,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ejecución por lotes de la simulación (sin UI) con resumen JSON")
+    parser.add_argument("--config", help="archivo .toml o .json con campos de WorldConfig")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="CAMPO=VALOR", help="sobrescribe un campo de WorldConfig (repetible)")
+    parser.add_argument("--mode", choices=MODES, default="engine", help="motor headless (default) o agentes sin web")
+    parser.add_argument("--transport", choices=("xmpp", "loopback"), help="transporte de los agentes (default: SIM_TRANSPORT o xmpp)")
+    parser.add_argument("--domain", default="localhost", help="dominio XMPP de los agentes")
+    parser.add_argument("--generations", type=int, help="generaciones a ejecutar (default: max_generations)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="directorio de CSV, checkpoint, run.log y summary.json (sin él, modo engine no escribe CSV)")
+    parser.add_argument("--clean", action="store_true", help="borrar los reportes previos de --output antes de empezar")
+    parser.add_argument("--max-seconds", type=float, help="límite de tiempo real en modo agents")
+    parser.add_argument("--quiet", action="store_true", help="descartar los prints y logs INFO de los agentes en lugar de enviarlos a stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        cfg = build_config(args.config, [parse_override(o) for o in args.overrides])
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Configuración inválida: {e}", file=sys.stderr)
+        sys.exit(2)
+    generations = args.generations or cfg.max_generations
+    output = os.path.abspath(args.output) if args.output else None
+    if output:
+        os.makedirs(output, exist_ok=True)
+        if args.clean:
+            reports.clean_report_dir(output)
+        # el log de los agentes acompaña a los CSV en lugar de ir a `report/run.log` del repositorio
+        logger_setup.set_log_path(os.path.join(output, "run.log"))
+    if args.transport:
+        # `transport` lee la variable al importarse: fijarla antes de importar los agentes
+        os.environ["SIM_TRANSPORT"] = args.transport
+
+    random.seed(args.seed)
+    sink = open(os.devnull, "w") if args.quiet else sys.stderr
+    if args.quiet:
+        logging.disable(logging.INFO)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sink):
+        if args.mode == "engine":
+            rows, ticks, creature_ticks = run_engine(cfg, generations, args.seed, output)
+        else:
+            import transport
+
+            # `spade.run` no devuelve el resultado de la corrutina
+            outcome = []
+
+            async def agents_main():
+                outcome.append(await run_agents(cfg, generations, output, args.domain, args.max_seconds))
+
+            transport.run(agents_main())
+            rows, ticks, creature_ticks = outcome[0]
+    elapsed = time.perf_counter() - start
+    if args.quiet:
+        sink.close()
+
+    result = summary(args.mode, cfg, args.seed, rows, ticks, creature_ticks, elapsed, output)
+    if output:
+        with open(os.path.join(output, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+    sys.exit(0 if len(rows) == generations else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+"""Núcleo de la simulación sin dependencias de agentes ni de red.
+
+Contiene la lógica que antes vivía dentro de los behaviours (movimiento y energía de
+`CreatureAgent.ReportBehav`, detección de comida, depredación y objetivo más cercano de
+`GenerationAgent.RecvBehav`) como funciones puras, para reutilizarla desde los agentes,
+el motor headless (`engine.py`) y los benchmarks.
+"""
+import math
+import random
+from dataclasses import dataclass
+
+import spatial
+import utils
+
+# energía relativa a partir de la cual la criatura entra en modo supervivencia
+SURVIVAL_ENERGY = 0.35
+# distancia al punto de spawn a partir de la cual se considera que llegó a casa
+HOME_RADIUS = 0.5
+
+
+@dataclass
+class CreatureState:
+    jid: str
+    speed: float
+    energy: float
+    foods_eaten: int = 0
+    size: float = 1.0
+    sense: float = 0.0
+    x: float = 0.0
+    y: float = 0.0
+    # Sistema de satisfacción
+    satisfied: bool = False
+    survival_mode: bool = False
+    food_goal: int = 2  # Objetivo inicial
+    spawn_x: float = 0.0
+    spawn_y: float = 0.0
+    returning_home: bool = False
+    kills: int = 0  # Contador de depredaciones
+    cid: int = -1  # id entero denso asignado por la generación al spawn
+    generation: int = 0  # generación a la que pertenece el cid
+    period: float = 0.0  # periodo de reporte con jitter (segundos simulados); permite extrapolar
+    throttle: float = 1.0  # ticks por tick impuestos por `slow_down` (ver `backpressure.py`)
+
+
+# --- lado criatura -------------------------------------------------------------------
+
+def update_goal(state):
+    """Actualiza satisfacción / modo supervivencia.
+
+    Devuelve "satisfied", "survival" o None según la transición aplicada.
+    """
+    if state.satisfied:
+        return None
+    # Verificar si ha alcanzado el objetivo de comida
+    if state.foods_eaten >= state.food_goal:
+        state.satisfied = True
+        state.returning_home = True
+        return "satisfied"
+    # Verificar modo supervivencia (35% de energía o menos)
+    if not state.survival_mode and state.energy <= SURVIVAL_ENERGY:
+        state.survival_mode = True
+        state.food_goal = 1  # Reducir objetivo a 1 alimento
+        return "survival"
+    return None
+
+
+def tick_scale(config=None):
+    """Duración de un tick en ticks base (`WorldConfig.tick_scale`): escala desplazamiento y gasto."""
+    return getattr(config, "tick_scale", 1.0) if config is not None else 1.0
+
+
+def step_home(state, config=None):
+    """Avanza hacia el punto de spawn sin gastar energía. Devuelve True al llegar."""
+    dx = state.spawn_x - state.x
+    dy = state.spawn_y - state.y
+    dist = math.hypot(dx, dy)
+    if dist < HOME_RADIUS:
+        return True
+    step = min(state.speed * tick_scale(config) * state.throttle, dist)
+    state.x += (dx / dist) * step
+    state.y += (dy / dist) * step
+    return False
+
+
+def step_forage(state, target, space_size=None, config=None, rng=random, drain=True):
+    """Mueve la criatura hacia `target` (o al azar) y descuenta la energía del tick.
+
+    Devuelve True si se movió buscando un objetivo (aplica `seek_energy_multiplier`).
+    Con `tick_scale` > 1 un tick equivale a varios ticks base (paso y gasto escalados);
+    `state.throttle` multiplica igual (periodo alargado por backpressure). Con
+    `drain=False` no descuenta la energía: el llamador la aplica por lotes (`kernels.drain`).
+    """
+    scale = tick_scale(config) * state.throttle
+    if target is not None:
+        # vector hacia target
+        dx = target[0] - state.x
+        dy = target[1] - state.y
+        dist = math.hypot(dx, dy)
+        if dist > 0:
+            step = min(state.speed * scale, dist)
+            state.x += (dx / dist) * step
+            state.y += (dy / dist) * step
+            seeking = True
+        else:
+            seeking = False
+    else:
+        seeking = False
+        # movimiento aleatorio: dirección uniforme
+        theta = rng.random() * 2 * math.pi
+        state.x += math.cos(theta) * state.speed * scale
+        state.y += math.sin(theta) * state.speed * scale
+    # Limitar posición dentro del espacio si está disponible
+    if space_size is not None:
+        w, h = space_size
+        state.x = max(0.0, min(w, state.x))
+        state.y = max(0.0, min(h, state.y))
+    if drain:
+        state.energy -= tick_drain(state, config, seeking) * scale
+    return seeking
+
+
+def tick_drain(state, config=None, seeking=False):
+    """Energía consumida en un tick: energy_scale*(size^3*speed^2) + sense_scale*sense."""
+    energy_scale = getattr(config, "energy_scale", 0.02) if config is not None else 0.02
+    sense_scale = getattr(config, "sense_scale", 0.02) if config is not None else 0.02
+    drain = utils.energy_drain_per_tick(state.size, state.speed, state.sense, energy_scale, sense_scale)
+    # if seeking, slightly increase drain using seek multiplier
+    if seeking:
+        drain *= getattr(config, "seek_energy_multiplier", 1.3) if config is not None else 1.3
+    return drain
+
+
+def food_energy_gain(size, config=None):
+    """Energía por pellet cuando `eat_confirm` no trae `energy_gain`."""
+    fes = getattr(config, "food_energy_scale", 0.8) if config is not None else 0.8
+    return fes * (size ** 3)
+
+
+def status_payload(state):
+    """Mensaje `status` que la criatura envía en cada tick."""
+    return {
+        "type": "status",
+        "cid": state.cid,
+        "gen": state.generation,
+        "jid": state.jid,
+        "x": state.x,
+        "y": state.y,
+        "energy": state.energy,
+        "speed": state.speed,
+        "size": state.size,
+        "sense": state.sense,
+        "foods_eaten": state.foods_eaten,
+        "kills": state.kills,
+        "satisfied": state.satisfied,
+        "survival": state.survival_mode,
+        "home": state.returning_home,
+        "period": state.period,
+        "throttle": state.throttle,
+    }
+
+
+# --- lado generación -----------------------------------------------------------------
+
+def find_food_in_range(pos, foods, radius):
+    """Índice de la primera comida a distancia <= radius de `pos`, o None."""
+    px, py = pos
+    r2 = radius * radius
+    for idx, (fx, fy) in enumerate(foods):
+        dx = fx - px
+        dy = fy - py
+        if dx * dx + dy * dy <= r2:
+            return idx
+    return None
+
+
+def find_foods_swept(start, end, food_grid, radius, limit=1):
+    """Comidas (claves de `food_grid`) a distancia <= radius del camino start -> end.
+
+    Prueba segmento-punto: una criatura rápida (o un tick grande) no puede saltarse un
+    pellet que quedó entre dos reportes. Devuelve como mucho `limit`, en el orden en que se
+    alcanzan en el camino.
+    """
+    hits = food_grid.query_segment(start[0], start[1], end[0], end[1], radius)
+    return [key for key, _, _ in hits[:limit]]
+
+
+def foods_per_tick(config=None):
+    """Comidas que se pueden comer en un tick: una por tick base (`tick_scale`)."""
+    return max(1, int(round(tick_scale(config))))
+
+
+def last_step(start, end, max_step):
+    """Inicio del último paso de longitud `max_step` sobre start -> end.
+
+    Si entre dos reportes hubo varios ticks (reporte adaptativo), solo el último paso se
+    prueba contra la comida y las presas: los anteriores estaban fuera de alcance.
+    """
+    dx = start[0] - end[0]
+    dy = start[1] - end[1]
+    dist = math.hypot(dx, dy)
+    if max_step <= 0 or dist <= max_step * (1.0 + 1e-9):
+        return start
+    return end[0] + dx / dist * max_step, end[1] + dy / dist * max_step
+
+
+def nearest_food(pos, foods):
+    """Comida más cercana a `pos` (tupla) o None si no queda comida."""
+    px, py = pos
+    nearest = None
+    nearest_d2 = None
+    for f in foods:
+        dx = f[0] - px
+        dy = f[1] - py
+        d2 = dx * dx + dy * dy
+        if nearest is None or d2 < nearest_d2:
+            nearest = f
+            nearest_d2 = d2
+    return nearest
+
+
+def swept_predation_targets(path, predator_size, predator_sense, candidates, config=None):
+    """Como `predation_targets`, pero con los caminos del último tick de ambas criaturas.
+
+    `path` es (x0, y0, x1, y1) del depredador y `candidates` un iterable de
+    (key, x0, y0, x1, y1, size). La distancia es la de máximo acercamiento suponiendo que
+    ambos recorren su segmento en el mismo intervalo (prueba segmento-segmento).
+    """
+    attack_size_ratio = getattr(config, "attack_size_ratio", 1.2) if config is not None else 1.2
+    radius = effective_attack_radius(predator_sense, config)
+    px0, py0, px1, py1 = path
+    out = []
+    for key, qx0, qy0, qx1, qy1, o_size in candidates:
+        if predator_size < attack_size_ratio * o_size:
+            continue
+        d, _ = spatial.closest_approach(px0, py0, px1, py1, qx0, qy0, qx1, qy1)
+        if d <= radius:
+            out.append((key, d))
+    return out
+
+
+def effective_attack_radius(predator_sense, config=None):
+    """Radio de ataque escalado por el `sense` del depredador."""
+    attack_radius = getattr(config, "attack_radius", 1.0) if config is not None else 1.0
+    sense_radius_mult = getattr(config, "sense_radius_mult", 0.5) if config is not None else 0.5
+    return attack_radius * (1.0 + predator_sense * sense_radius_mult)
+
+
+def prey_energy_gain(prey_size, config=None):
+    prey_food_scale = getattr(config, "prey_food_scale", 1.0) if config is not None else 1.0
+    return prey_food_scale * (float(prey_size) ** 3)
+
+
+def predation_targets(pos, predator_size, predator_sense, candidates, config=None):
+    """Presas alcanzables por un depredador en `pos`.
+
+    `candidates` es un iterable de (key, x, y, size) con las criaturas vivas distintas
+    del depredador. Devuelve (key, distancia) para cada presa a distancia menor o igual
+    al radio efectivo cuyo tamaño permite el ataque, en el orden de `candidates`.
+    """
+    attack_size_ratio = getattr(config, "attack_size_ratio", 1.2) if config is not None else 1.2
+    radius = effective_attack_radius(predator_sense, config)
+    px, py = pos
+    out = []
+    for key, ox, oy, o_size in candidates:
+        if predator_size < attack_size_ratio * o_size:
+            continue
+        d = math.hypot(px - ox, py - oy)
+        if d <= radius:
+            out.append((key, d))
+    return out
+
+
+# --- regeneración de comida ------------------------------------------------------------
+
+def regrowth_interval(config=None, rng=random):
+    """Segundos simulados hasta el próximo pellet (Poisson de tasa `food_regrowth_rate`), o None."""
+    rate = getattr(config, "food_regrowth_rate", 0.0) if config is not None else 0.0
+    if rate <= 0:
+        return None
+    return rng.expovariate(rate)
+
+
+def regrowth_position(config, space_size, rng=random):
+    """Posición de un pellet regenerado: uniforme en `food_regrowth_region` (o en todo el mundo)."""
+    w, h = space_size
+    region = getattr(config, "food_regrowth_region", None) if config is not None else None
+    if region:
+        x0, y0, x1, y1 = region
+        x0, x1 = max(0.0, min(x0, x1)), min(float(w), max(x0, x1))
+        y0, y1 = max(0.0, min(y0, y1)), min(float(h), max(y0, y1))
+    else:
+        x0, y0, x1, y1 = 0.0, 0.0, float(w), float(h)
+    return (rng.uniform(x0, x1), rng.uniform(y0, y1))
+
+
+def food_capacity(config, food_count):
+    """Máximo de pellets simultáneos con regeneración (`max_food`, o `food_count` si es 0)."""
+    cap = getattr(config, "max_food", 0) if config is not None else 0
+    return cap if cap > 0 else food_count
+
+
+# --- reporte adaptativo ----------------------------------------------------------------
+
+# margen por jitter del periodo: otra criatura puede dar hasta este múltiplo de pasos por tick propio
+PERIOD_JITTER_MARGIN = 1.25
+
+
+def quiet_ticks(pos, speed, size, sense, food_distance, others, config=None, max_ticks=8):
+    """Ticks que una criatura puede moverse sin enviar `status` sin perder ninguna interacción.
+
+    Cota conservadora: durante esos ticks no puede entrar en el radio de detección de la
+    comida más cercana (`food_distance`, None si no queda) ni en el radio de ataque de
+    ninguna criatura de `others` con la que pueda haber depredación en algún sentido.
+    `others` es un iterable de (x, y, size, sense, speed, slack), donde `slack` es la
+    distancia que esa criatura pudo recorrer desde su último reporte.
+    """
+    if max_ticks <= 0:
+        return 0
+    speed = float(speed or 0.0)
+    quiet = max_ticks
+    if food_distance is not None:
+        detection_radius = getattr(config, "detection_radius", 1.0) if config is not None else 1.0
+        quiet = _ticks_before(food_distance - detection_radius, speed, quiet)
+    attack_size_ratio = getattr(config, "attack_size_ratio", 1.2) if config is not None else 1.2
+    px, py = pos
+    for ox, oy, o_size, o_sense, o_speed, slack in others:
+        radius = 0.0
+        if size >= attack_size_ratio * o_size:
+            radius = effective_attack_radius(sense, config)
+        if o_size >= attack_size_ratio * size:
+            radius = max(radius, effective_attack_radius(o_sense, config))
+        if radius <= 0.0:
+            continue
+        gap = math.hypot(px - ox, py - oy) - radius - slack
+        quiet = _ticks_before(gap, speed + float(o_speed or 0.0) * PERIOD_JITTER_MARGIN, quiet)
+        if quiet == 0:
+            break
+    return quiet
+
+
+def _ticks_before(gap, rate, limit):
+    """Mayor k <= limit tal que tras k pasos de `rate` el hueco `gap` sigue siendo positivo."""
+    if gap <= 0:
+        return 0
+    if rate <= 0:
+        return limit
+    return max(0, min(limit, math.ceil(gap / rate) - 1))
+
+
+def extrapolate(x, y, tx, ty, speed, ticks):
+    """Posición tras `ticks` pasos en línea recta hacia (tx, ty), como `step_forage`/`step_home`."""
+    dx = tx - x
+    dy = ty - y
+    dist = math.hypot(dx, dy)
+    step = speed * ticks
+    if dist <= 0 or step <= 0:
+        return x, y
+    if step >= dist:
+        return tx, ty
+    return x + dx / dist * step, y + dy / dist * step
@@ -0,0 +1,275 @@
+"""Construcción del estado del mundo que consume la interfaz web (`/fishes`).
+
+Sin parámetros `/fishes` devuelve el mundo completo (`world_snapshot`). Si el cliente envía
+su viewport (`/fishes?x0=..&y0=..&x1=..&y1=..&tile=..`, en coordenadas del mundo) se usa
+`viewport_snapshot`: solo se detallan las criaturas y la comida dentro de la vista y las
+criaturas fuera de ella se agregan en teselas de densidad, de modo que el tamaño de la
+respuesta queda acotado por lo que el navegador puede mostrar y no por la población.
+
+`SnapshotCache` guarda el JSON ya codificado (y sus variantes gzip/brotli, comprimidas una
+sola vez bajo demanda) por versión del mundo y viewport, compartido por todos los clientes
+que consultan en el mismo intervalo. La versión publicada avanza como mucho una vez por
+`min_interval`: con statuses llegando sin parar, N clientes siguen costando una codificación
+por intervalo y no una por consulta.
+"""
+import gzip
+import json
+import time
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
+
+from records import CreatureRecord
+
+# número de teselas por lado del mundo cuando el cliente no envía `tile`
+DEFAULT_TILES = 32
+# límite de teselas por lado del mundo aunque el cliente pida un `tile` menor
+MAX_TILES = 256
+# por encima de estos elementos visibles se pasa a teselas también dentro de la vista (zoom lejano)
+DEFAULT_MAX_FISHES = 1500
+DEFAULT_MAX_FOODS = 3000
+
+
+def world_snapshot(fishes, foods, removals, generation, space_size):
+    """Diccionario serializable a JSON con la forma que espera `static/app.js`.
+
+    - fishes: iterable de `CreatureRecord` (o dicts) por criatura (jid, x, y, energy, ...)
+    - foods: iterable de posiciones (x, y)
+    - removals: eliminaciones recientes para los efectos visuales
+    """
+    return {
+        "fishes": [f.to_dict() if isinstance(f, CreatureRecord) else f for f in fishes],
+        "foods": list(foods),
+        "space_size": space_size,
+        "removals": list(removals),
+        "generation": generation,
+    }
+
+
+@dataclass
+class Viewport:
+    """Rectángulo visible del cliente en coordenadas del mundo y parámetros de detalle."""
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    # lado de las teselas de densidad (unidades del mundo); 0 = automático según `space_size`
+    tile: float = 0.0
+    # margen alrededor de la vista que se sigue enviando en detalle (evita parpadeos al girar)
+    margin: float = 1.0
+    max_fishes: int = DEFAULT_MAX_FISHES
+    max_foods: int = DEFAULT_MAX_FOODS
+
+    def __post_init__(self):
+        if self.x1 < self.x0:
+            self.x0, self.x1 = self.x1, self.x0
+        if self.y1 < self.y0:
+            self.y0, self.y1 = self.y1, self.y0
+
+    def bounds(self):
+        m = self.margin
+        return self.x0 - m, self.y0 - m, self.x1 + m, self.y1 + m
+
+
+def parse_viewport(query):
+    """Viewport a partir de los parámetros de `/fishes`, o None si no se envió (o es inválido)."""
+    try:
+        x0, y0, x1, y1 = (float(query[k]) for k in ("x0", "y0", "x1", "y1"))
+    except (KeyError, TypeError, ValueError):
+        return None
+    try:
+        tile = float(query.get("tile", 0) or 0)
+        max_fishes = int(query.get("max_fishes", DEFAULT_MAX_FISHES))
+        max_foods = int(query.get("max_foods", DEFAULT_MAX_FOODS))
+    except (TypeError, ValueError):
+        return None
+    return Viewport(x0, y0, x1, y1, tile=tile, max_fishes=max_fishes, max_foods=max_foods)
+
+
+def _add_tile(tiles, x, y, tile):
+    key = (int(x // tile), int(y // tile))
+    tiles[key] = tiles.get(key, 0) + 1
+
+
+def _tile_list(tiles):
+    # [ix, iy, count]; el centro de la tesela es ((ix + 0.5) * tile, (iy + 0.5) * tile)
+    return [[ix, iy, n] for (ix, iy), n in tiles.items()]
+
+
+def viewport_snapshot(fishes, foods, removals, generation, space_size, view):
+    """Como `world_snapshot`, pero limitado al `view` del cliente.
+
+    - `fishes` / `foods`: solo los elementos dentro de la vista (más el margen)
+    - `tiles`: conteo de criaturas fuera de la vista por tesela de lado `tile`
+    - `lod`: "detail" o "tiles"; con "tiles" (demasiadas criaturas visibles) también las
+      criaturas de la vista van a `tiles` y `fishes` queda vacío. Lo mismo para la comida
+      con `food_tiles`
+    - `counts`: totales del mundo, para los contadores de la UI
+    """
+    bx0, by0, bx1, by1 = view.bounds()
+    side = max(float(space_size[0]), float(space_size[1]), 1e-6)
+    tile = max(view.tile, side / MAX_TILES) if view.tile > 0 else side / DEFAULT_TILES
+    visible = []
+    tiles = {}
+    total_fishes = 0
+    for f in fishes:
+        total_fishes += 1
+        if isinstance(f, CreatureRecord):
+            x, y = f.x or 0.0, f.y or 0.0
+        else:
+            x, y = f.get("x", 0.0), f.get("y", 0.0)
+        if bx0 <= x <= bx1 and by0 <= y <= by1:
+            visible.append(f)
+        else:
+            _add_tile(tiles, x, y, tile)
+
+    lod = "detail"
+    if len(visible) > view.max_fishes:
+        lod = "tiles"
+        for f in visible:
+            if isinstance(f, CreatureRecord):
+                _add_tile(tiles, f.x or 0.0, f.y or 0.0, tile)
+            else:
+                _add_tile(tiles, f.get("x", 0.0), f.get("y", 0.0), tile)
+        visible = []
+
+    visible_foods = []
+    total_foods = 0
+    for pos in foods:
+        total_foods += 1
+        if bx0 <= pos[0] <= bx1 and by0 <= pos[1] <= by1:
+            visible_foods.append(pos)
+    food_tiles = []
+    if len(visible_foods) > view.max_foods:
+        grouped = {}
+        for x, y in visible_foods:
+            _add_tile(grouped, x, y, tile)
+        food_tiles = _tile_list(grouped)
+        visible_foods = []
+
+    return {
+        "fishes": [f.to_dict() if isinstance(f, CreatureRecord) else f for f in visible],
+        "foods": visible_foods,
+        "space_size": space_size,
+        "removals": list(removals),
+        "generation": generation,
+        "viewport": [view.x0, view.y0, view.x1, view.y1],
+        "lod": lod,
+        "tile": tile,
+        "tiles": _tile_list(tiles),
+        "food_tiles": food_tiles,
+        "counts": {"fishes": total_fishes, "foods": total_foods},
+    }
+
+
+# --- caché de respuestas codificadas -----------------------------------------------------
+
+# el módulo `brotli` es opcional: sin él solo se ofrecen gzip e identity
+_brotli = None
+
+
+def _brotli_module():
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+        except ImportError:
+            brotli = False
+        _brotli = brotli
+    return _brotli or None
+
+
+def choose_encoding(accept_encoding):
+    """Mejor codificación soportada según la cabecera `Accept-Encoding` ("br", "gzip" o "identity")."""
+    offered = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        offered.add(name.strip().lower())
+    if "br" in offered and _brotli_module() is not None:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return "identity"
+
+
+class EncodedSnapshot:
+    """JSON codificado de un estado y sus variantes comprimidas (creadas en el primer uso)."""
+
+    __slots__ = ("etag", "variants", "cache")
+
+    def __init__(self, body, etag, cache):
+        self.etag = etag
+        self.variants = {"identity": body}
+        self.cache = cache
+
+    def body(self, encoding="identity"):
+        data = self.variants.get(encoding)
+        if data is None:
+            raw = self.variants["identity"]
+            if encoding == "gzip":
+                data = gzip.compress(raw, compresslevel=self.cache.gzip_level, mtime=0)
+            elif encoding == "br":
+                data = _brotli_module().compress(raw, quality=self.cache.brotli_quality)
+            else:
+                raise ValueError(f"codificación no soportada: {encoding}")
+            self.variants[encoding] = data
+            self.cache.compressions += 1
+        return data
+
+
+class SnapshotCache:
+    """Respuestas de `/fishes` codificadas por (versión del mundo, viewport).
+
+    `version` es cualquier valor comparable que cambie cuando cambia el estado servido
+    (en `HostAgent`: versión de `fishes`/`removals`, versión de la comida de la generación y
+    número de generación). Al cambiar la versión se descarta todo lo anterior; dentro de una
+    versión se guardan hasta `max_entries` viewports distintos (LRU). Un cambio de versión se
+    publica solo si pasaron `min_interval` segundos desde la publicación anterior; mientras
+    tanto se sirve la actual (como mucho `min_interval` de retraso, del orden del sondeo de la UI).
+    """
+
+    def __init__(self, max_entries=32, gzip_level=5, brotli_quality=4, min_interval=0.1, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.min_interval = min_interval
+        self._clock = clock
+        self._published_at = None
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.version = None
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.compressions = 0
+        # prefijo de los ETag: distingue respuestas de ejecuciones distintas del host
+        self._epoch = int(time.time())
+        self._serial = 0
+
+    def get(self, version, view, build):
+        """`EncodedSnapshot` para `version` y `view` (None = mundo completo); `build()` crea el dict si falta."""
+        if version != self.version:
+            now = self._clock()
+            if self._published_at is not None and now - self._published_at < self.min_interval:
+                # cambios coalescidos: se publican en la siguiente consulta tras el intervalo
+                version = self.version
+            else:
+                self.version = version
+                self._published_at = now
+                self.entries.clear()
+        key = astuple(view) if view is not None else None
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        body = json.dumps(build(), separators=(",", ":")).encode("utf-8")
+        self._serial += 1
+        etag = f'W/"{self._epoch:x}-{self._serial:x}"'
+        entry = self.entries[key] = EncodedSnapshot(body, etag, self)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        return {"version": self.version, "entries": len(self.entries), "hits": self.hits, "misses": self.misses, "compressions": self.compressions}
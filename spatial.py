@@ -0,0 +1,188 @@
+"""Índice espacial de rejilla uniforme y pruebas geométricas de trayectorias.
+
+`SpatialGrid` reparte claves con posición (comida, criaturas) en celdas cuadradas de lado
+`cell`; las consultas por círculo, por segmento y del vecino más cercano solo recorren las
+celdas que pueden contener resultados, en lugar de toda la lista. Las funciones de
+geometría (`segment_point_distance`, `closest_approach`) son las pruebas barridas que usan
+`simulation.find_foods_swept` y `simulation.swept_predation_targets`: lo que importa es el
+camino recorrido durante el tick y no solo el punto final.
+"""
+import math
+
+# con pocos elementos es más rápido un recorrido lineal que expandir anillos de celdas
+LINEAR_NEAREST_LIMIT = 32
+
+
+# --- geometría ---------------------------------------------------------------------------
+
+def segment_point_distance(ax, ay, bx, by, px, py):
+    """Distancia del punto P al segmento AB y parámetro t en [0, 1] del punto más cercano."""
+    dx = bx - ax
+    dy = by - ay
+    len2 = dx * dx + dy * dy
+    if len2 <= 0.0:
+        return math.hypot(px - ax, py - ay), 0.0
+    t = ((px - ax) * dx + (py - ay) * dy) / len2
+    if t < 0.0:
+        t = 0.0
+    elif t > 1.0:
+        t = 1.0
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy)), t
+
+
+def closest_approach(p0x, p0y, p1x, p1y, q0x, q0y, q1x, q1y):
+    """Distancia mínima entre dos puntos que recorren P0->P1 y Q0->Q1 en el mismo intervalo.
+
+    En el marco relativo (P - Q) es la distancia del origen al segmento entre los
+    desplazamientos inicial y final. Devuelve (distancia, t).
+    """
+    return segment_point_distance(p0x - q0x, p0y - q0y, p1x - q1x, p1y - q1y, 0.0, 0.0)
+
+
+# --- rejilla -------------------------------------------------------------------------------
+
+class SpatialGrid:
+    """Rejilla hash: celda (ix, iy) -> claves; `positions` guarda la posición de cada clave."""
+
+    def __init__(self, cell=1.0):
+        self.cell = float(cell) if cell > 0 else 1.0
+        self.cells = {}
+        self.positions = {}
+        # celdas extremas ocupadas alguna vez (cota para `nearest`; no se reduce al quitar)
+        self._bounds = (0, 0, -1, -1)
+
+    @classmethod
+    def from_points(cls, points, cell=1.0):
+        """Rejilla cuyas claves son las propias posiciones (p.ej. la lista de comida)."""
+        grid = cls(cell)
+        for p in points:
+            grid.insert(p, p[0], p[1])
+        return grid
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def _cell(self, x, y):
+        c = self.cell
+        return int(x // c), int(y // c)
+
+    def insert(self, key, x, y):
+        if key in self.positions:
+            self.remove(key)
+        self.positions[key] = (x, y)
+        cell = self._cell(x, y)
+        self.cells.setdefault(cell, []).append(key)
+        ix0, iy0, ix1, iy1 = self._bounds
+        if ix1 < ix0:
+            self._bounds = (cell[0], cell[1], cell[0], cell[1])
+        elif not (ix0 <= cell[0] <= ix1 and iy0 <= cell[1] <= iy1):
+            self._bounds = (min(ix0, cell[0]), min(iy0, cell[1]), max(ix1, cell[0]), max(iy1, cell[1]))
+
+    def remove(self, key):
+        pos = self.positions.pop(key, None)
+        if pos is None:
+            return False
+        cell = self._cell(*pos)
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.remove(key)
+            if not bucket:
+                del self.cells[cell]
+        return True
+
+    def move(self, key, x, y):
+        """Actualiza la posición de `key` (solo cambia de celda si hace falta)."""
+        old = self.positions.get(key)
+        if old is not None and self._cell(*old) == self._cell(x, y):
+            self.positions[key] = (x, y)
+            return
+        self.insert(key, x, y)
+
+    def position(self, key):
+        return self.positions.get(key)
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Claves de las celdas que intersecan el rectángulo (sin filtrar por posición exacta)."""
+        ix0, iy0 = self._cell(min(x0, x1), min(y0, y1))
+        ix1, iy1 = self._cell(max(x0, x1), max(y0, y1))
+        cells = self.cells
+        if (ix1 - ix0 + 1) * (iy1 - iy0 + 1) > len(cells):
+            # rectángulo mayor que la parte ocupada: recorrer solo las celdas ocupadas
+            for (ix, iy), bucket in cells.items():
+                if ix0 <= ix <= ix1 and iy0 <= iy <= iy1:
+                    yield from bucket
+            return
+        for ix in range(ix0, ix1 + 1):
+            for iy in range(iy0, iy1 + 1):
+                bucket = cells.get((ix, iy))
+                if bucket:
+                    yield from bucket
+
+    def query_circle(self, x, y, radius):
+        """(clave, distancia) de las claves a distancia <= radius de (x, y)."""
+        positions = self.positions
+        out = []
+        for key in self.query_rect(x - radius, y - radius, x + radius, y + radius):
+            px, py = positions[key]
+            d = math.hypot(px - x, py - y)
+            if d <= radius:
+                out.append((key, d))
+        return out
+
+    def query_segment(self, x0, y0, x1, y1, radius):
+        """(clave, distancia, t) de las claves a distancia <= radius del segmento, ordenadas por t."""
+        positions = self.positions
+        out = []
+        for key in self.query_rect(min(x0, x1) - radius, min(y0, y1) - radius, max(x0, x1) + radius, max(y0, y1) + radius):
+            px, py = positions[key]
+            d, t = segment_point_distance(x0, y0, x1, y1, px, py)
+            if d <= radius:
+                out.append((key, d, t))
+        out.sort(key=lambda item: item[2])
+        return out
+
+    def nearest(self, x, y):
+        """Clave más cercana a (x, y), o None si la rejilla está vacía."""
+        positions = self.positions
+        if not positions:
+            return None
+        if len(positions) <= LINEAR_NEAREST_LIMIT:
+            return min(positions, key=lambda k: (positions[k][0] - x) ** 2 + (positions[k][1] - y) ** 2)
+        cx, cy = self._cell(x, y)
+        cells = self.cells
+        ix0, iy0, ix1, iy1 = self._bounds
+        # anillos necesarios para cubrir todas las celdas que llegaron a ocuparse
+        max_ring = max(cx - ix0, ix1 - cx, cy - iy0, iy1 - cy, 0)
+        best = None
+        best_d2 = math.inf
+        for ring in range(max_ring + 1):
+            for cell in _ring_cells(cx, cy, ring):
+                bucket = cells.get(cell)
+                if not bucket:
+                    continue
+                for key in bucket:
+                    px, py = positions[key]
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    if d2 < best_d2:
+                        best = key
+                        best_d2 = d2
+            # lo que quede en anillos posteriores está al menos a `ring * cell` de (x, y)
+            if best is not None and best_d2 <= (ring * self.cell) ** 2:
+                break
+        return best
+
+
+def _ring_cells(cx, cy, ring):
+    """Celdas a distancia de Chebyshev exactamente `ring` de (cx, cy)."""
+    if ring == 0:
+        yield cx, cy
+        return
+    for ix in range(cx - ring, cx + ring + 1):
+        yield ix, cy - ring
+        yield ix, cy + ring
+    for iy in range(cy - ring + 1, cy + ring):
+        yield cx - ring, iy
+        yield cx + ring, iy
@@ -91,6 +91,7 @@ const raycaster = new THREE.Raycaster();
 const mouse = new THREE.Vector2();
 const creatures = {}; // { jid: { mesh, data, target } }
 let foodMeshes = [];
+let densityMeshes = []; // teselas de densidad enviadas por /fishes fuera del viewport
 let worldSize = { w: 30, h: 30 };
 let timeScale = 1.0;
 let simTime = 0;
@@ -106,6 +107,10 @@ let selectionOutline = null;
 let selectionOutlineParent = null;
 let fetchIntervalId = null; // Para controlar el intervalo de polling dinámicamente
 let bloodStains = []; // Array para trackear manchas de sangre y limpiarlas
+// Parámetros de replay (?replay=<gen|all>&speed=<x>); null = simulación en vivo
+const urlParams = new URLSearchParams(window.location.search);
+const replayParam = urlParams.get('replay');
+const replaySpeed = parseFloat(urlParams.get('speed') || '1') || 1;
 
 
 const SCALE = 2; // escala mundo -> escena
@@ -193,8 +198,13 @@ function init() {
 
   lastTime = performance.now();
   animate();
-  fetchData();
-  startDynamicPolling();
+  if (replayParam) {
+    timeScale = replaySpeed;
+    startReplay(replayParam, replaySpeed);
+  } else {
+    fetchData();
+    startDynamicPolling();
+  }
 }
 
 function startDynamicPolling() {
@@ -686,55 +696,131 @@ function speedToColorHex(speed) {
   return '#' + colorInt.toString(16).padStart(6, '0');
 }
 
+// Rectángulo del suelo visible (coordenadas del mundo) a partir de las esquinas de la pantalla.
+// Devuelve null si alguna esquina apunta por encima del horizonte (se pide el mundo completo).
+const groundPlaneMath = new THREE.Plane(new THREE.Vector3(0, 1, 0), 0);
+const viewportCorners = [[-1, -1], [1, -1], [1, 1], [-1, 1]];
+function computeViewport() {
+  if (!camera) return null;
+  let x0 = Infinity, y0 = Infinity, x1 = -Infinity, y1 = -Infinity;
+  const hit = new THREE.Vector3();
+  for (const [nx, ny] of viewportCorners) {
+    raycaster.setFromCamera(new THREE.Vector2(nx, ny), camera);
+    if (raycaster.ray.intersectPlane(groundPlaneMath, hit) === null) return null;
+    const wx = hit.x / SCALE + worldSize.w / 2;
+    const wy = hit.z / SCALE + worldSize.h / 2;
+    x0 = Math.min(x0, wx); x1 = Math.max(x1, wx);
+    y0 = Math.min(y0, wy); y1 = Math.max(y1, wy);
+  }
+  return {
+    x0: Math.max(0, x0), y0: Math.max(0, y0),
+    x1: Math.min(worldSize.w, x1), y1: Math.min(worldSize.h, y1),
+  };
+}
+
+function fishesUrl() {
+  const view = computeViewport();
+  if (!view) return '/fishes';
+  const f = (v) => v.toFixed(2);
+  return `/fishes?x0=${f(view.x0)}&y0=${f(view.y0)}&x1=${f(view.x1)}&y1=${f(view.y1)}`;
+}
+
 async function fetchData() {
   try {
-    const response = await fetch('/fishes');
+    const response = await fetch(fishesUrl());
     const data = await response.json();
+    applyWorldData(data);
+  } catch (err) {
+    console.error('Error fetching /fishes:', err);
+  }
+}
 
-    const creatureCount = data.fishes.length;
-    document.getElementById('creatures').textContent = creatureCount;
-    document.getElementById('food').textContent = data.foods.length;
-    if (data.generation != null) {
-      document.getElementById('gen').textContent = data.generation;
-      // detectar cambio de generación para activar el bloqueo visual
-      if (lastGenForLock === null || data.generation !== lastGenForLock) {
-        lastGenForLock = data.generation;
-        movementLockedVisual = true;
-        lastCreatureCount = 0;
-        lastCreatureCountChangeTime = performance.now();
-        
-        // Limpiar todas las manchas de sangre de la generación anterior
-        cleanupBloodStains();
-      }
-      currentGeneration = data.generation;
+// Aplica un estado del mundo (misma forma que /fishes) a la escena
+function applyWorldData(data) {
+  // con viewport, `counts` trae los totales del mundo (fishes/foods solo lo visible)
+  const creatureCount = data.counts ? data.counts.fishes : data.fishes.length;
+  document.getElementById('creatures').textContent = creatureCount;
+  document.getElementById('food').textContent = data.counts ? data.counts.foods : data.foods.length;
+  if (data.generation != null) {
+    document.getElementById('gen').textContent = data.generation;
+    // detectar cambio de generación para activar el bloqueo visual
+    if (lastGenForLock === null || data.generation !== lastGenForLock) {
+      lastGenForLock = data.generation;
+      movementLockedVisual = true;
+      lastCreatureCount = 0;
+      lastCreatureCountChangeTime = performance.now();
+      
+      // Limpiar todas las manchas de sangre de la generación anterior
+      cleanupBloodStains();
     }
+    currentGeneration = data.generation;
+  }
 
-    if (data.space_size) {
-      worldSize.w = data.space_size[0];
-      worldSize.h = data.space_size[1];
-    }
+  if (data.space_size) {
+    worldSize.w = data.space_size[0];
+    worldSize.h = data.space_size[1];
+  }
 
-    // lógica para detectar cuándo han aparecido "todos" los blobs de la generación:
-    // mientras el número de criaturas siga aumentando, seguimos bloqueando; cuando
-    // el conteo se estabiliza durante unos 500 ms, liberamos el movimiento visual.
-    const now = performance.now();
-    if (creatureCount !== lastCreatureCount) {
-      lastCreatureCount = creatureCount;
-      lastCreatureCountChangeTime = now;
-    } else {
-      if (movementLockedVisual && (now - lastCreatureCountChangeTime) > 500) {
-        movementLockedVisual = false;
-      }
+  // lógica para detectar cuándo han aparecido "todos" los blobs de la generación:
+  // mientras el número de criaturas siga aumentando, seguimos bloqueando; cuando
+  // el conteo se estabiliza durante unos 500 ms, liberamos el movimiento visual.
+  const now = performance.now();
+  if (creatureCount !== lastCreatureCount) {
+    lastCreatureCount = creatureCount;
+    lastCreatureCountChangeTime = now;
+  } else {
+    if (movementLockedVisual && (now - lastCreatureCountChangeTime) > 500) {
+      movementLockedVisual = false;
     }
+  }
+
+  if (data.removals) {
+    handleRemovals(data.removals);
+  }
 
-    if (data.removals) {
-      handleRemovals(data.removals);
+  updateCreatures(data.fishes);
+  updateFood(data.foods);
+  updateDensityTiles(data.tiles || [], data.food_tiles || [], data.tile || 1);
+}
+
+// Modo replay: index.html?replay=<generación|all>&speed=<x> reproduce una grabación
+// desde disco a través de /replay/<gen> (NDJSON, un estado por línea) sin agentes activos
+async function streamReplay(generation, speed) {
+  const response = await fetch(`/replay/${generation}?speed=${speed}`);
+  if (!response.ok || !response.body) {
+    console.error('Replay no disponible para la generación', generation);
+    return;
+  }
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let nl;
+    while ((nl = buffer.indexOf('\n')) >= 0) {
+      const line = buffer.slice(0, nl);
+      buffer = buffer.slice(nl + 1);
+      if (line) applyWorldData(JSON.parse(line));
     }
+  }
+}
 
-    updateCreatures(data.fishes);
-    updateFood(data.foods);
+async function startReplay(param, speed) {
+  let generations = [];
+  try {
+    if (param === 'all') {
+      const response = await fetch('/replay/generations');
+      generations = (await response.json()).generations || [];
+    } else {
+      generations = [parseInt(param, 10)];
+    }
+    for (const generation of generations) {
+      await streamReplay(generation, speed);
+    }
   } catch (err) {
-    console.error('Error fetching /fishes:', err);
+    console.error('Error streaming replay:', err);
   }
 }
 
@@ -834,6 +920,39 @@ function updateFood(foodsData) {
   });
 }
 
+// Teselas [ix, iy, count] como cuadros planos cuya opacidad crece con la densidad
+function updateDensityTiles(tiles, foodTiles, tile) {
+  densityMeshes.forEach((m) => {
+    scene.remove(m);
+    m.geometry.dispose();
+    m.material.dispose();
+  });
+  densityMeshes = [];
+
+  const addTiles = (list, color, y) => {
+    if (list.length === 0) return;
+    const maxCount = list.reduce((m, t) => Math.max(m, t[2]), 1);
+    const size = tile * SCALE * 0.92;
+    list.forEach(([ix, iy, count]) => {
+      const geometry = new THREE.PlaneGeometry(size, size);
+      const material = new THREE.MeshBasicMaterial({
+        color,
+        transparent: true,
+        opacity: 0.12 + 0.5 * (count / maxCount),
+        depthWrite: false,
+      });
+      const mesh = new THREE.Mesh(geometry, material);
+      const pos = worldToScene((ix + 0.5) * tile, (iy + 0.5) * tile);
+      mesh.rotation.x = -Math.PI / 2;
+      mesh.position.set(pos.x, y, pos.z);
+      scene.add(mesh);
+      densityMeshes.push(mesh);
+    });
+  };
+  addTiles(tiles, 0x8b5cf6, 0.03);
+  addTiles(foodTiles, 0x22c55e, 0.02);
+}
+
 function updateSelectionOutline(entry) {
   // Eliminar contorno previo si existe
   if (selectionOutline && selectionOutlineParent) {
@@ -1401,7 +1520,17 @@ function onWindowResize() {
   renderer.setSize(window.innerWidth, window.innerHeight);
 }
 
-window.addEventListener('DOMContentLoaded', () => { init(); setupTimeControls(); setupCurseTool(); });
+window.addEventListener('DOMContentLoaded', () => {
+  init();
+  if (replayParam) {
+    // en replay la velocidad la fija el parámetro `speed` de la URL
+    const controls = document.getElementById('time-controls');
+    if (controls) controls.style.display = 'none';
+  } else {
+    setupTimeControls();
+  }
+  setupCurseTool();
+});
 
 function performCurseDrop(event) {
   if (!renderer || !camera) return;
@@ -0,0 +1,271 @@
+"""Estadísticas incrementales de la población durante la generación.
+
+`LiveStats` se actualiza en O(1) con cada evento (spawn, status, comida, depredación,
+fin) a partir de columnas indexadas por cid, sin recorrer `creatures_info`. Expone
+conteos (activas, vivas, satisfechas, en modo supervivencia, depredadas, agotadas),
+media/varianza (Welford) e histogramas de los rasgos de las criaturas vivas y de la
+energía de las activas. Lo consumen el endpoint `/stats` y `generation_summary.csv`.
+"""
+import math
+from array import array
+
+TRAITS = ("speed", "size", "sense")
+
+# bits de estado por criatura
+ACTIVE = 1
+ALIVE = 2
+SATISFIED = 4
+SURVIVAL = 8
+
+
+class RunningStats:
+    """Media y varianza incrementales (Welford) con soporte para quitar valores."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        if self.n <= 1:
+            self.n = 0
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        self.n -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 -= delta * (x - self.mean)
+        if self.m2 < 0.0:
+            self.m2 = 0.0
+
+    def replace(self, old, new):
+        """Sustituye un valor ya contado (p.ej. la energía de una criatura en cada status)."""
+        if self.n == 0:
+            self.add(new)
+            return
+        delta = new - old
+        old_mean = self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (new - self.mean + old - old_mean)
+        if self.m2 < 0.0:
+            self.m2 = 0.0
+
+    @property
+    def variance(self):
+        return self.m2 / self.n if self.n > 0 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def as_dict(self):
+        return {"n": self.n, "mean": self.mean, "std": self.std}
+
+
+class Histogram:
+    """Histograma de ancho fijo sobre [lo, hi]; los valores fuera de rango se cuentan aparte (`under`/`over`)."""
+
+    __slots__ = ("lo", "hi", "counts", "under", "over", "_scale")
+
+    def __init__(self, lo, hi, bins=10):
+        self.lo = float(lo)
+        self.hi = float(hi) if hi > lo else float(lo) + 1.0
+        self.counts = [0] * bins
+        self.under = 0
+        self.over = 0
+        self._scale = bins / (self.hi - self.lo)
+
+    def _bin(self, x):
+        """Índice del intervalo de `x`; -1 por debajo de `lo` y `len(counts)` por encima de `hi`."""
+        if x < self.lo:
+            return -1
+        if x > self.hi:
+            return len(self.counts)
+        # `hi` cae en el último intervalo (cerrado por arriba)
+        return min(int((x - self.lo) * self._scale), len(self.counts) - 1)
+
+    def add(self, x):
+        i = self._bin(x)
+        if i < 0:
+            self.under += 1
+        elif i == len(self.counts):
+            self.over += 1
+        else:
+            self.counts[i] += 1
+
+    def remove(self, x):
+        i = self._bin(x)
+        if i < 0:
+            self.under = max(self.under - 1, 0)
+        elif i == len(self.counts):
+            self.over = max(self.over - 1, 0)
+        elif self.counts[i] > 0:
+            self.counts[i] -= 1
+
+    def as_dict(self):
+        return {"lo": self.lo, "hi": self.hi, "counts": list(self.counts), "under": self.under, "over": self.over}
+
+
+class LiveStats:
+    """Agregados de la generación actual, indexados por cid."""
+
+    def __init__(self, config=None, bins=10):
+        self.config = config
+        self.bins = bins
+        self.reset()
+
+    def _ranges(self):
+        # la velocidad no tiene máximo configurado (la mutación la desplaza) y la energía crece
+        # con cada comida: lo que supere el rango se cuenta en `over` del histograma
+        cfg = self.config
+        return {
+            "speed": (getattr(cfg, "min_speed", 0.1), 3.0),
+            "size": (getattr(cfg, "size_min", 0.6), getattr(cfg, "size_max", 1.8)),
+            "sense": (getattr(cfg, "sense_min", 0.0), getattr(cfg, "sense_max", 2.0)),
+            "energy": (0.0, 3.0),
+        }
+
+    def reset(self, generation=0):
+        self.generation = generation
+        self.flags = bytearray()
+        self.energy = array("d")
+        self.traits = {name: array("d") for name in TRAITS}
+        self.spawned = 0
+        self.active = 0
+        self.alive = 0
+        self.satisfied = 0
+        self.survival = 0
+        self.killed = 0
+        self.exhausted = 0
+        self.finished = 0
+        self.foods_eaten = 0
+        self.kills = 0
+        ranges = self._ranges()
+        self.trait_stats = {name: RunningStats() for name in TRAITS}
+        self.trait_hist = {name: Histogram(*ranges[name], bins=self.bins) for name in TRAITS}
+        self.energy_stats = RunningStats()
+        self.energy_hist = Histogram(*ranges["energy"], bins=self.bins)
+
+    # --- eventos ----------------------------------------------------------------------
+
+    def spawn(self, cid, speed, size, sense, energy):
+        """Registra la criatura `cid` (los cids se asignan en orden 0..n-1)."""
+        while len(self.flags) <= cid:
+            self.flags.append(0)
+            self.energy.append(0.0)
+            for column in self.traits.values():
+                column.append(0.0)
+        energy = float(energy or 0.0)
+        self.flags[cid] = ACTIVE | ALIVE
+        self.energy[cid] = energy
+        for name, value in zip(TRAITS, (speed, size, sense)):
+            value = float(value or 0.0)
+            self.traits[name][cid] = value
+            self.trait_stats[name].add(value)
+            self.trait_hist[name].add(value)
+        self.energy_stats.add(energy)
+        self.energy_hist.add(energy)
+        self.spawned += 1
+        self.active += 1
+        self.alive += 1
+
+    def set_energy(self, cid, value):
+        """Nueva energía de una criatura activa."""
+        if value is None or not self.flags[cid] & ACTIVE:
+            return
+        value = float(value)
+        old = self.energy[cid]
+        if value != old:
+            self.energy_stats.replace(old, value)
+            self.energy_hist.remove(old)
+            self.energy_hist.add(value)
+            self.energy[cid] = value
+
+    def status(self, cid, energy=None, satisfied=None, survival=None):
+        """Aplica un mensaje `status`: energía y transiciones satisfecha / supervivencia."""
+        self.set_energy(cid, energy)
+        flags = self.flags[cid]
+        if satisfied and not flags & SATISFIED:
+            self.flags[cid] = flags = flags | SATISFIED
+            self.satisfied += 1
+        if survival and not flags & SURVIVAL:
+            self.flags[cid] = flags | SURVIVAL
+            self.survival += 1
+
+    def eat(self, cid):
+        self.foods_eaten += 1
+
+    def kill(self, predator, prey):
+        """`predator` depreda a `prey`: la presa deja de estar viva y activa."""
+        self.kills += 1
+        self.foods_eaten += 1
+        self.killed += 1
+        self._deactivate(prey)
+        self._bury(prey)
+
+    def finish(self, cid, satisfied=False, exhausted=False):
+        """La criatura terminó (llegó a casa, se agotó o fin de generación)."""
+        if not self.flags[cid] & ACTIVE:
+            return
+        self.finished += 1
+        if satisfied and not self.flags[cid] & SATISFIED:
+            self.flags[cid] |= SATISFIED
+            self.satisfied += 1
+        self._deactivate(cid)
+        if exhausted:
+            self.exhausted += 1
+            self._bury(cid)
+
+    def _deactivate(self, cid):
+        if self.flags[cid] & ACTIVE:
+            self.flags[cid] &= ~ACTIVE & 0xFF
+            self.active -= 1
+            old = self.energy[cid]
+            self.energy_stats.remove(old)
+            self.energy_hist.remove(old)
+
+    def _bury(self, cid):
+        if self.flags[cid] & ALIVE:
+            self.flags[cid] &= ~ALIVE & 0xFF
+            self.alive -= 1
+            for name in TRAITS:
+                value = self.traits[name][cid]
+                self.trait_stats[name].remove(value)
+                self.trait_hist[name].remove(value)
+
+    # --- lectura ----------------------------------------------------------------------
+
+    def snapshot(self):
+        """Dict serializable a JSON para `/stats`."""
+        return {
+            "generation": self.generation,
+            "counts": {
+                "spawned": self.spawned, "active": self.active, "alive": self.alive,
+                "satisfied": self.satisfied, "survival_mode": self.survival,
+                "killed": self.killed, "exhausted": self.exhausted, "finished": self.finished,
+                "foods_eaten": self.foods_eaten, "kills": self.kills,
+            },
+            "traits": {
+                name: dict(self.trait_stats[name].as_dict(), histogram=self.trait_hist[name].as_dict())
+                for name in TRAITS
+            },
+            "energy": dict(self.energy_stats.as_dict(), histogram=self.energy_hist.as_dict()),
+        }
+
+    def summary_columns(self):
+        """Cabecera y valores extra para `generation_summary.csv`."""
+        header = ["alive", "satisfied", "survival_mode", "killed", "exhausted"]
+        row = [self.alive, self.satisfied, self.survival, self.killed, self.exhausted]
+        for name in TRAITS:
+            header += [f"alive_{name}_mean", f"alive_{name}_std"]
+            row += [f"{self.trait_stats[name].mean:.3f}", f"{self.trait_stats[name].std:.3f}"]
+        return header, row
@@ -0,0 +1,32 @@
+"""Los módulos del proyecto están en la raíz del repositorio (sin paquete instalable)."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# los agentes usan el transporte en memoria (`loopback.py`): sin servidor XMPP ni SPADE
+os.environ.setdefault("SIM_TRANSPORT", "loopback")
+
+
+@pytest.fixture
+def make_generation():
+    """`GenerationAgent` sin arrancar con criaturas activas en `creatures` [(x, y)] y comida `foods`."""
+    from generationAgent import GenerationAgent
+    from records import CreatureRecord
+
+    def make(cfg, creatures, foods=()):
+        gen = GenerationAgent("generation@localhost", "x")
+        gen.config = cfg
+        gen.creatures_info = [CreatureRecord(f"creature1_{i}@localhost", speed=1.0, size=1.0, sense=1.0, x=x, y=y, cid=i) for i, (x, y) in enumerate(creatures)]
+        gen.active_cids = set(range(len(creatures)))
+        for info in gen.creatures_info:
+            gen.stats.spawn(info.cid, info.speed, info.size, info.sense, 1.0)
+        gen.last_report = [0.0] * len(creatures)
+        gen.spawn_points = [(0.0, 0.0)] * len(creatures)
+        gen._set_foods(list(foods))
+        gen._index_creatures()
+        return gen
+
+    return make
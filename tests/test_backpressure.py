@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+import backpressure
+import loopback
+from world import WorldConfig
+
+
+def shed(shedder, bodies):
+    """Pone `bodies` en el buzón de un behaviour y devuelve los `data` en el orden en que `shedder` los entrega."""
+    behaviour = loopback.CyclicBehaviour()
+
+    async def main():
+        for body in bodies:
+            behaviour.queue.put_nowait(loopback.Message(body=json.dumps(body)))
+        out = []
+        while behaviour.mailbox_size() or shedder.backlog:
+            _, data = await shedder.next(behaviour, timeout=0)
+            out.append(data)
+        return out
+
+    return asyncio.run(main())
+
+
+def status(cid, x):
+    return {"type": "status", "cid": cid, "x": x}
+
+
+def test_coalesce_keeps_latest_status_per_creature():
+    shedder = backpressure.LoadShedder.from_config(WorldConfig(backpressure_low=4), policies=(backpressure.COALESCE,))
+    bodies = [status(0, 1.0), status(1, 1.0), {"type": "stats"}, status(0, 2.0), status(2, 1.0), status(0, 3.0), status(1, 2.0)]
+    out = shed(shedder, bodies)
+    # de cada criatura queda su último status, con los descartados en `coalesced`,
+    # y los demás mensajes conservan su orden
+    assert out == [{"type": "stats"}, status(2, 1.0), {**status(0, 3.0), "coalesced": 2}, {**status(1, 2.0), "coalesced": 1}]
+    assert shedder.coalesced == 3 and shedder.received == len(bodies)
+
+
+def test_without_coalesce_every_status_is_delivered():
+    shedder = backpressure.LoadShedder.from_config(WorldConfig(backpressure_low=4), policies=())
+    bodies = [status(0, float(i)) for i in range(10)]
+    assert shed(shedder, bodies) == bodies
+    assert shedder.coalesced == 0
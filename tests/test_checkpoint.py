@@ -0,0 +1,92 @@
+import dataclasses
+import os
+import random
+
+import pytest
+
+import checkpoint
+import evolution
+import reports
+from records import CreatureRecord
+from world import WorldConfig
+
+
+def state(cfg=None):
+    rng = random.Random(3)
+    return {
+        "generation": 4,
+        "creatures_info": [CreatureRecord("creature4_0@localhost", foods_eaten=2, speed=1.2, cid=0)],
+        "foods": [(rng.uniform(0, 30), rng.uniform(0, 30)) for _ in range(5)],
+        "next_population": {"speed": [1.2, 0.9], "energy": [0.8, 1.1], "size": [1.0, 1.3], "sense": [0.5, 1.5]},
+        "rng_state": rng.getstate(),
+        "config": dataclasses.asdict(cfg or WorldConfig(time_scale=4.0)),
+    }
+
+
+def test_round_trip(tmp_path):
+    path = checkpoint.checkpoint_path(str(tmp_path))
+    original = state()
+    checkpoint.save_checkpoint(path, original)
+    loaded = checkpoint.load_checkpoint(path)
+    assert loaded["foods"] == original["foods"]
+    assert loaded["rng_state"] == original["rng_state"]
+    assert loaded["creatures_info"][0].speed == 1.2
+    population = evolution.Population(**loaded["next_population"])
+    assert list(population.rows()) == [(1.2, 0.8, 1.0, 0.5), (0.9, 1.1, 1.3, 1.5)]
+    # escritura atómica: no quedan temporales junto al checkpoint
+    assert os.listdir(tmp_path) == [checkpoint.CHECKPOINT_NAME]
+
+
+def test_missing_and_invalid(tmp_path):
+    path = str(tmp_path / "checkpoint.bin")
+    assert checkpoint.load_checkpoint(path) is None
+    with open(path, "wb") as f:
+        f.write(b"not a checkpoint")
+    with pytest.raises(ValueError):
+        checkpoint.load_checkpoint(path)
+
+
+def test_config_from_state_drops_retired_fields():
+    saved = state()
+    saved["config"]["monitor_period"] = 1.0
+    cfg = checkpoint.config_from_state(saved, WorldConfig)
+    assert cfg.time_scale == 4.0
+    assert not hasattr(cfg, "monitor_period")
+
+
+def test_resume_adopts_checkpoint_config_before_setup(tmp_path):
+    from generationAgent import GenerationAgent
+
+    path = checkpoint.checkpoint_path(str(tmp_path))
+    checkpoint.save_checkpoint(path, state(WorldConfig(time_scale=4.0, tick_barrier=True)))
+    gen = GenerationAgent("generation@localhost", "x")
+    gen.resume_checkpoint = path
+    loaded = gen.load_resume_state()
+    assert loaded["generation"] == 4
+    assert gen.config.time_scale == 4.0 and gen.config.tick_barrier
+    # una segunda llamada (desde `setup`) no vuelve a leer el archivo
+    assert gen.load_resume_state() is loaded
+
+
+def test_resume_without_checkpoint(tmp_path):
+    from generationAgent import GenerationAgent
+
+    gen = GenerationAgent("generation@localhost", "x")
+    gen.resume_checkpoint = str(tmp_path / "missing.bin")
+    assert gen.load_resume_state() is None
+    assert gen.resume_checkpoint is None
+
+
+def test_csv_with_other_columns_is_kept_aside(tmp_path):
+    path = str(tmp_path / "generation_details.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("generation,old_column\n1,x\n")
+    reports.write_details(path, 2, [CreatureRecord("creature2_0@localhost", foods_eaten=1)])
+    with open(path, encoding="utf-8") as f:
+        assert f.readline().strip() == ",".join(reports.DETAILS_HEADER)
+    with open(str(tmp_path / "generation_details.1.csv"), encoding="utf-8") as f:
+        assert f.readline().strip() == "generation,old_column"
+    # con la misma cabecera se anexa sin repetirla
+    reports.write_details(path, 3, [CreatureRecord("creature3_0@localhost", foods_eaten=1)])
+    with open(path, encoding="utf-8") as f:
+        assert sum(1 for line in f if line.startswith("generation,")) == 1
@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+import evolution
+from records import CreatureRecord
+from world import WorldConfig
+
+
+def creatures(foods, alive=None):
+    """Registro indexado por cid con rasgos distintos por criatura (speed = 1 + cid/10)."""
+    alive = alive or [True] * len(foods)
+    return [
+        CreatureRecord(f"creature1_{i}@localhost", foods_eaten=f, alive=a, speed=1.0 + i / 10, energy=0.5, size=1.0, sense=1.0)
+        for i, (f, a) in enumerate(zip(foods, alive))
+    ]
+
+
+def test_classify():
+    pop = evolution.Population.from_creatures_info(creatures([0, 1, 2, 3], alive=[True, True, True, False]))
+    assert list(evolution.classify(pop)) == [evolution.DEATH, evolution.SURVIVOR, evolution.REPRODUCER, evolution.DEATH]
+
+
+def test_each_child_follows_its_parent():
+    # sin mutación, el hijo hereda la velocidad del padre: el orden queda a la vista
+    cfg = WorldConfig(mutation_sigma_speed=0.0, mutation_sigma_size=0.0, mutation_sigma_sense=0.0)
+    result = evolution.evaluate_generation(creatures([2, 1, 0, 2, 1]), cfg, random.Random(1))
+    assert list(result.next_population.speed) == [1.0, 1.0, 1.1, 1.3, 1.3, 1.4]
+    assert result.next_population.bases == [0, 1, 3, 4]
+    assert (result.survivors, result.reproducers, result.deaths) == (4, 2, 1)
+
+
+def test_capacity_passthrough():
+    pop = evolution.Population.from_creatures_info(creatures([1, 2, 2]))
+    keep, parents = [0, 1, 2], [1, 2]
+    assert evolution.apply_capacity(pop, keep, parents, WorldConfig()) == (keep, parents)
+    assert evolution.apply_capacity(pop, keep, parents, WorldConfig(carrying_capacity=5)) == (keep, parents)
+
+
+def test_capacity_topk_keeps_the_fittest():
+    records = creatures([1, 3, 2, 2, 1])
+    records[2].kills = 1  # mismas comidas que 3, desempata por kills
+    pop = evolution.Population.from_creatures_info(records)
+    cfg = WorldConfig(carrying_capacity=4, capacity_selection="topk")
+    # plazas: supervivientes 0..4 e hijos de 1, 2 y 3
+    kept, bred = evolution.apply_capacity(pop, [0, 1, 2, 3, 4], [1, 2, 3], cfg)
+    # 1 (superviviente e hijo), 2 (superviviente e hijo); con aptitud igual el superviviente va antes que su hijo
+    assert (kept, bred) == ([1, 2], [1, 2])
+    cfg = WorldConfig(carrying_capacity=3, capacity_selection="topk")
+    assert evolution.apply_capacity(pop, [0, 1, 2, 3, 4], [1, 2, 3], cfg) == ([1, 2], [1])
+
+
+def test_capacity_tournament():
+    pop = evolution.Population.from_creatures_info(creatures([1, 3, 2, 2, 1, 0, 2, 3]))
+    keep, parents = list(range(8)), [1, 2, 3, 6, 7]
+    cfg = WorldConfig(carrying_capacity=6, capacity_selection="tournament", tournament_size=2)
+    kept, bred = evolution.apply_capacity(pop, keep, parents, cfg, random.Random(5))
+    assert len(kept) + len(bred) == 6
+    assert kept == sorted(set(kept)) and bred == sorted(set(bred))
+    assert set(kept) <= set(keep) and set(bred) <= set(parents)
+    # misma semilla, misma selección
+    assert evolution.apply_capacity(pop, keep, parents, cfg, random.Random(5)) == (kept, bred)
+    # con torneos que ven todas las plazas gana siempre la más apta: la misma aptitud que top-k
+    big = WorldConfig(carrying_capacity=6, capacity_selection="tournament", tournament_size=1000)
+    top = WorldConfig(carrying_capacity=6, capacity_selection="topk")
+
+    def chosen_fitness(kept, bred):
+        return sorted(evolution.fitness(pop, i) for i in kept + bred)
+
+    assert chosen_fitness(*evolution.apply_capacity(pop, keep, parents, big, random.Random(5))) == chosen_fitness(*evolution.apply_capacity(pop, keep, parents, top))
+
+
+def test_capacity_unknown_selection():
+    pop = evolution.Population.from_creatures_info(creatures([1, 2, 2]))
+    with pytest.raises(ValueError):
+        evolution.apply_capacity(pop, [0, 1, 2], [1, 2], WorldConfig(carrying_capacity=2, capacity_selection="roulette"))
+
+
+def test_capacity_bounds_next_population():
+    cfg = WorldConfig(carrying_capacity=4, mutation_sigma_speed=0.0, mutation_sigma_size=0.0, mutation_sigma_sense=0.0)
+    result = evolution.evaluate_generation(creatures([2, 1, 0, 2, 3, 1]), cfg, random.Random(1))
+    assert len(result.next_population) == 4
+    assert result.culled == 5 + 3 - 4
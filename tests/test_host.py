@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+import loopback
+from world import WorldConfig
+
+
+def host_agent():
+    """`HostAgent` con su estado y `RecvBehav`, sin arrancar ni crear la generación."""
+    from hostAgent import HostAgent
+
+    host = HostAgent("host@localhost", "x")
+    host._init_state(WorldConfig())
+    return host
+
+
+def receive(host, *bodies):
+    """Entrega `bodies` al `RecvBehav` del host y los procesa en orden."""
+    behaviour = host.behaviours[0]
+
+    async def main():
+        for body in bodies:
+            behaviour.queue.put_nowait(loopback.Message(to="host@localhost", body=json.dumps(body)))
+        while behaviour.mailbox_size() or host.shedder.backlog:
+            await behaviour.run()
+
+    asyncio.run(main())
+
+
+def status(cid, gen, x=1.0):
+    return {"type": "status", "cid": cid, "gen": gen, "jid": f"creature{gen}_{cid}@localhost", "x": x, "y": 1.0}
+
+
+def test_status_from_a_newer_generation_is_adopted():
+    host = host_agent()
+    receive(host, {"type": "generation_start", "generation": 1}, status(0, 1), status(1, 1))
+    assert sorted(host.fishes) == [0, 1]
+    # `generation_start` de la 2 perdido: el primer status de la 2 la adopta
+    receive(host, status(0, 2, x=5.0))
+    assert host.generation == 2
+    assert {key: fish.x for key, fish in host.fishes.items()} == {0: 5.0}
+    # statuses tardíos de la 1 se descartan y un `generation_start` retrasado no borra la 2
+    receive(host, status(1, 1), {"type": "generation_start", "generation": 2})
+    assert host.generation == 2 and list(host.fishes) == [0]
+
+
+def test_restart_is_adopted_from_generation_start():
+    host = host_agent()
+    receive(host, {"type": "generation_start", "generation": 5}, status(0, 5))
+    receive(host, {"type": "generation_start", "generation": 1}, status(3, 1))
+    assert host.generation == 1 and list(host.fishes) == [3]
@@ -0,0 +1,39 @@
+import importlib.util
+import random
+
+import pytest
+
+import kernels
+
+# "numba" necesita Numba instalado (dependencia opcional); "nojit" ejecuta el mismo código
+# de los kernels sin compilar y solo necesita numpy
+BACKENDS = [
+    pytest.param(kernels.NUMBA, marks=pytest.mark.skipif(kernels.backend() != kernels.NUMBA, reason="los kernels compilados requieren numba")),
+    pytest.param(kernels.NOJIT, marks=pytest.mark.skipif(importlib.util.find_spec("numpy") is None, reason="los kernels sin compilar requieren numpy")),
+]
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    from benchmarks import bench_kernels
+
+    # población suficiente para que haya comidas alcanzadas y depredaciones en el tick
+    return bench_kernels.tick_inputs(500, random.Random(1234))
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["segment_hits", "predation_claims", "predation_sweep", "nearest", "drain"])
+def test_kernel_matches_python_path(inputs, name, backend):
+    from benchmarks import bench_kernels
+
+    call = bench_kernels.calls(inputs)[name]
+    if name in ("segment_hits", "predation_claims"):
+        assert call(kernels.PYTHON)[0], "entradas sin resultados: la comparación no prueba nada"
+    bench_kernels.check(inputs, only=(name,), backend=backend)
+
+
+def test_nojit_requires_numpy():
+    if importlib.util.find_spec("numpy") is not None:
+        pytest.skip("numpy instalado")
+    with pytest.raises(RuntimeError):
+        kernels.drain([1.0], [1.0], [1.0], [1.0], [False], [1.0], backend=kernels.NOJIT)
@@ -0,0 +1,70 @@
+import dataclasses
+import math
+import random
+
+import pytest
+
+import layouts
+import utils
+from world import WorldConfig
+
+SPACE = (60.0, 40.0)
+
+
+def inside(xs, ys, space=SPACE):
+    return all(0.0 <= x <= space[0] for x in xs) and all(0.0 <= y <= space[1] for y in ys)
+
+
+@pytest.mark.parametrize("name", sorted(layouts.FOOD_LAYOUTS))
+def test_food_layouts_stay_in_bounds(name):
+    xs, ys = layouts.FOOD_LAYOUTS[name](200, SPACE, random.Random(1))
+    assert len(xs) == len(ys) == 200
+    assert inside(xs, ys)
+
+
+def test_poisson_disk_min_distance():
+    xs, ys = layouts.poisson_disk(150, SPACE, random.Random(2), min_dist=2.5)
+    pts = layouts.points(xs, ys)
+    assert 0 < len(pts) <= 150
+    assert min(math.dist(a, b) for i, a in enumerate(pts) for b in pts[i + 1:]) >= 2.5
+    # sin `min_dist` elige uno con el que caben todos
+    assert len(layouts.poisson_disk(300, SPACE, random.Random(2))[0]) == 300
+    # si no caben, devuelve los aceptados sin pasarse
+    assert len(layouts.poisson_disk(500, SPACE, random.Random(2), min_dist=10.0)[0]) < 500
+
+
+def test_gradient_density_grows_along_axis():
+    xs, ys = layouts.gradient(4000, SPACE, random.Random(3), axis="y", lo=0.0, hi=1.0)
+    assert inside(xs, ys)
+    low = sum(1 for y in ys if y < SPACE[1] / 2)
+    # densidad lineal de 0 a 1: la mitad baja tiene ~1/4 de los puntos
+    assert 0.2 < low / len(ys) < 0.3
+
+
+def test_clusters_are_folded_into_bounds():
+    xs, ys = layouts.clusters(500, SPACE, random.Random(4), patches=3, patch_radius=30.0)
+    assert inside(xs, ys)
+
+
+def test_perimeter_matches_original_spawn():
+    for count in (1, 7, 20, 33):
+        expected = utils.spawn_positions_on_perimeter(count, SPACE)
+        assert layouts.points(*layouts.perimeter(count, SPACE)) == pytest.approx(expected)
+    assert layouts.points(*layouts.perimeter(0, SPACE)) == []
+
+
+def test_ring_is_centered():
+    xs, ys = layouts.ring(12, SPACE, radius=10.0)
+    assert all(math.hypot(x - 30.0, y - 20.0) == pytest.approx(10.0) for x, y in zip(xs, ys))
+    assert layouts.points(*layouts.ring(0, SPACE)) == []
+
+
+def test_positions_from_config():
+    cfg = dataclasses.replace(WorldConfig(), food_layout="poisson_disk", food_layout_params={"min_dist": 3.0}, spawn_layout="ring")
+    foods = layouts.food_positions(cfg, 40, SPACE, random.Random(5))
+    assert len(foods) == 40 and all(isinstance(p, tuple) for p in foods)
+    assert len(layouts.spawn_positions(cfg, 10, SPACE)) == 10
+    with pytest.raises(ValueError):
+        layouts.food_positions(dataclasses.replace(cfg, food_layout="spiral"), 10, SPACE)
+    with pytest.raises(ValueError):
+        layouts.spawn_positions(dataclasses.replace(cfg, spawn_layout="spiral"), 10, SPACE)
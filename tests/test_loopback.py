@@ -0,0 +1,79 @@
+import asyncio
+
+import loopback
+from world import WorldConfig
+
+
+class Recorder(loopback.Agent):
+    """Agente que guarda los cuerpos recibidos; en `setup` hace arrancar a `peer`."""
+
+    class Inbox(loopback.CyclicBehaviour):
+        async def run(self):
+            msg = await self.receive(timeout=0.05)
+            if msg is not None:
+                self.agent.received.append(msg.body)
+
+    peer = None
+
+    async def setup(self):
+        self.received = []
+        self.add_behaviour(self.Inbox())
+        if self.peer is not None:
+            await self.peer.start()
+
+
+class Greeter(loopback.Agent):
+    """Saluda a `to` durante su propio `setup`."""
+
+    def __init__(self, jid, to, router):
+        super().__init__(jid, router=router)
+        self.to = to
+
+    async def setup(self):
+        self.add_behaviour(loopback.CyclicBehaviour())
+        await self.behaviours[0].send(loopback.Message(to=self.to, body="hola"))
+
+
+def test_messages_sent_during_setup_are_queued():
+    async def main():
+        router = loopback.LoopbackRouter()
+        host = Recorder("host@localhost", router=router)
+        # como HostAgent: el otro agente arranca (y envía) dentro del `setup` del primero
+        host.peer = Greeter("gen@localhost", "host@localhost", router)
+        await host.start()
+        await asyncio.sleep(0.1)
+        await host.stop()
+        await host.peer.stop()
+        return host.received, router.dropped
+
+    received, dropped = asyncio.run(main())
+    assert received == ["hola"]
+    assert dropped == 0
+
+
+def test_host_sees_first_generation(tmp_path):
+    from hostAgent import HostAgent
+
+    async def main():
+        cfg = WorldConfig(num_initial=5, food_count=10, time_scale=20.0)
+        host = HostAgent("host@localhost", cfg.generation_password)
+        host.config = cfg
+        host.web = False
+        host.report_dir = str(tmp_path)
+        await host.start()
+        gen = host.gen
+        try:
+            for _ in range(50):
+                if host.fishes:
+                    break
+                await asyncio.sleep(0.05)
+            return host.generation, gen.generation, [fish.jid for fish in host.fishes.values()]
+        finally:
+            for agent in list(gen.spawned_agents):
+                await agent.stop()
+            await gen.stop()
+            await host.stop()
+
+    host_generation, gen_generation, jids = asyncio.run(main())
+    assert host_generation == gen_generation == 1
+    assert jids and all(jid.startswith("creature1_") for jid in jids)
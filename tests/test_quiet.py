@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from world import WorldConfig
+
+
+class Outbox:
+    """Comportamiento mínimo: guarda los mensajes en lugar de enviarlos."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, msg):
+        self.sent.append(json.loads(msg.body))
+
+
+def send_home_status(gen, cid, pos):
+    out = Outbox()
+    data = {"cid": cid, "x": pos[0], "y": pos[1], "home": True, "period": 1.0}
+    info = gen.creatures_info[cid]
+    now = gen._apply_status(cid, info, pos, pos, data)
+    asyncio.run(gen._send_target(out, cid, info, pos, data, now))
+    return out.sent[-1]
+
+
+def test_home_reports_every_tick_without_quiet_ticks(make_generation):
+    gen = make_generation(WorldConfig(max_quiet_ticks=0), [(50.0, 50.0)], foods=[(90.0, 90.0)])
+    assert send_home_status(gen, 0, (50.0, 50.0))["quiet"] == 0
+    assert 0 not in gen.motion
+
+
+def test_home_uses_the_quiet_window(make_generation):
+    cfg = WorldConfig(max_quiet_ticks=8)
+    # lejos de todo: avanza en silencio hacia el spawn
+    gen = make_generation(cfg, [(50.0, 50.0)], foods=[(90.0, 90.0)])
+    reply = send_home_status(gen, 0, (50.0, 50.0))
+    assert reply["quiet"] > 0
+    assert gen.motion[0][3:5] == (0.0, 0.0)
+    # junto a una criatura que puede depredar o ser depredada sigue reportando en cada tick
+    gen = make_generation(cfg, [(50.0, 50.0), (50.5, 50.0)], foods=[(90.0, 90.0)])
+    gen.creatures_info[1].size = 2.0
+    assert send_home_status(gen, 0, (50.0, 50.0))["quiet"] == 0
+    assert 0 not in gen.motion
+
+
+def test_silent_home_creature_is_still_prey(make_generation):
+    gen = make_generation(WorldConfig(max_quiet_ticks=8), [(50.0, 50.0), (10.0, 10.0)], foods=[(90.0, 90.0)])
+    send_home_status(gen, 0, (50.0, 50.0))
+    candidates = gen._predation_candidates(1, (49.0, 49.0), (49.5, 49.5), 1.0, gen.timescale.now())
+    assert [c[0] for c in candidates] == [0]
+
+
+def test_quiet_window_from_grid_matches_full_scan(make_generation):
+    import random
+
+    import simulation
+
+    rng = random.Random(3)
+    cfg = WorldConfig(max_quiet_ticks=8, space_size=(200, 200))
+    gen = make_generation(cfg, [(rng.uniform(0, 200), rng.uniform(0, 200)) for _ in range(300)])
+    for info in gen.creatures_info:
+        info.size = rng.uniform(0.6, 1.8)
+        info.sense = rng.uniform(0.0, 2.0)
+    now = gen.timescale.now()
+    scale = gen._tick_scale()
+    min_period = 0.9 * cfg.creature_period * scale
+    for cid, info in enumerate(gen.creatures_info):
+        # referencia: recorrer todas las criaturas, como antes de usar la rejilla
+        others = [
+            (o.x, o.y, o.size, o.sense, o.speed * scale, o.speed * scale * ((now - gen.last_report[j]) / min_period + 1.0))
+            for j, o in enumerate(gen.creatures_info) if j != cid
+        ]
+        expected = simulation.quiet_ticks((info.x, info.y), info.speed * scale, info.size, info.sense, None, others, cfg, 8)
+        assert gen._quiet_ticks(cid, info, (info.x, info.y), None, now) == expected
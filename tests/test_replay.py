@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+import replay
+
+CREATURES = [{"jid": "creature1_0@localhost", "speed": 1.0, "size": 1.2, "sense": 1.0, "energy": 1.0},
+             {"jid": "creature1_1@localhost", "speed": 0.8, "size": 1.0, "sense": 0.5, "energy": 1.2}]
+
+
+def record(path, generations=(1,), frames=10, chunk_frames=4):
+    rec = replay.ReplayRecorder(path, chunk_frames=chunk_frames)
+    for gen in generations:
+        rec.begin_generation(gen, (30, 30), CREATURES, [(5.0, 5.0), (20.0, 20.0)])
+        for tick in range(frames):
+            t = tick * 0.5
+            rec.frame(t, [(0, 1.0 + tick, 2.0), (1, 10.0, 10.0 + tick)])
+            if tick == 3:
+                rec.event(t, replay.EV_EAT, 0, 0, 5.0, 5.0)
+            if tick == 6:
+                rec.event(t, replay.EV_KILL, 0, 1, 10.0, 16.0)
+        rec.end_generation(frames * 0.5)
+    rec.close()
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "replay.bin")
+    record(path, generations=(1, 2))
+    reader = replay.ReplayReader(path)
+    assert reader.generations() == [1, 2]
+    # 10 frames en chunks de 4: tres chunks por generación
+    assert len(reader.index[1]) == 3
+    snaps = list(reader.iter_snapshots(1))
+    assert [t for t, _ in snaps] == [tick * 0.5 for tick in range(10)]
+    _, first = snaps[0]
+    assert first["space_size"] == [30, 30] and len(first["foods"]) == 2
+    assert {f["jid"]: (f["x"], f["y"]) for f in first["fishes"]} == {"creature1_0@localhost": (1.0, 2.0), "creature1_1@localhost": (10.0, 10.0)}
+    # los eventos se graban tras el frame de su tick: se ven desde el frame siguiente.
+    # La comida más cercana al evento EAT desaparece
+    assert snaps[3][1]["foods"] == [(5.0, 5.0), (20.0, 20.0)]
+    assert snaps[4][1]["foods"] == [(20.0, 20.0)]
+    # tras el KILL la presa sale de fishes y entra en removals con su depredador
+    _, after_kill = snaps[7]
+    assert [f["jid"] for f in after_kill["fishes"]] == ["creature1_0@localhost"]
+    assert after_kill["removals"][0]["reason"] == "killed"
+    assert after_kill["removals"][0]["killed_by"] == "creature1_0@localhost"
+
+
+def test_index_rebuilt_without_idx(tmp_path):
+    path = str(tmp_path / "replay.bin")
+    record(path, generations=(1, 2))
+    with_index = replay.ReplayReader(path).index
+    os.remove(path + ".idx")
+    assert replay.ReplayReader(path).index == with_index
+
+
+def test_restart_replaces_generation(tmp_path):
+    path = str(tmp_path / "replay.bin")
+    record(path, generations=(1, 2))
+    record(path, generations=(1,), frames=3)
+    reader = replay.ReplayReader(path)
+    assert reader.generations() == [1, 2]
+    assert len(list(reader.iter_snapshots(1))) == 3
+
+
+def test_corrupt_chunk(tmp_path):
+    path = str(tmp_path / "replay.bin")
+    record(path)
+    with open(path, "r+b") as f:
+        f.write(b"XXXX")
+    with pytest.raises(ValueError):
+        list(replay.ReplayReader(path).iter_snapshots(1))
+
+
+def test_source_streams_chunk_by_chunk(tmp_path):
+    path = str(tmp_path / "replay.bin")
+    record(path)
+    reader = replay.ReplayReader(path)
+    chunks = []
+    original = reader.iter_records
+
+    def counting(generation):
+        for rec in original(generation):
+            if rec[0] == "frame" and rec[1] % 4 == 0:
+                chunks.append(rec[1])
+            yield rec
+
+    reader.iter_records = counting
+    source = replay.ReplaySource(path)
+    source._reader, source._mtime = reader, os.path.getmtime(path + ".idx")
+    frames = source.frames(1)
+    t, snap = next(frames)
+    # tras el primer frame solo se ha leído el primer chunk
+    assert t == 0.0 and chunks == [0]
+    assert replay.encode_line(snap).endswith(b"\n")
+    assert len(list(frames)) == 9 and chunks == [0, 4, 8]
+
+
+def test_source_skips_frames_without_building_them(tmp_path):
+    path = str(tmp_path / "replay.bin")
+    record(path)
+    source = replay.ReplaySource(path)
+    built = []
+    original = source.reader().iter_frames
+
+    def counting(generation):
+        for t, build in original(generation):
+            yield t, lambda t=t, build=build: built.append(t) or build()
+
+    source._reader.iter_frames = counting
+    # frames cada 0.5 s con al menos 2 s entre emitidos; el último (4.5) se emite siempre
+    frames = list(source.frames(1, min_dt=2.0))
+    assert [t for t, _ in frames] == [0.0, 2.0, 4.0, 4.5]
+    assert built == [0.0, 2.0, 4.0, 4.5]
+    assert frames[-1][1] == list(replay.ReplayReader(path).iter_snapshots(1))[-1][1]
@@ -0,0 +1,66 @@
+import random
+
+import engine
+import resolve
+import spatial
+from world import WorldConfig
+
+CFG = WorldConfig(detection_radius=1.0, attack_radius=1.0, sense_radius_mult=0.0, attack_size_ratio=1.2)
+
+
+def resolve_movers(movers, foods, cfg=CFG):
+    grid = spatial.SpatialGrid.from_points(foods, 1.0)
+    paths = {m[0]: (m[0], *m[1:5], m[5]) for m in movers}
+    return resolve.resolve_tick(movers, grid, lambda m: [p for key, p in sorted(paths.items()) if key != m[0]], cfg)
+
+
+def test_result_does_not_depend_on_arrival_order():
+    rng = random.Random(7)
+    movers = []
+    for key in range(40):
+        x, y = rng.uniform(0, 20), rng.uniform(0, 20)
+        movers.append((key, x, y, x + rng.uniform(-2, 2), y + rng.uniform(-2, 2), rng.uniform(0.6, 1.8), 0.0))
+    foods = [(rng.uniform(0, 20), rng.uniform(0, 20)) for _ in range(30)]
+    expected = resolve_movers(movers, foods)
+    assert any(kind == resolve.KILL for kind, *_ in expected)
+    assert any(kind == resolve.EAT for kind, *_ in expected)
+    for _ in range(5):
+        rng.shuffle(movers)
+        assert resolve_movers(movers, foods) == expected
+
+
+def test_ties_go_to_the_earliest_then_nearest_then_lowest_key():
+    # las dos llegan al pellet en el mismo t y a la misma distancia: gana el cid menor
+    movers = [(2, 0.0, 1.0, 4.0, 1.0, 1.0, 0.0), (1, 0.0, -1.0, 4.0, -1.0, 1.0, 0.0)]
+    assert resolve_movers(movers, [(2.0, 0.0)]) == [(resolve.EAT, 1, (2.0, 0.0), 1.0)]
+    # la que lo alcanza antes en su camino gana aunque tenga cid mayor
+    movers = [(1, 0.0, 0.0, 4.0, 0.0, 1.0, 0.0), (2, 2.0, 0.0, 2.0, 0.0, 1.0, 0.0)]
+    assert resolve_movers(movers, [(2.5, 0.0)])[0][:2] == (resolve.EAT, 2)
+
+
+def test_dead_creatures_stop_acting():
+    # la presa (1) llegaría a la comida al final del tick, pero la depredan antes
+    movers = [(0, 0.0, 0.0, 2.0, 0.0, 2.0, 0.0), (1, 1.0, 0.0, 6.0, 0.0, 1.0, 0.0)]
+    assert resolve_movers(movers, [(6.0, 0.0)]) == [(resolve.KILL, 0, 1, 1.0)]
+
+
+def test_each_prey_dies_once_and_food_limit_per_tick():
+    movers = [(0, -1.0, 0.0, 0.0, 0.0, 2.0, 0.0), (1, 1.0, 0.0, 0.0, 0.0, 2.0, 0.0), (2, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0)]
+    kills = [r for r in resolve_movers(movers, []) if r[0] == resolve.KILL]
+    assert len(kills) == 1 and kills[0][2] == 2
+    # con tick_scale 1 se come como mucho un pellet por tick
+    eats = resolve_movers([(0, 0.0, 0.0, 10.0, 0.0, 1.0, 0.0)], [(2.0, 0.0), (5.0, 0.0), (8.0, 0.0)])
+    assert [r[2] for r in eats] == [(2.0, 0.0)]
+
+
+def run_barrier_world(seed, generations=3):
+    cfg = WorldConfig(tick_barrier=True, num_initial=40, food_count=30, space_size=(30, 30))
+    world = engine.HeadlessWorld(cfg, rng=random.Random(seed))
+    world.run(generations)
+    return [(gen, result.initial, result.deaths, result.survivors, len(result.next_population), ticks) for gen, result, ticks, _ in world.results]
+
+
+def test_barrier_engine_is_deterministic():
+    first = run_barrier_world(11)
+    assert len(first) == 3
+    assert run_barrier_world(11) == first
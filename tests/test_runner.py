@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+
+import logger_setup
+import runner
+
+
+def run(capsys, *argv):
+    with pytest.raises(SystemExit) as exit_info:
+        runner.main(list(argv))
+    assert exit_info.value.code == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def test_engine_run_is_reproducible(tmp_path, capsys):
+    args = ("--mode", "engine", "--generations", "2", "--seed", "7", "--set", "num_initial=15", "--set", "food_count=20")
+    original = logger_setup.LOG_PATH
+    try:
+        first = run(capsys, *args, "--output", str(tmp_path / "a"))
+        second = run(capsys, *args, "--output", str(tmp_path / "b"))
+        # el log compartido sigue a --output
+        assert logger_setup.LOG_PATH == str(tmp_path / "b" / "run.log")
+        logger_setup.get_logger("runner_test").info("hola")
+        assert os.path.exists(tmp_path / "b" / "run.log")
+    finally:
+        logger_setup.set_log_path(original)
+    assert first["generations"] == 2 and first["ticks"] > 0
+    assert os.path.exists(tmp_path / "a" / "generation_summary.csv")
+    assert os.path.exists(tmp_path / "a" / "summary.json")
+    # misma semilla, mismas generaciones (salvo los tiempos reales)
+    strip = lambda rows: [{k: v for k, v in row.items() if k != "seconds"} for row in rows]
+    assert strip(first["per_generation"]) == strip(second["per_generation"])
+    assert first["ticks"] == second["ticks"]
@@ -0,0 +1,45 @@
+import snapshot
+from records import CreatureRecord
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_viewers_share_one_encode_while_statuses_arrive():
+    clock = Clock()
+    cache = snapshot.SnapshotCache(min_interval=0.1, clock=clock)
+    fishes = {i: CreatureRecord(f"creature1_{i}@localhost", x=float(i), y=0.0, cid=i) for i in range(20)}
+    version = 0
+    builds = []
+
+    def build():
+        builds.append(version)
+        return snapshot.world_snapshot(list(fishes.values()), [], [], 1, (30, 30))
+
+    # 10 clientes por intervalo; entre consulta y consulta llegan statuses (como en `HostAgent.RecvBehav`)
+    for interval in range(3):
+        etags = set()
+        for viewer in range(10):
+            fishes[viewer].x += 0.5
+            version += 1
+            etags.add(cache.get((version, 0, 1), None, build).etag)
+            clock.now += 0.005
+        assert len(etags) == 1
+        clock.now = (interval + 1) * 0.1
+    assert len(builds) == 3
+    assert cache.misses == 3 and cache.hits == 27
+
+
+def test_without_changes_the_version_is_kept():
+    clock = Clock()
+    cache = snapshot.SnapshotCache(min_interval=0.1, clock=clock)
+    first = cache.get(1, None, lambda: {"n": 1})
+    clock.now = 5.0
+    assert cache.get(1, None, lambda: {"n": 2}) is first
+    # tras el intervalo, un cambio se publica en la siguiente consulta
+    assert cache.get(2, None, lambda: {"n": 2}).body() == b'{"n":2}'
@@ -0,0 +1,25 @@
+import stats
+
+
+def test_histogram_counts_out_of_range_separately():
+    hist = stats.Histogram(0.0, 3.0, bins=3)
+    for x in (-0.5, 0.0, 1.5, 3.0, 4.2, 7.0):
+        hist.add(x)
+    assert hist.as_dict() == {"lo": 0.0, "hi": 3.0, "counts": [1, 1, 1], "under": 1, "over": 2}
+    hist.remove(7.0)
+    hist.remove(-0.5)
+    hist.remove(3.0)
+    assert (hist.counts, hist.under, hist.over) == ([1, 1, 0], 0, 1)
+
+
+def test_live_stats_keep_values_above_range_out_of_the_last_bin():
+    live = stats.LiveStats(bins=4)
+    live.reset(1)
+    live.spawn(0, speed=4.5, size=1.0, sense=1.0, energy=1.0)
+    live.set_energy(0, 5.0)
+    snap = live.snapshot()
+    assert snap["energy"]["histogram"]["over"] == 1 and sum(snap["energy"]["histogram"]["counts"]) == 0
+    assert snap["traits"]["speed"]["histogram"]["over"] == 1
+    # al volver al rango sale de `over`
+    live.set_energy(0, 1.0)
+    assert live.energy_hist.over == 0 and sum(live.energy_hist.counts) == 1
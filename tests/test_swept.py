@@ -0,0 +1,62 @@
+import pytest
+
+import simulation
+import spatial
+from world import WorldConfig
+
+
+def test_segment_point_distance():
+    assert spatial.segment_point_distance(0, 0, 10, 0, 5, 2) == (2.0, 0.5)
+    # fuera del segmento: distancia al extremo más cercano
+    assert spatial.segment_point_distance(0, 0, 10, 0, 13, 4) == (5.0, 1.0)
+    assert spatial.segment_point_distance(1, 1, 1, 1, 4, 5) == (5.0, 0.0)
+
+
+def test_closest_approach_is_time_aligned():
+    # se cruzan de frente: en t = 0.5 están en el mismo punto
+    d, t = spatial.closest_approach(0, 0, 10, 0, 10, 0, 0, 0)
+    assert d == pytest.approx(0.0) and t == pytest.approx(0.5)
+    # caminos que se cortan pero en instantes distintos: no se encuentran
+    d, t = spatial.closest_approach(0, 0, 10, 0, 2, -5, 2, 5)
+    assert d == pytest.approx(1.5 * 2 ** 0.5) and t == pytest.approx(0.35)
+
+
+def test_foods_on_the_path_are_found_in_order():
+    grid = spatial.SpatialGrid.from_points([(8.0, 0.5), (3.0, -0.5), (5.0, 4.0), (-2.0, 0.0)], cell=2.0)
+    # el punto final está lejos de toda la comida: sin prueba barrida no se come ninguna
+    assert simulation.find_foods_swept((10.0, 0.0), (10.0, 0.0), grid, 1.0, 4) == []
+    assert simulation.find_foods_swept((0.0, 0.0), (10.0, 0.0), grid, 1.0, 4) == [(3.0, -0.5), (8.0, 0.5)]
+    assert simulation.find_foods_swept((0.0, 0.0), (10.0, 0.0), grid, 1.0) == [(3.0, -0.5)]
+    assert simulation.foods_per_tick(WorldConfig(tick_scale=4.0)) == 4
+
+
+def test_last_step_keeps_only_the_final_step():
+    assert simulation.last_step((0.0, 0.0), (3.0, 4.0), 10.0) == (0.0, 0.0)
+    assert simulation.last_step((0.0, 0.0), (6.0, 8.0), 5.0) == pytest.approx((3.0, 4.0))
+    assert simulation.last_step((0.0, 0.0), (6.0, 8.0), 0.0) == (0.0, 0.0)
+
+
+def test_swept_predation_targets():
+    cfg = WorldConfig(attack_radius=1.0, sense_radius_mult=0.0, attack_size_ratio=1.2)
+    candidates = [
+        ("crossed", 10.0, 0.0, 0.0, 0.0, 1.0),  # de frente: se cruzan a mitad del tick
+        ("behind", -5.0, 0.0, -5.0, 0.0, 1.0),  # quieta lejos del camino
+        ("big", 5.0, 0.0, 5.0, 0.0, 2.0),  # en el camino, pero demasiado grande
+    ]
+    hits = simulation.swept_predation_targets((0.0, 0.0, 10.0, 0.0), 2.0, 1.0, candidates, cfg)
+    assert [key for key, _ in hits] == ["crossed"]
+    # sin barrido (solo puntos finales) la misma presa queda a 10 del depredador
+    assert simulation.swept_predation_targets((10.0, 0.0, 10.0, 0.0), 2.0, 1.0, [("crossed", 0.0, 0.0, 0.0, 0.0, 1.0)], cfg) == []
+
+
+def test_finished_creatures_remain_prey(make_generation):
+    gen = make_generation(WorldConfig(), [(10.0, 10.0), (11.0, 10.0)])
+    gen.creatures_info[0].size = 2.0
+    # la criatura 1 terminó (llegó a casa): deja de estar activa pero sigue viva en la rejilla
+    gen.active_cids.discard(1)
+    gen.prev_pos.pop(1, None)
+    now = gen.timescale.now()
+    candidates = gen._predation_candidates(0, (9.0, 10.0), (10.0, 10.0), 1.0, now)
+    assert candidates == [(1, 11.0, 10.0, 11.0, 10.0, 1.0)]
+    # y cuenta para la ventana de silencio del depredador
+    assert gen._quiet_ticks(0, gen.creatures_info[0], (10.0, 10.0), None, now) == 0
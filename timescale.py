@@ -0,0 +1,101 @@
+import asyncio
+import time
+import weakref
+
+
+class TimeScale:
+    """Escala de tiempo global compartida por todos los agentes de la simulación.
+
+    - Mantiene el factor de velocidad actual (1.0 = tiempo real)
+    - Reescala el periodo de cada `PeriodicBehaviour` suscrito a partir de su periodo base
+    - Ofrece un reloj simulado (`now`) y `sleep` escalado para las esperas de los agentes
+
+    Todo se ejecuta en el mismo bucle asyncio, por lo que `set_speed` aplica el cambio
+    a todos los suscriptores de forma atómica (no hay `await` intermedios).
+    """
+
+    def __init__(self, speed=1.0):
+        if speed <= 0:
+            raise ValueError("speed debe ser > 0")
+        self._speed = float(speed)
+        # behaviour -> periodo base (segundos simulados); las referencias débiles
+        # liberan automáticamente los behaviours de agentes ya detenidos
+        self._subscribers = weakref.WeakKeyDictionary()
+        # ancla del reloj simulado: se re-ancla en cada cambio de velocidad
+        self._anchor_wall = time.monotonic()
+        self._anchor_sim = 0.0
+        # evento que despierta a las esperas en curso cuando cambia la velocidad
+        self._changed = asyncio.Event()
+
+    @property
+    def speed(self):
+        return self._speed
+
+    def now(self):
+        """Tiempo simulado transcurrido (segundos), continuo entre cambios de velocidad."""
+        return self._anchor_sim + (time.monotonic() - self._anchor_wall) * self._speed
+
+    def scaled(self, seconds):
+        """Convierte una duración simulada en segundos reales según la velocidad actual."""
+        return seconds / self._speed
+
+    def subscribe(self, behaviour, base_period):
+        """Registra un behaviour periódico y ajusta su periodo a la velocidad actual."""
+        self._subscribers[behaviour] = float(base_period)
+        behaviour.period = self.scaled(base_period)
+
+    def unsubscribe(self, behaviour):
+        self._subscribers.pop(behaviour, None)
+
+    def set_speed(self, speed):
+        """Cambia la velocidad global y reescala todos los behaviours suscritos.
+
+        Devuelve la velocidad aplicada.
+        """
+        speed = float(speed)
+        if speed <= 0:
+            raise ValueError("speed debe ser > 0")
+        # re-anclar el reloj para que `now()` sea continuo
+        self._anchor_sim = self.now()
+        self._anchor_wall = time.monotonic()
+        self._speed = speed
+        for behaviour, base_period in list(self._subscribers.items()):
+            behaviour.period = self.scaled(base_period)
+        # despertar a las esperas en curso para que recalculen su plazo
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+        return speed
+
+    async def sleep(self, seconds):
+        """Espera `seconds` de tiempo simulado, respetando cambios de velocidad a mitad de espera."""
+        deadline = self.now() + seconds
+        while True:
+            remaining = deadline - self.now()
+            if remaining <= 0:
+                return
+            changed = self._changed
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=self.scaled(remaining))
+            except asyncio.TimeoutError:
+                return
+
+    async def sleep_until(self, deadline, wake=None):
+        """Espera hasta el instante simulado `deadline` (None = sin plazo) o hasta que se active `wake`.
+
+        Devuelve True si se alcanzó el plazo y False si despertó `wake` (p.ej. se programó un
+        evento anterior). Los cambios de velocidad recalculan el plazo, como en `sleep`.
+        """
+        while True:
+            if wake is not None and wake.is_set():
+                return False
+            remaining = None if deadline is None else deadline - self.now()
+            if remaining is not None and remaining <= 0:
+                return True
+            waiters = [asyncio.ensure_future(self._changed.wait())]
+            if wake is not None:
+                waiters.append(asyncio.ensure_future(wake.wait()))
+            try:
+                await asyncio.wait(waiters, timeout=None if remaining is None else self.scaled(remaining), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
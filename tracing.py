@@ -0,0 +1,218 @@
+"""Trazas opt-in de mensajes entre agentes: latencia por salto y exportación a Chrome trace.
+
+Con `WorldConfig.trace_messages` cada `status`, `target`/`no_target`, `eat_confirm` y
+`creature_removed` lleva un id de traza (`trace`) y la marca `time.monotonic()` del envío
+(`ts`); las respuestas de la generación repiten el `trace` del status que responden y su
+`ts` original (`origin_ts`). Todos los agentes corren en el mismo proceso y comparten un
+`Tracer` (como `TimeScale`), así que el receptor calcula la latencia con su propio reloj.
+
+Saltos medidos (`HOPS`): criatura -> generación, ida y vuelta status -> target vista por la
+criatura, criatura -> host y aviso de eliminación -> host. Los mensajes de cada generación
+se exportan como `trace_gen<N>.json` (formato Chrome trace, se abre en Perfetto o en
+chrome://tracing), con una flecha por mensaje entre los hilos de emisor y receptor.
+"""
+import glob
+import itertools
+import json
+import math
+import os
+import time
+
+from stats import RunningStats
+
+TRACE_PATTERN = "trace_gen*.json"
+
+HOPS = ("creature_to_generation", "generation_round_trip", "creature_to_host", "removal_to_host")
+
+# hilos fijos del trace; cada criatura usa CREATURE_TID + cid
+GENERATION_TID = 1
+HOST_TID = 2
+CREATURE_TID = 100
+
+
+def trace_path(report_dir, generation):
+    return os.path.join(report_dir, f"trace_gen{generation}.json")
+
+
+def clean_traces(report_dir):
+    """Elimina las trazas de una ejecución anterior. Devuelve las rutas eliminadas."""
+    removed = []
+    for path in glob.glob(os.path.join(report_dir, TRACE_PATTERN)):
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:
+            pass
+    return removed
+
+
+def tid(endpoint):
+    """Hilo del trace: "generation", "host" o el cid (int) de una criatura."""
+    if endpoint == "generation":
+        return GENERATION_TID
+    if endpoint == "host":
+        return HOST_TID
+    return CREATURE_TID + int(endpoint)
+
+
+class LatencyHistogram:
+    """Latencias (segundos) en cubetas logarítmicas de base 2 desde 0.1 ms, con media y percentiles."""
+
+    __slots__ = ("counts", "stats", "max")
+
+    BASE = 1e-4
+    BINS = 24  # la última cubeta recoge todo lo que supera ~14 min
+
+    def __init__(self):
+        self.counts = [0] * self.BINS
+        self.stats = RunningStats()
+        self.max = 0.0
+
+    def add(self, seconds):
+        seconds = max(0.0, seconds)
+        i = 0 if seconds <= self.BASE else min(self.BINS - 1, int(math.log2(seconds / self.BASE)) + 1)
+        self.counts[i] += 1
+        self.stats.add(seconds)
+        if seconds > self.max:
+            self.max = seconds
+
+    def upper(self, i):
+        """Límite superior (segundos) de la cubeta `i`."""
+        return self.BASE * (2 ** i)
+
+    def percentile(self, q):
+        """Límite superior de la cubeta que contiene el percentil `q` (0-100); 0 si está vacío."""
+        n = self.stats.n
+        if n == 0:
+            return 0.0
+        rank = q / 100.0 * n
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self.upper(i), self.max)
+        return self.max
+
+    def as_dict(self):
+        ms = 1000.0
+        return {
+            "n": self.stats.n,
+            "mean_ms": self.stats.mean * ms,
+            "std_ms": self.stats.std * ms,
+            "max_ms": self.max * ms,
+            "p50_ms": self.percentile(50) * ms,
+            "p90_ms": self.percentile(90) * ms,
+            "p99_ms": self.percentile(99) * ms,
+            # [límite superior en ms, conteo] de las cubetas no vacías
+            "buckets": [[self.upper(i) * ms, c] for i, c in enumerate(self.counts) if c],
+        }
+
+
+class Tracer:
+    """Histogramas por salto (acumulados desde el arranque) y eventos de la generación actual."""
+
+    def __init__(self, max_events=200_000):
+        self.max_events = max_events
+        self.hops = {name: LatencyHistogram() for name in HOPS}
+        self.generation = 0
+        self.events = []
+        self.dropped = 0
+        self._threads = set()
+        self._ids = itertools.count(1)
+        self._t0 = time.monotonic()
+
+    def new_id(self):
+        return next(self._ids)
+
+    def stamp(self, payload, trace=None, origin=None):
+        """Añade `trace` (nuevo si es None) y `ts` a `payload`; `origin` es el payload respondido."""
+        payload["trace"] = trace if trace is not None else self.new_id()
+        payload["ts"] = time.monotonic()
+        if origin is not None and "ts" in origin:
+            payload["origin_ts"] = origin["ts"]
+        return payload
+
+    def begin_generation(self, generation):
+        self.generation = generation
+        self.events = []
+        self.dropped = 0
+        self._threads = set()
+
+    def received(self, data, src, dst, hop=None):
+        """Registra la llegada a `dst` de un mensaje trazado enviado por `src`.
+
+        Devuelve la latencia en segundos, o None si el mensaje no lleva marca de tiempo.
+        """
+        sent = data.get("ts")
+        if sent is None:
+            return None
+        now = time.monotonic()
+        latency = now - sent
+        if hop is not None:
+            self.hops[hop].add(latency)
+        self._flow(data.get("type", "message"), data.get("trace"), src, dst, sent, now)
+        return latency
+
+    def round_trip(self, data):
+        """Ida y vuelta status -> respuesta, medido por la criatura al recibir `target`/`no_target`."""
+        origin = data.get("origin_ts")
+        if origin is None:
+            return None
+        latency = time.monotonic() - origin
+        self.hops["generation_round_trip"].add(latency)
+        return latency
+
+    # --- Chrome trace ------------------------------------------------------------------
+
+    def _us(self, t):
+        return (t - self._t0) * 1e6
+
+    def _thread(self, endpoint):
+        t = tid(endpoint)
+        if t not in self._threads:
+            self._threads.add(t)
+            name = endpoint if isinstance(endpoint, str) else f"creature {endpoint}"
+            self.events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": t, "args": {"name": name}})
+        return t
+
+    def _flow(self, kind, trace, src, dst, sent, recv):
+        if len(self.events) + 4 > self.max_events:
+            self.dropped += 1
+            return
+        s_tid = self._thread(src)
+        d_tid = self._thread(dst)
+        flow_id = f"{trace}>{d_tid}"
+        args = {"trace": trace, "latency_ms": (recv - sent) * 1000.0}
+        # cada extremo de la flecha necesita un slice que lo contenga en su hilo
+        self.events.append({"name": f"send {kind}", "cat": "msg", "ph": "X", "pid": 1, "tid": s_tid, "ts": self._us(sent), "dur": 1, "args": args})
+        self.events.append({"name": kind, "cat": "msg", "ph": "s", "id": flow_id, "pid": 1, "tid": s_tid, "ts": self._us(sent)})
+        self.events.append({"name": f"recv {kind}", "cat": "msg", "ph": "X", "pid": 1, "tid": d_tid, "ts": self._us(recv), "dur": 1, "args": args})
+        self.events.append({"name": kind, "cat": "msg", "ph": "f", "bp": "e", "id": flow_id, "pid": 1, "tid": d_tid, "ts": self._us(recv)})
+
+    def export_chrome(self, path):
+        """Escribe los mensajes de la generación actual en formato Chrome trace (JSON)."""
+        doc = {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"generation": self.generation, "dropped_messages": self.dropped},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc, f, separators=(",", ":"))
+        return path
+
+    def snapshot(self):
+        """Dict serializable a JSON para `/latency`."""
+        return {
+            "generation": self.generation,
+            "events": len(self.events),
+            "dropped_messages": self.dropped,
+            "hops": {name: hist.as_dict() for name, hist in self.hops.items()},
+        }
+
+    def summary(self):
+        """Una línea por salto (n, p50, p99) para el log."""
+        lines = []
+        for name, hist in self.hops.items():
+            d = hist.as_dict()
+            lines.append(f"{name}: n={d['n']} p50={d['p50_ms']:.2f}ms p99={d['p99_ms']:.2f}ms max={d['max_ms']:.2f}ms")
+        return "\n".join(lines)
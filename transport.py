@@ -0,0 +1,32 @@
+"""Transporte de mensajes de los agentes: SPADE/XMPP (por defecto) o loopback en memoria.
+
+Los agentes importan `Agent`, `CyclicBehaviour`, `PeriodicBehaviour` y `Message` desde
+aquí en lugar de hacerlo directamente desde `spade` (y `Template`/`no_messages` para los
+behaviours que nunca llaman a `receive`). Con `SIM_TRANSPORT=loopback` se usa
+`loopback.py`, que entrega los mensajes en colas en memoria dentro del proceso y no
+necesita servidor XMPP (pruebas de carga, CI, ejecución local rápida).
+"""
+import os
+
+TRANSPORT = os.environ.get("SIM_TRANSPORT", "xmpp").strip().lower()
+
+if TRANSPORT == "loopback":
+    from loopback import Agent, CyclicBehaviour, PeriodicBehaviour, Message, Template, run, wait_until_finished  # noqa: F401
+elif TRANSPORT == "xmpp":
+    from spade import run, wait_until_finished  # noqa: F401
+    from spade.agent import Agent  # noqa: F401
+    from spade.behaviour import CyclicBehaviour, PeriodicBehaviour  # noqa: F401
+    from spade.message import Message  # noqa: F401
+    from spade.template import Template  # noqa: F401
+else:
+    raise ValueError(f"SIM_TRANSPORT desconocido: {TRANSPORT!r} (usar 'xmpp' o 'loopback')")
+
+
+def no_messages():
+    """Plantilla que no coincide con ningún mensaje.
+
+    El agente encola cada mensaje en todos los behaviours cuya plantilla coincide, y sin
+    plantilla coinciden todos: un behaviour periódico o de eventos que nunca llama a
+    `receive` acumularía una copia de cada mensaje durante toda la ejecución.
+    """
+    return Template(metadata={"sim_behaviour": "no_messages"})
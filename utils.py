@@ -1,11 +1,12 @@
 import random
 import math
 
+import layouts
+
 
 def place_food(count, space_size):
-    """Devuelve una lista de tuplas (x,y) distribuidas uniformemente en `space_size` (w,h)."""
-    w, h = space_size
-    return [(random.uniform(0, w), random.uniform(0, h)) for _ in range(count)]
+    """Devuelve una lista de tuplas (x,y) distribuidas uniformemente en `space_size` (w,h) (ver `layouts.uniform`)."""
+    return layouts.points(*layouts.uniform(count, space_size))
 
 
 def distance(a, b):
@@ -34,6 +35,7 @@ def default_energy(speed, size, energy_base=1.0, min_speed=0.1):
     Fórmula: energy = energy_base * (size ** 3) / max(abs(speed), min_speed)
     Devuelve la energía calculada.
     """
+    return energy_base * (size ** 3) / max(abs(speed), min_speed)
 
 
 def energy_drain_per_tick(size, speed, sense, energy_scale=0.02, sense_scale=0.02):
@@ -42,6 +44,7 @@ def energy_drain_per_tick(size, speed, sense, energy_scale=0.02, sense_scale=0.0
     drain = energy_scale * (size ** 3 * (speed ** 2)) + sense_scale * sense
     Devuelve el valor de `drain`.
     """
+    return energy_scale * (size ** 3 * (speed ** 2)) + sense_scale * sense
 
 
 def random_speed(min_s=0.5, max_s=2.0):
@@ -56,37 +59,6 @@ def spawn_positions_on_perimeter(num_creatures, space_size):
         space_size: Tupla (width, height) del mundo
     
     Returns:
-        Lista de tuplas (x, y) con posiciones en el borde
+        Lista de tuplas (x, y) con posiciones en el borde (ver `layouts.perimeter`)
     """
-    w, h = space_size
-    perimeter = 2 * (w + h)
-    
-    # Calcular distancia entre criaturas
-    spacing = perimeter / num_creatures
-    
-    positions = []
-    for i in range(num_creatures):
-        # Distancia desde el origen siguiendo el perímetro
-        distance_along_perimeter = i * spacing
-        
-        # Determinar en qué lado del rectángulo estamos
-        if distance_along_perimeter < w:
-            # Lado superior: de (0,0) a (w,0)
-            x = distance_along_perimeter
-            y = 0
-        elif distance_along_perimeter < w + h:
-            # Lado derecho: de (w,0) a (w,h)
-            x = w
-            y = distance_along_perimeter - w
-        elif distance_along_perimeter < 2 * w + h:
-            # Lado inferior: de (w,h) a (0,h)
-            x = w - (distance_along_perimeter - w - h)
-            y = h
-        else:
-            # Lado izquierdo: de (0,h) a (0,0)
-            x = 0
-            y = h - (distance_along_perimeter - 2 * w - h)
-        
-        positions.append((x, y))
-    
-    return positions
+    return layouts.points(*layouts.perimeter(num_creatures, space_size))
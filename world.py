@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Optional, Tuple
 
 
 @dataclass
@@ -17,6 +17,69 @@ class WorldConfig:
     last_eat_grace: float = 15.0
     # periodo de reporte (segundos) para las criaturas con jitter
     creature_period: float = 0.7
+    # reporte adaptativo: máximo de ticks que una criatura lejos de comida y de otras criaturas
+    # avanza sin enviar `status` a la generación (0 = reportar en cada tick); ver `simulation.quiet_ticks`
+    max_quiet_ticks: int = 8
+    # duración de un tick en ticks base: multiplica el desplazamiento y el gasto de energía por tick
+    # (y el periodo de reporte), para simular con menos ticks/mensajes; ver `simulation.tick_scale`
+    tick_scale: float = 1.0
+    # comer/depredar probando el camino recorrido en el tick (segmento) y no solo el punto final
+    swept_collisions: bool = True
+    # barrera de tick: reunir los movimientos de todo un tick (un periodo de reporte) y resolver comida
+    # y depredación por lotes con desempate determinista, en lugar de status a status; ver `resolve.py`
+    tick_barrier: bool = False
+    # duración máxima de una generación en segundos simulados (0 = sin límite); ver `events.py`
+    generation_duration: float = 0.0
+    # regeneración de comida: pellets nuevos por segundo simulado (0 = sin regeneración), región
+    # (x0, y0, x1, y1) donde aparecen (None = todo el mundo) y retardo (segundos simulados) con el
+    # que un pellet comido reaparece en su sitio (0 = no reaparece)
+    food_regrowth_rate: float = 0.0
+    food_regrowth_region: Optional[Tuple[float, float, float, float]] = None
+    food_regrowth_delay: float = 0.0
+    # máximo de pellets simultáneos con regeneración (0 = `food_count`)
+    max_food: int = 0
+    # distribución de la comida al inicio de cada generación (ver `layouts.py`): "uniform",
+    # "poisson_disk", "clusters" o "gradient", con sus parámetros opcionales
+    # (p.ej. {"patches": 5, "patch_radius": 2.0} o {"axis": "y", "lo": 0.1})
+    food_layout: str = "uniform"
+    food_layout_params: Optional[dict] = None
+    # posiciones de spawn de las criaturas: "perimeter", "ring" o "random"
+    spawn_layout: str = "perimeter"
+    # guardar un checkpoint cada N generaciones (0 = desactivado); ver `checkpoint.py`
+    checkpoint_every: int = 1
+    # grabar posiciones por tick y eventos en report/replay.bin (ver `replay.py`)
+    record_replay: bool = False
+    # periodo (segundos simulados) entre frames grabados
+    replay_period: float = 0.25
+    # velocidad inicial de la simulación (1.0 = tiempo real); modificable en runtime vía /set_speed
+    time_scale: float = 1.0
+    # perfilar cada generación con cProfile (report/profile_gen<N>.prof + top funciones en el log); ver `profiling.py`
+    profile_generations: bool = False
+    # número de funciones del resumen escrito en el log
+    profile_top: int = 20
+    # backpressure del buzón de la generación y del host (ver `backpressure.py`): políticas activas
+    # ("coalesce", "host_degrade", "throttle"; vacía = sin descarte), profundidad del buzón que sube un
+    # escalón (`high`) y por debajo de la cual se coalescen statuses y se relaja (`low`)
+    backpressure_policies: Tuple[str, ...] = ("coalesce", "host_degrade", "throttle")
+    backpressure_high: int = 200
+    backpressure_low: int = 50
+    # escalón "host_degrade": las criaturas envían al host uno de cada N statuses
+    backpressure_host_every: int = 4
+    # escalones "throttle": periodo de las criaturas x slowdown por escalón, hasta `max_throttle` escalones
+    backpressure_slowdown: float = 1.5
+    backpressure_max_throttle: int = 3
+    # segundos (reales) mínimos entre cambios de escalón
+    backpressure_cooldown: float = 1.0
+    # trazar los mensajes status/target/eat_confirm/creature_removed: latencia por salto en `/latency`
+    # y report/trace_gen<N>.json (Chrome trace / Perfetto); ver `tracing.py`
+    trace_messages: bool = False
+    # máximo de eventos del trace por generación (los mensajes siguientes solo cuentan en los histogramas)
+    trace_max_events: int = 200_000
+    # número de intervalos de los histogramas de `/stats` (ver `stats.py`)
+    stats_bins: int = 10
+    # segundos (reales) mínimos entre versiones publicadas de `/fishes`: los cambios se coalescen y
+    # todos los clientes de un intervalo comparten una codificación (ver `snapshot.SnapshotCache`)
+    snapshot_interval: float = 0.1
     # multiplicador de energía mientras se busca activamente un objetivo
     seek_energy_multiplier: float = 1.3
     creature_password: str = "123456abcd."
@@ -52,3 +115,19 @@ class WorldConfig:
     # base de energía usada para calcular la energía inicial: energy_base * size^3 / speed
     energy_base: float = 1.0
     min_speed: float = 0.1
+
+    # Herencia: operador genético para los hijos de los reproductores (ver `evolution.OPERATORS`)
+    # "random" = rasgos aleatorios, "gaussian" = rasgos del padre + mutación, "crossover" = cruce de dos reproductores + mutación
+    reproduction_operator: str = "gaussian"
+    # desviación estándar de la mutación gaussiana por rasgo (recortada a min_speed, size_min/size_max, sense_min/sense_max)
+    mutation_sigma_speed: float = 0.1
+    mutation_sigma_size: float = 0.1
+    mutation_sigma_sense: float = 0.1
+
+    # Capacidad de carga: máximo de individuos de la siguiente generación (0 = sin límite).
+    # Si supervivientes + hijos la superan, las plazas se eligen con `capacity_selection`
+    # (ver `evolution.SELECTIONS`): "topk" = las de mayor aptitud (comidas, kills, energía),
+    # "tournament" = torneos de `tournament_size` plazas al azar
+    carrying_capacity: int = 0
+    capacity_selection: str = "topk"
+    tournament_size: int = 3